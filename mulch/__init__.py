@@ -3,6 +3,8 @@ It's called mulch because it's a pile of shit that makes other stuff work better
 """
 
 from .serial import *
+from .bintree import *
+from .columns import *
 from .bytetools import *
 from .misc import *
 from .qt import *
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import ast
+import enum
+import mmap
+import struct
+from functools import cache
+from collections.abc import Buffer, Iterable, Mapping, Sequence
+from pathlib import Path, PurePath
+from typing import Any, BinaryIO, Callable
+
+import numpy as np
+
+from .serial import Dictable, Dictable_ByMethod, YamlStringable
+
+
+__all__ = [
+	"bindump",
+	"binload",
+	"Table",
+	"StrColumn",
+]
+
+
+# Layout: a 32 byte header (magic, tree offset, tree size), then the data region holding every buffer and array 64-byte aligned, then the tree.
+# The tree is a tagged encoding of the structure (maps, lists, scalars) that refers into the data region for anything large, so reading one back only
+# parses the tree and maps the rest: arrays come back as views of the file.
+#
+# Lists of numbers/bools/strings are stored as a single array, lists of maps that share their keys (the usual list of dict() records) as a Table of
+# such columns. Everything else is stored as is.
+
+BT_MAGIC = b'MLCHBT\x00\x01'
+BT_HEADER = struct.Struct('<8sQQ8x')
+BT_ALIGN = 64
+BT_INT_MIN, BT_INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class StrColumn(Sequence[str]):
+	"""Strings packed as one utf-8 blob plus `len + 1` offsets into it, decoded as they're indexed."""
+	offsets: np.ndarray
+	blob: memoryview
+
+	def __init__(self, offsets: np.ndarray, blob: memoryview):
+		self.offsets = offsets
+		self.blob = blob
+
+	@classmethod
+	def pack(cls, values: list[str]) -> StrColumn:
+		encoded = [x.encode('utf-8') for x in values]
+		offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+		np.cumsum([len(x) for x in encoded], out=offsets[1:])
+		return cls(offsets, memoryview(b''.join(encoded)))
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		return str(self.blob[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+	def __eq__(self, other):
+		return isinstance(other, Sequence) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+	def __repr__(self):
+		return f"StrColumn({len(self)} strings)"
+
+
+class Table(Sequence[dict]):
+	"""A list of records stored column-wise, `columns` being arrays (numbers), StrColumns or plain lists. Rows are put together when indexed."""
+	columns: dict[Any, np.ndarray | StrColumn | list]
+	rows: int
+
+	def __init__(self, columns: dict[Any, np.ndarray | StrColumn | list], rows: int):
+		self.columns = columns
+		self.rows = rows
+
+	def __len__(self) -> int:
+		return self.rows
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self)))]
+		return {k: (v[index].item() if isinstance(v, np.ndarray) else v[index]) for k, v in self.columns.items()}
+
+	def __eq__(self, other):
+		return isinstance(other, Sequence) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+	def __repr__(self):
+		return f"Table({self.rows} rows: {', '.join(str(x) for x in self.columns.keys())})"
+
+
+BT_PLAIN = frozenset({str, int, float, bool, type(None), dict, list, bytes, np.ndarray, StrColumn})
+
+
+@cache
+def _protocol(cls: type) -> type | None:
+	"""Which of prepass' protocols `cls` follows, looked up once per class: isinstance on a runtime protocol is slow enough to dominate a dump."""
+	for protocol in [YamlStringable, Dictable, Dictable_ByMethod]:
+		if issubclass(cls, protocol):
+			return protocol
+	return None
+
+
+def _normalize(obj: Any) -> Any:
+	"""prepass, one level deep and without turning buffers into text. Containers come back as a dict or a list whose items still need normalizing."""
+	if type(obj) in BT_PLAIN:
+		return obj
+	elif isinstance(obj, (str, int, float, bool, np.ndarray, StrColumn)):
+		return obj
+	elif isinstance(obj, np.generic):
+		return obj.item()
+	elif isinstance(obj, (bytes, bytearray, memoryview)):
+		return obj
+	elif isinstance(obj, enum.Enum):
+		return obj.value if isinstance(obj.value, (int, str)) else obj.name
+	elif isinstance(obj, PurePath):
+		return str(obj).replace('\\', '/')
+	elif (protocol := _protocol(type(obj))) is YamlStringable:
+		return obj.yamlstr()
+	elif protocol is Dictable:
+		return _normalize(obj.dict())
+	elif protocol is Dictable_ByMethod:
+		return {k: v for k, v in obj.dictgen()}
+	elif isinstance(obj, Buffer):
+		return memoryview(obj)
+	elif isinstance(obj, Mapping):
+		return dict(obj)
+	elif isinstance(obj, Iterable):
+		return list(obj)
+	elif isinstance(obj, Callable):
+		return _normalize(obj())
+	return str(obj)
+
+
+def _column(values: list) -> np.ndarray | StrColumn | None:
+	"""`values` as one array if they're all of a kind, None if they aren't."""
+	if len(values) == 0:
+		return None
+	kinds = {type(x) for x in values}
+	if kinds == {bool}:
+		return np.array(values, dtype='?')
+	elif kinds == {int}:
+		if BT_INT_MIN <= min(values) and max(values) <= BT_INT_MAX:
+			return np.array(values, dtype='<i8')
+		elif 0 <= min(values) and max(values) < (1 << 64):
+			return np.array(values, dtype='<u8')
+	elif kinds <= {int, float} and float in kinds:
+		return np.array(values, dtype='<f8')
+	elif kinds == {str}:
+		return StrColumn.pack(values)
+	return None
+
+
+class _Writer:
+	fp: BinaryIO
+	tree: bytearray
+
+	def __init__(self, fp: BinaryIO):
+		self.fp = fp
+		self.tree = bytearray()
+
+	def data(self, buffer: Buffer) -> int:
+		"""Appends `buffer` to the data region, returns its offset."""
+		position = self.fp.tell()
+		if position % BT_ALIGN:
+			self.fp.write(bytes(BT_ALIGN - position % BT_ALIGN))
+			position = self.fp.tell()
+		self.fp.write(buffer)
+		return position
+
+	def node(self, obj: Any):
+		obj = _normalize(obj)
+		tree = self.tree
+		if obj is None:
+			tree += b'n'
+		elif obj is True or obj is False:
+			tree += b't' if obj else b'f'
+		elif isinstance(obj, int):
+			if BT_INT_MIN <= obj <= BT_INT_MAX:
+				tree += b'i' + struct.pack('<q', obj)
+			else:
+				tree += b'z'
+				self.string(str(obj))
+		elif isinstance(obj, float):
+			tree += b'd' + struct.pack('<d', obj)
+		elif isinstance(obj, str):
+			tree += b's'
+			self.string(obj)
+		elif isinstance(obj, (bytes, bytearray, memoryview)):
+			view = memoryview(obj).cast('B') if memoryview(obj).c_contiguous else memoryview(bytes(obj))
+			tree += b'b' + struct.pack('<QQ', self.data(view), len(view))
+		elif isinstance(obj, np.ndarray):
+			self.array(obj)
+		elif isinstance(obj, StrColumn):
+			tree += b'S'
+			self.array(obj.offsets)
+			self.node(obj.blob)
+		elif isinstance(obj, dict):
+			tree += b'm' + struct.pack('<I', len(obj))
+			for k, v in obj.items():
+				self.node(k)
+				self.node(v)
+		else:
+			self.sequence(obj)
+
+	def string(self, value: str):
+		encoded = value.encode('utf-8')
+		self.tree += struct.pack('<I', len(encoded)) + encoded
+
+	def array(self, value: np.ndarray):
+		if value.dtype.hasobject:
+			self.sequence(value.tolist())
+			return
+		value = np.ascontiguousarray(value)
+		descr = repr(np.lib.format.dtype_to_descr(value.dtype)).encode('ascii')
+		self.tree += b'a' + struct.pack('<H', len(descr)) + descr + struct.pack(f'<B{value.ndim}Q', value.ndim, *value.shape)
+		self.tree += struct.pack('<Q', self.data(value.reshape(-1).view('u1')) if value.size else 0)
+
+	def sequence(self, values: list):
+		items = [_normalize(x) for x in values]
+		if (column := _column(items)) is not None:
+			self.node(column)
+		elif len(items) > 1 and all(isinstance(x, dict) for x in items) and all(x.keys() == items[0].keys() for x in items):
+			self.tree += b'T' + struct.pack('<II', len(items), len(items[0]))
+			for key in items[0].keys():
+				values = [x[key] for x in items]
+				self.node(key)
+				self.node(values)
+		else:
+			self.tree += b'l' + struct.pack('<I', len(items))
+			for x in items:
+				self.node(x)
+
+
+def bindump(__obj: Any, path: Path):
+	"""Writes `__obj` (anything yamldump takes) to `path` in the binary tree format, see binload for reading it back."""
+	with path.open('wb') as fp:
+		fp.write(bytes(BT_HEADER.size))
+		writer = _Writer(fp)
+		writer.node(__obj)
+		tree_offset = fp.tell()
+		fp.write(writer.tree)
+		fp.seek(0)
+		fp.write(BT_HEADER.pack(BT_MAGIC, tree_offset, len(writer.tree)))
+
+
+class _Reader:
+	buffer: memoryview
+	position: int
+
+	def __init__(self, buffer: memoryview, position: int):
+		self.buffer = buffer
+		self.position = position
+
+	def unpack(self, fmt: str) -> tuple:
+		values = struct.unpack_from(fmt, self.buffer, self.position)
+		self.position += struct.calcsize(fmt)
+		return values
+
+	def string(self) -> str:
+		size, = self.unpack('<I')
+		self.position += size
+		return str(self.buffer[self.position - size:self.position], 'utf-8')
+
+	def node(self) -> Any:
+		tag = self.buffer[self.position]
+		self.position += 1
+		match tag:
+			case 0x6E:  # n
+				return None
+			case 0x74:  # t
+				return True
+			case 0x66:  # f
+				return False
+			case 0x69:  # i
+				return self.unpack('<q')[0]
+			case 0x7A:  # z
+				return int(self.string())
+			case 0x64:  # d
+				return self.unpack('<d')[0]
+			case 0x73:  # s
+				return self.string()
+			case 0x62:  # b
+				offset, size = self.unpack('<QQ')
+				return self.buffer[offset:offset + size]
+			case 0x61:  # a
+				size, = self.unpack('<H')
+				dtype = np.lib.format.descr_to_dtype(ast.literal_eval(str(self.buffer[self.position:self.position + size], 'ascii')))
+				self.position += size
+				ndim, = self.unpack('<B')
+				shape = self.unpack(f'<{ndim}Q')
+				offset, = self.unpack('<Q')
+				return np.frombuffer(self.buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+			case 0x53:  # S
+				offsets = self.node()
+				return StrColumn(offsets, self.node())
+			case 0x6D:  # m
+				count, = self.unpack('<I')
+				return {self.node(): self.node() for _ in range(count)}
+			case 0x6C:  # l
+				count, = self.unpack('<I')
+				return [self.node() for _ in range(count)]
+			case 0x54:  # T
+				rows, cols = self.unpack('<II')
+				return Table({self.node(): self.node() for _ in range(cols)}, rows)
+		raise ValueError(f"Unknown tag {tag:#04x} at {self.position - 1}")
+
+
+def binload(path: Path, use_mmap: bool = True) -> Any:
+	"""
+	Reads back what bindump wrote. The tree gets parsed, arrays and buffers are views of the file: mapped unless `use_mmap` is off, in which case the
+	whole file is read in. Lists of records come back as Tables and lists of strings as StrColumns, both behave like the lists they were.
+	"""
+	with path.open('rb') as fp:
+		buffer = memoryview(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else fp.read())
+	magic, tree_offset, tree_size = BT_HEADER.unpack_from(buffer)
+	if magic != BT_MAGIC:
+		raise ValueError(f"Not a binary tree file: {path}")
+	return _Reader(buffer, tree_offset).node()
@@ -99,6 +99,25 @@ class _StreamTempConfig:
 		if self.ofst is not None:
 			self.prnt.seek(self.ppos)
 
+class _StreamWindow:
+	"""Bounds a stream to its next size bytes, so they can be parsed in place instead of being copied into a new Stream."""
+	prnt: Stream
+	plen: int
+	
+	def __init__(self, /, prnt: Stream, size: int):
+		self.prnt = prnt
+		self.plen = prnt.len
+		if size > prnt.remaining():
+			raise OutOfBoundsException(f"{size} > {prnt.remaining()} (len: {prnt.len}, pos: {prnt.tell()})")
+		self.size = size
+	
+	def __enter__(self):
+		self.prnt.len = self.prnt.tell() + self.size
+		return self.prnt
+	
+	def __exit__(self, *args) -> None:
+		self.prnt.len = self.plen
+
 class _DebugNamespace:
 	@staticmethod
 	def parse(data: int, *, decode: bool = True):
@@ -129,30 +148,24 @@ class OutOfBoundsException(Exception):
 
 
 def find_start_of_nts_array(real_namecount: int, data: bytes) -> int:
-	with Stream(data[::-1]) as neg_stream:
-		with Stream(data) as fwd_stream:
-			# the first (last in neg_stream) word should have a LE integer in front describing the size of the null terminated string array (nameSize)
-			# nameSize should be equal to the position of the first (last in neg_stream) word's first letter in our inverse stream
-			while True:
-				negpos = neg_stream.tell()
-				nameSize = int.from_bytes(neg_stream.peek(4), byteorder='big')  # BE is just reverse LE, 5Head
-				if negpos == nameSize:
-					logger.info(f"Found possible namesize value of {negpos}...")
-					# begin test by going to the negative index negpos
-					fwd_stream.seek(-negpos, 2)
-					fwd_namecount = 0
-					while fwd_stream.tell() < len(data):
-						# get a null term string, add to the counter, repeat until we reach the end of the stream
-						str(fwd_stream)
-						fwd_namecount += 1
-					if fwd_namecount == real_namecount:
-						logger.info(f"Found successful namesize value of {negpos}")
-						return negpos
-					else:
-						# failiure.
-						# could be a collision error, so let's just keep iterating and ignore it.
-						logger.error(f"Didn't work at {negpos}...")
-				neg_stream.seek(1, 1)
+	"""Finds the size (nameSize) of the null terminated string array at the end of data, which holds exactly real_namecount strings.
+	
+	The array should have a LE integer in front of it holding nameSize, so the array has to start after the (real_namecount + 1)th null byte
+	from the end of the data and at or before the (real_namecount)th one. Only the positions in between get checked, which keeps this linear."""
+	last_null = len(data)
+	for _ in range(real_namecount):
+		last_null = data.rfind(b'\x00', 0, last_null)
+		if last_null == -1:
+			raise ValueError(f"Data holds less than {real_namecount} null terminated strings")
+	prev_null = data.rfind(b'\x00', 0, last_null)
+	
+	# try the shortest array first, same as walking backwards from the end of the data
+	for start in range(last_null, max(prev_null, 3), -1):
+		nameSize = int.from_bytes(data[start - 4:start], byteorder='little')
+		if nameSize == len(data) - start:
+			logger.info(f"Found successful namesize value of {nameSize}")
+			return nameSize
+	raise ValueError(f"Could not find the start of a {real_namecount} string array")
 
 
 class StreamObject[ExtraType]:
@@ -558,6 +571,9 @@ class Stream:
 	) -> _StreamTempConfig:
 		return _StreamTempConfig(self, ofst=ofst, odir=odir, endi=endi, sign=sign, size=size, blen=blen)
 	
+	def window(self, size: int) -> _StreamWindow:
+		return _StreamWindow(self, size)
+	
 	def __getitem__(self, i: int | slice) -> bytes:
 		if isinstance(i, slice):
 			start, stop, step = i.indices(self.len)
@@ -655,6 +671,8 @@ class Stream:
 	
 	def read(self, __n: int = -1, /) -> bytes:
 		if self.len != 0:
+			if __n < 0:
+				__n = self.remaining()
 			if __n > self.remaining():
 				raise OutOfBoundsException(f"{__n} > {self.remaining()} (len: {self.len}, pos: {self.tell()})")
 			self.read_count += __n if __n >= 1 else 0
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import ClassVar, Self
+
+import numpy as np
+from loguru import logger
+
+
+__all__ = [
+	"ColumnTable",
+]
+
+
+class ColumnTable:
+	"""
+	Columnar table, one numpy array per column. Subclasses list their columns in `COLUMNS` as (name, numpy dtype of the finished column), rows come
+	in as tuples in that order. `ROWS` names what a row is in log messages.
+	"""
+	COLUMNS: ClassVar[list[tuple[str, str]]] = []
+	ROWS: ClassVar[str] = 'rows'
+	columns: dict[str, np.ndarray]
+
+	def __init__(self, columns: dict[str, np.ndarray]):
+		self.columns = columns
+
+	@classmethod
+	def empty_columns(cls) -> dict[str, np.ndarray]:
+		return {name: np.empty(0, dtype=dtype) for name, dtype in cls.COLUMNS}
+
+	@classmethod
+	def from_rows(cls, rows: list[tuple]) -> Self:
+		if len(rows) == 0:
+			return cls(cls.empty_columns())
+		return cls({name: np.array(column, dtype=dtype) for (name, dtype), column in zip(cls.COLUMNS, zip(*rows))})
+
+	@classmethod
+	def concat(cls, *tables: ColumnTable) -> Self:
+		if len(tables) == 0:
+			return cls(cls.empty_columns())
+		return cls({name: np.concatenate([x.columns[name] for x in tables]) for name, _ in cls.COLUMNS})
+
+	@classmethod
+	def load(cls, path: Path) -> Self:
+		with np.load(path) as npz:
+			return cls({name: npz[name] for name, _ in cls.COLUMNS})
+
+	def save(self, path: Path):
+		np.savez_compressed(path, **self.columns)
+		logger.info(f"Saved {type(self).__name__} of {len(self)} {self.ROWS} to {path}")
+
+	def __len__(self):
+		return len(self.columns[self.COLUMNS[0][0]])
+
+	def __getitem__(self, column: str) -> np.ndarray:
+		return self.columns[column]
+
+	def where(self, mask: np.ndarray) -> Self:
+		return type(self)({k: v[mask] for k, v in self.columns.items()})
+
+	def counts(self, column: str) -> dict[str, int]:
+		values, counts = np.unique(self.columns[column], return_counts=True)
+		return {str(k): int(v) for k, v in zip(values, counts)}
@@ -3,4 +3,5 @@ from .view_hex import *
 from .view_tex import *
 from .layouts import *
 from .paths import *
-from .quick import *
\ No newline at end of file
+from .quick import *
+from .jobs import *
\ No newline at end of file
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from loguru import logger
+from PySide6 import QtCore
+from __feature__ import true_property #type: ignore
+
+
+__all__ = [
+	'JobPool',
+]
+
+
+class _Job(QtCore.QRunnable):
+	pool: JobPool
+	channel: str
+	generation: int
+	key: Hashable
+	fn: Callable
+	args: tuple
+	cache: bool
+	skipped: bool
+
+	def __init__(self, pool: JobPool, channel: str, generation: int, key: Hashable, fn: Callable, args: tuple, cache: bool):
+		super().__init__()
+		self.setAutoDelete(False)
+		self.pool = pool
+		self.channel = channel
+		self.generation = generation
+		self.key = key
+		self.fn = fn
+		self.args = args
+		self.cache = cache
+		self.skipped = False
+
+	def run(self):
+		# a newer job on the channel makes this one pointless, don't even start
+		if self.pool.generation(self.channel) != self.generation:
+			self.skipped = True
+			self.pool._done.emit(self, None, None)
+			return
+		try:
+			result = self.fn(*self.args)
+		except Exception as err:
+			self.pool._done.emit(self, None, f"{type(err).__name__}: {err}")
+		else:
+			self.pool._done.emit(self, result, None)
+
+
+class JobPool(QtCore.QObject):
+	"""Runs callables on a thread pool and hands their results back to the GUI thread through signals.
+
+	Jobs are submitted on a channel (say, one per widget): submitting a new job on a channel makes the older ones stale, queued stale jobs are dropped from
+	the pool and the results of running ones are discarded, so only the job for the latest request ever gets delivered. Submitting a key the channel is
+	still running takes that job back up instead of starting a second one racing it over the same files. Results of cacheable jobs are
+	kept in an LRU cache of `cache_size` entries by (channel, key), and a cache hit is delivered immediately without touching the pool.
+	"""
+	finished = QtCore.Signal(str, object, object)   # channel, key, result
+	failed = QtCore.Signal(str, object, str)        # channel, key, error
+	_done = QtCore.Signal(object, object, object)   # job, result, error
+
+	cache_size: int
+	_pool: QtCore.QThreadPool
+	_generations: dict[str, int]
+	_jobs: dict[str, list[_Job]]
+	_cache: OrderedDict[tuple[str, Hashable], Any]
+
+	def __init__(self, cache_size: int = 32, pool: QtCore.QThreadPool | None = None, parent: QtCore.QObject | None = None):
+		super().__init__(parent)
+		self.cache_size = cache_size
+		self._pool = pool or QtCore.QThreadPool.globalInstance()
+		self._generations = dict()
+		self._jobs = dict()
+		self._cache = OrderedDict()
+		self._done.connect(self._deliver, QtCore.Qt.ConnectionType.QueuedConnection)
+
+	def generation(self, channel: str) -> int:
+		return self._generations.get(channel, 0)
+
+	def submit(self, channel: str, key: Hashable, fn: Callable, *args, cache: bool = True) -> bool:
+		"""Runs `fn(*args)` for `channel`, cancelling whatever the channel was still doing. True if the result came straight from the cache."""
+		self.cancel(channel)
+		if cache and (channel, key) in self._cache:
+			self._cache.move_to_end((channel, key))
+			self.finished.emit(channel, key, self._cache[(channel, key)])
+			return True
+		for job in self._jobs.get(channel, list()):
+			if job.key == key:
+				# couldn't be taken off the pool, so it's already running: have it deliver again rather than start another
+				job.generation = self.generation(channel)
+				return False
+		job = _Job(self, channel, self.generation(channel), key, fn, args, cache)
+		self._jobs.setdefault(channel, list()).append(job)
+		self._pool.start(job)
+		return False
+
+	def cancel(self, channel: str):
+		"""Makes every job of `channel` stale, taking the ones that haven't started yet off the pool."""
+		self._generations[channel] = self.generation(channel) + 1
+		for job in list(self._jobs.get(channel, list())):
+			if self._pool.tryTake(job):
+				self._jobs[channel].remove(job)
+
+	def cached(self, channel: str, key: Hashable) -> Any | None:
+		return self._cache.get((channel, key))
+
+	def clear_cache(self):
+		self._cache.clear()
+
+	@QtCore.Slot(object, object, object)
+	def _deliver(self, job: _Job, result, error: str | None):
+		if job in self._jobs.get(job.channel, list()):
+			self._jobs[job.channel].remove(job)
+		if job.generation != self.generation(job.channel):
+			return
+		if job.skipped:
+			# taken back up by `submit` after it had already given up, run it after all
+			job.skipped = False
+			self._jobs.setdefault(job.channel, list()).append(job)
+			self._pool.start(job)
+			return
+		if error is not None:
+			logger.error(f"Job {job.channel}[{job.key}] failed: {error}")
+			self.failed.emit(job.channel, job.key, error)
+			return
+		if job.cache:
+			self._cache[(job.channel, job.key)] = result
+			self._cache.move_to_end((job.channel, job.key))
+			while len(self._cache) > self.cache_size:
+				self._cache.popitem(last=False)
+		self.finished.emit(job.channel, job.key, result)
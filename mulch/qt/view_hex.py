@@ -1,7 +1,11 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import mmap
+from bisect import bisect_right
+from collections import OrderedDict
 from enum import IntEnum
+from pathlib import Path
+from typing import Callable
 
 from PySide6 import QtCore, QtGui, QtWidgets
 from __feature__ import true_property #type: ignore
@@ -13,6 +17,8 @@ from .custom_roles import UserRoles
 
 __all__ = [
 	'HexRole',
+	'ByteSource',
+	'HexModes',
 	'HexViewer',
 	'HexTableView'
 ]
@@ -30,46 +36,149 @@ class HexRole(IntEnum):
 		return type(self)((self.value + 1) % len(self))
 
 
+class ByteSource:
+	"""Random access to `size` bytes through `reader(offset, size)`, read a page at a time and keeping the last `max_pages` pages around."""
+	PAGE_SIZE = 1 << 16
+	
+	size: int
+	reader: Callable[[int, int], bytes]
+	max_pages: int
+	_pages: OrderedDict[int, bytes]
+	_keep: object       # whatever has to outlive the reader, e.g. an mmap
+	
+	def __init__(self, size: int, reader: Callable[[int, int], bytes], max_pages: int = 32, keep: object = None):
+		self.size = size
+		self.reader = reader
+		self.max_pages = max_pages
+		self._pages = OrderedDict()
+		self._keep = keep
+	
+	@classmethod
+	def of(cls, value: bytes | bytearray | memoryview | mmap.mmap | Path | ByteSource | object) -> ByteSource:
+		"""Wraps buffers, maps paths and reads anything with `read_range(offset, size)` and `out_size` (an archive File, or better its `range_reader()`) in place."""
+		if isinstance(value, ByteSource):
+			return value
+		elif isinstance(value, Path):
+			if value.stat().st_size == 0:
+				return cls.of(b'')
+			with open(value, 'rb') as f:
+				return cls.of(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+		elif isinstance(value, (bytes, bytearray, memoryview, mmap.mmap)):
+			view = memoryview(value)
+			return cls(len(view), lambda offset, size: view[offset:offset + size], keep=value)
+		elif hasattr(value, 'read_range') and hasattr(value, 'out_size'):
+			return cls(value.out_size, value.read_range)
+		raise TypeError(f"Can't read bytes out of a {type(value).__name__}")
+	
+	def __len__(self) -> int:
+		return self.size
+	
+	def page(self, number: int) -> bytes:
+		if number in self._pages:
+			self._pages.move_to_end(number)
+		else:
+			self._pages[number] = bytes(self.reader(number * self.PAGE_SIZE, min(self.PAGE_SIZE, self.size - number * self.PAGE_SIZE)))
+			while len(self._pages) > self.max_pages:
+				self._pages.popitem(last=False)
+		return self._pages[number]
+	
+	def __getitem__(self, offset: int) -> int:
+		return self.page(offset // self.PAGE_SIZE)[offset % self.PAGE_SIZE]
+	
+	def read(self, offset: int, size: int) -> bytes:
+		size = max(min(size, self.size - offset), 0)
+		first, last = offset // self.PAGE_SIZE, (offset + size - 1) // self.PAGE_SIZE
+		data = b''.join(self.page(x) for x in range(first, last + 1)) if size else b''
+		start = offset - first * self.PAGE_SIZE
+		return data[start:start + size]
+
+
+class HexModes:
+	"""Display mode of every byte as sorted, non-overlapping runs: `starts[i]` up to `starts[i + 1]` are all `modes[i]`."""
+	starts: list[int]
+	modes: list[HexRole]
+	
+	def __init__(self):
+		self.starts = [0]
+		self.modes = [HexRole.Raw]
+	
+	def __getitem__(self, offset: int) -> HexRole:
+		return self.modes[bisect_right(self.starts, offset) - 1]
+	
+	def __len__(self) -> int:
+		return len(self.starts)
+	
+	def _split(self, offset: int) -> int:
+		"""Makes sure a run starts at `offset`, returns its position."""
+		i = bisect_right(self.starts, offset) - 1
+		if self.starts[i] != offset:
+			i += 1
+			self.starts.insert(i, offset)
+			self.modes.insert(i, self.modes[i - 1])
+		return i
+	
+	def set(self, start: int, end: int, mode: HexRole):
+		"""Sets `start` up to `end` to `mode`, merging it with equal neighbours."""
+		if end <= start:
+			return
+		i = self._split(start)
+		j = self._split(end)
+		self.starts[i:j] = [start]
+		self.modes[i:j] = [mode]
+		if i + 1 < len(self.starts) and self.modes[i + 1] == mode:
+			del self.starts[i + 1], self.modes[i + 1]
+		if i > 0 and self.modes[i - 1] == mode:
+			del self.starts[i], self.modes[i]
+
+
 class HexViewer(QtCore.QAbstractTableModel):
-	bytedata: bytes
-	_row_cnt: int
-	_datamode_dict: defaultdict[int, HexRole]
+	source: ByteSource
+	columns: int
+	_datamode: HexModes
 	
 	font: QtGui.QFont
 	
 	fg_dict: dict[HexRole, QtGui.QBrush]
 	
-	def __init__(self, value: bytes = b'', font: str = 'Lucida Console'):
+	def __init__(self, value: bytes | ByteSource | object = b'', font: str = 'Lucida Console', columns: int = 16):
 		super().__init__()
-		self.bytedata = value
+		self.source = ByteSource.of(value)
+		self.columns = columns
 		self.font = QtGui.QFont(font)
-		self._datamode_dict = defaultdict(lambda: HexRole.Raw)
+		self._datamode = HexModes()
 		self.fg_dict = {
 			HexRole.Raw: QtGui.QBrush(QtGui.QColor(0, 0, 0)),
 			HexRole.Int: QtGui.QBrush(QtGui.QColor(0, 0, 180)),
 			HexRole.Str: QtGui.QBrush(QtGui.QColor(0, 180, 0)),
 		}
 	
-	def load(self, value: bytes):
+	def load(self, value: bytes | ByteSource | object):
+		"""Anything `ByteSource.of` takes, only the rows in view ever get read."""
 		self.beginResetModel()
-		self.bytedata = value
-		self._datamode_dict = defaultdict(lambda: HexRole.Raw)
+		self.source = ByteSource.of(value)
+		self._datamode = HexModes()
+		self.endResetModel()
+	
+	def set_columns(self, columns: int):
+		self.beginResetModel()
+		self.columns = columns
 		self.endResetModel()
 	
 	def columnCount(self, parent=None):
-		return 8
+		return self.columns
 	
 	def rowCount(self, parent=None):
-		return len(self.bytedata) // self.columnCount() + (len(self.bytedata) % self.columnCount() != 0)
+		return len(self.source) // self.columnCount() + (len(self.source) % self.columnCount() != 0)
 
 	def next_datamode(self, index: QtCore.QModelIndex | list[QtCore.QModelIndex]):
 		for x in (index if isinstance(index, list) else [index]):
 			data_index = self.data_index(x)
-			self._datamode_dict[data_index] = self._datamode_dict[data_index].get_next()
+			if data_index is not None:
+				self._datamode.set(data_index, data_index + 1, self._datamode[data_index].get_next())
 	
 	def data_index(self, index: QtCore.QModelIndex) -> int | None:
 		data_index = (index.row() * self.columnCount()) + index.column()
-		if data_index >= len(self.bytedata):
+		if data_index >= len(self.source):
 			return None
 		else:
 			return data_index
@@ -81,15 +190,15 @@ class HexViewer(QtCore.QAbstractTableModel):
 		
 		match role:
 			case UserRoles.Hex:
-				return self._datamode_dict[data_index]
+				return self._datamode[data_index]
 			case QtCore.Qt.ItemDataRole.DisplayRole:
-				match self._datamode_dict[data_index]:
+				match self._datamode[data_index]:
 					case HexRole.Raw:
-						return f'{self.bytedata[data_index]:02X}'
+						return f'{self.source[data_index]:02X}'
 					case HexRole.Int:
-						return f'{self.bytedata[data_index]}'
+						return f'{self.source[data_index]}'
 					case HexRole.Str:
-						x = self.bytedata[data_index]
+						x = self.source[data_index]
 						if x in asciichart.keys():
 							return asciichart[x]
 						elif 32 < x <= 0x7E:
@@ -97,7 +206,7 @@ class HexViewer(QtCore.QAbstractTableModel):
 						else:
 							return f'??'
 			case QtCore.Qt.ItemDataRole.ForegroundRole:
-				return self.fg_dict[self._datamode_dict[data_index]]
+				return self.fg_dict[self._datamode[data_index]]
 			case QtCore.Qt.ItemDataRole.ToolTipRole:
 				return f"Offset {data_index} ({hex(data_index)})"
 			case QtCore.Qt.ItemDataRole.TextAlignmentRole:
@@ -123,6 +232,11 @@ class HexTableView(QtWidgets.QTableView):
 		self.verticalHeader().hide()
 		self.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
 		self.horizontalHeader().hide()
+		self.contextMenuPolicy = QtCore.Qt.ContextMenuPolicy.ActionsContextMenu
+		for columns in [16, 32]:
+			action = QtGui.QAction(f"{columns} columns", self)
+			action.triggered.connect(lambda checked=False, n=columns: self.mdl.set_columns(n))
+			self.addAction(action)
 	
 	def mouseDoubleClickEvent(self, event):
 		index = self.indexAt(event.pos())
@@ -135,4 +249,3 @@ class HexTableView(QtWidgets.QTableView):
 			self.mdl.dataChanged.emit(self.selectedIndexes()[0], self.selectedIndexes()[-1], QtCore.Qt.ItemDataRole.DisplayRole)
 			return True
 		return super().keyPressEvent(event)
-
@@ -5,7 +5,7 @@ from pathlib import Path
 from loguru import logger
 
 from torchbearer.northlight_internal.textures.directx.DXGI import DXGI_FORMAT
-from PIL import ImageQt
+from PIL import Image, ImageQt
 from PySide6 import QtCore, QtGui, QtWidgets
 from __feature__ import true_property #type: ignore
 
@@ -78,6 +78,16 @@ class TexViewerWidget(QtWidgets.QScrollArea):
 		self.img_lbl.adjustSize()
 		return True
 	
+	def updateImageData(self, img: Image.Image) -> bool:
+		"""Shows an already decoded image, skipping the round trip through a file on disk."""
+		self.img_lbl.pixmap = QtGui.QPixmap.fromImage(ImageQt.ImageQt(img))
+		if self.img_lbl.pixmap.isNull():
+			raise ValueError
+		self.empty = False
+		self.img_sca = 1.0
+		self.img_lbl.adjustSize()
+		return True
+	
 	def mousePressEvent(self, event):
 		if event.button() == QtCore.Qt.MouseButton.LeftButton:
 			self.cursor = QtCore.Qt.CursorShape.OpenHandCursor
@@ -166,4 +176,8 @@ class TexViewer(QtWidgets.QMainWindow):
 	@QtCore.Slot(Path)
 	def updateImage(self, file: Path):
 		self.windowTitle = f"TexViewer | {file.name}"
+	
+	def updateImageData(self, img: Image.Image, name: str):
+		self.viewer.updateImageData(img)
+		self.windowTitle = f"TexViewer | {name}"
 	
\ No newline at end of file
@@ -1,6 +1,6 @@
 from collections import defaultdict
 from pathlib import PurePath
-from typing import Any, Callable
+from typing import Any, Callable, Iterator, Literal, TextIO
 from orjson import orjson
 import yaml
 import enum
@@ -13,6 +13,9 @@ __all__ = [
 	"dd",
 	"jsondump",
 	"yamldump",
+	"yamlstream",
+	"jsonstream",
+	"jsonlines",
 	"Dictable"
 ]
 
@@ -82,7 +85,157 @@ def prepass(obj: Any) -> Any:
 
 
 def jsondump(__obj: Any):
-	return orjson.dumps(prepass(__obj), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS).debugprint().replace('  ', '    ')
+	return orjson.dumps(prepass(__obj), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS).decode().replace('  ', '    ')
 
 def yamldump(__obj: Any, indent: int = 2):
-	return yaml.dump(prepass(__obj), default_flow_style=False, sort_keys=False, indent=indent, allow_unicode=True)
\ No newline at end of file
+	return yaml.dump(prepass(__obj), default_flow_style=False, sort_keys=False, indent=indent, allow_unicode=True)
+
+
+
+# Streaming: same conversions as prepass, but containers are walked as they get written instead of being copied up front, so memory stays bounded by
+# what the objects themselves hold. Buffers longer than `truncate` bytes are cut short (None writes them whole).
+
+type Walked = tuple[Literal['leaf'], Any] | tuple[Literal['map'], Iterator[tuple[Any, Any]]] | tuple[Literal['seq'], Iterator[Any]]
+
+
+def _hexstr(data: Buffer, truncate: int | None) -> str:
+	view = memoryview(data)
+	view = view.cast('B') if view.c_contiguous else memoryview(view.tobytes())
+	if truncate is not None and len(view) > truncate:
+		return f"0x{view[:truncate].hex().upper()}... ({len(view)} bytes)"
+	return f"0x{view.hex().upper()}"
+
+
+def walk(obj: Any, truncate: int | None = 256) -> Walked:
+	"""One step of prepass: a leaf value, or an iterator over a container's items, whose values still need walking."""
+	if isinstance(obj, (str, int, float, bool, type(None))):
+		return 'leaf', obj
+	elif isinstance(obj, (bytes, bytearray)):
+		return 'leaf', _hexstr(obj, truncate)
+	elif isinstance(obj, memoryview):
+		if obj.nbytes <= 24:
+			return 'leaf', f"<memoryview object: {_hexstr(obj, truncate)}>"
+		else:
+			return 'leaf', f"<memoryview object ({obj.format} with len {len(obj)})>"
+	elif isinstance(obj, enum.Enum):
+		rep = prepass(obj)
+		return ('map', iter(rep.items())) if isinstance(rep, dict) else ('leaf', rep)
+	elif isinstance(obj, PurePath):
+		return 'leaf', prepass(obj)
+	elif isinstance(obj, YamlStringable):
+		return 'leaf', obj.yamlstr()
+	elif isinstance(obj, Dictable):
+		return walk(obj.dict(), truncate)
+	elif isinstance(obj, Dictable_ByMethod):
+		return 'map', obj.dictgen()
+	elif isinstance(obj, Buffer):
+		return 'leaf', _hexstr(obj, truncate)
+	elif isinstance(obj, Mapping):
+		return 'map', iter(obj.items())
+	elif isinstance(obj, Iterable):
+		return 'seq', iter(obj)
+	elif isinstance(obj, Callable):
+		return walk(obj(), truncate)
+	else:
+		return 'leaf', obj
+
+
+def _yaml_events(dumper: yaml.Dumper, obj: Any, truncate: int | None) -> Iterator[yaml.Event]:
+	kind, value = walk(obj, truncate)
+	match kind:
+		case 'leaf':
+			node = dumper.represent_data(value)
+			if isinstance(node, yaml.ScalarNode):
+				implicit = (node.tag == dumper.resolve(yaml.ScalarNode, node.value, (True, False)), node.tag == dumper.resolve(yaml.ScalarNode, node.value, (False, True)))
+				yield yaml.ScalarEvent(None, node.tag, implicit, node.value, style=node.style)
+			else:
+				# whatever prepass passes through as is (IntEnums, unknown objects), left to the dumper like yamldump does
+				dumper.anchor_node(node)
+				dumper.serialize_node(node, None, None)
+				dumper.anchors, dumper.serialized_nodes = dict(), dict()
+		case 'map':
+			yield yaml.MappingStartEvent(None, None, True, flow_style=False)
+			for k, v in value:
+				yield from _yaml_events(dumper, k, truncate)
+				yield from _yaml_events(dumper, v, truncate)
+			yield yaml.MappingEndEvent()
+		case 'seq':
+			yield yaml.SequenceStartEvent(None, None, True, flow_style=False)
+			for v in value:
+				yield from _yaml_events(dumper, v, truncate)
+			yield yaml.SequenceEndEvent()
+
+
+def yamlstream(__obj: Any, fp: TextIO, indent: int = 2, truncate: int | None = 256):
+	"""yamldump written straight to `fp` (a file, or a socket's makefile('w')) as the object graph is walked."""
+	dumper = yaml.Dumper(fp, default_flow_style=False, sort_keys=False, indent=indent, allow_unicode=True)
+	try:
+		dumper.open()
+		dumper.emit(yaml.DocumentStartEvent(explicit=False))
+		for event in _yaml_events(dumper, __obj, truncate):
+			dumper.emit(event)
+		dumper.emit(yaml.DocumentEndEvent(explicit=False))
+		dumper.close()
+	finally:
+		dumper.dispose()
+
+
+def _json_key(key: Any, truncate: int | None) -> str:
+	kind, value = walk(key, truncate)
+	return orjson.dumps(value if kind == 'leaf' and isinstance(value, str) else str(value)).decode()
+
+
+def _json_chunks(obj: Any, truncate: int | None, indent: int | None, level: int = 0) -> Iterator[str]:
+	kind, value = walk(obj, truncate)
+	if kind == 'leaf':
+		yield orjson.dumps(value, default=str).decode()
+		return
+	opener, closer = ('{', '}') if kind == 'map' else ('[', ']')
+	inner = '' if indent is None else '\n' + ' ' * (indent * (level + 1))
+	sep = ': ' if indent is not None else ':'
+	yield opener
+	empty = True
+	for item in value:
+		yield inner if empty else f",{inner}"
+		empty = False
+		if kind == 'map':
+			yield f"{_json_key(item[0], truncate)}{sep}"
+			item = item[1]
+		yield from _json_chunks(item, truncate, indent, level + 1)
+	if not empty and indent is not None:
+		yield '\n' + ' ' * (indent * level)
+	yield closer
+
+
+def jsonstream(__obj: Any, fp: TextIO, indent: int | None = 2, truncate: int | None = 256):
+	"""jsondump written straight to `fp` as the object graph is walked, compact if `indent` is None."""
+	for chunk in _json_chunks(__obj, truncate, indent):
+		fp.write(chunk)
+
+
+def jsonlines(__obj: Any, fp: TextIO, truncate: int | None = 256):
+	"""
+	One compact JSON record per line: a record per item of a top level sequence, a {key: value} record per entry of a top level mapping, and entries whose
+	value is a sequence get a {key: item} record per item instead, so something like PackMeta's file list doesn't end up as one enormous line.
+	"""
+	kind, value = walk(__obj, truncate)
+	if kind == 'leaf':
+		records = iter([value])
+	elif kind == 'seq':
+		records = value
+	else:
+		records = _jsonl_entries(value, truncate)
+	for record in records:
+		for chunk in _json_chunks(record, truncate, None):
+			fp.write(chunk)
+		fp.write('\n')
+
+
+def _jsonl_entries(items: Iterator[tuple[Any, Any]], truncate: int | None) -> Iterator[dict]:
+	for k, v in items:
+		kind, value = walk(v, truncate)
+		if kind == 'seq':
+			for item in value:
+				yield {k: item}
+		else:
+			yield {k: dict(value) if kind == 'map' else value}     # one level only, the values are still walked as they're written
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import inspect
+import os
 import tomllib
+from contextlib import contextmanager
 from pathlib import Path
 
-from typing import Callable
+from typing import Callable, Iterator
 
 
 class FieldTOML[T]:
@@ -21,8 +23,9 @@ class FieldTOML[T]:
 		return self.from_str(getattr(obj, self.name))
 	
 	def __set__(self, obj: ConfigTOML, value):
-		setattr(obj, self.name, value)
-		obj.save()
+		if getattr(obj, self.name, None) != value:
+			setattr(obj, self.name, value)
+			obj.mark_dirty()
 	
 	def from_str(self, value: str) -> T:
 		if self.fieldtype != str:
@@ -36,23 +39,61 @@ def field[T](fieldtype: type[T] = str, /, *, to_str: Callable[[T], str] = lambda
 
 
 class ConfigTOML:
+	"""
+	A TOML file backed by FieldTOML attributes. Setting a field saves the file right away, unless it's done in a `batch()`, which saves once on the way out,
+	or in a `batch(save=False)`, which leaves the changes for a later `flush()`.
+	"""
 	tomlpath: Path
+	_dirty: bool = False
+	_batch_depth: int = 0
 	
 	@classmethod
 	def __fields__(cls) -> dict[str, FieldTOML]:
-		return {k: v for k, v in inspect.getmembers(cls) if isinstance(v, FieldTOML)}
+		"""Looked up once per class."""
+		if '_tomlfields' not in cls.__dict__:
+			cls._tomlfields = {k: v for k, v in inspect.getmembers(cls) if isinstance(v, FieldTOML)}
+		return cls.__dict__['_tomlfields']
 	
 	@classmethod
 	def writetoml(cls, path: Path, /, **kwargs) -> Path:
-		path.write_text('\n'.join([f"{name} = {_field.to_str(kwargs[name])}" for name, _field in cls.__fields__().items()]))
+		"""Written next to `path` and renamed over it, so a crash mid-write never leaves a truncated config behind."""
+		temp = path.with_name(f"{path.name}.tmp")
+		temp.write_text('\n'.join([f"{name} = {_field.to_str(kwargs[name])}" for name, _field in cls.__fields__().items()]))
+		os.replace(temp, path)
 		return path
 	
 	def __init__(self, tomlpath: Path, /):
 		self.tomlpath = tomlpath
 		self.load()
 	
+	@property
+	def dirty(self) -> bool:
+		return self._dirty
+	
+	def mark_dirty(self):
+		self._dirty = True
+		if self._batch_depth == 0:
+			self.save()
+	
+	@contextmanager
+	def batch(self, save: bool = True) -> Iterator[ConfigTOML]:
+		"""Groups field sets into a single write when the outermost batch exits, or none at all with `save=False`."""
+		self._batch_depth += 1
+		try:
+			yield self
+		finally:
+			self._batch_depth -= 1
+			if save and self._batch_depth == 0:
+				self.flush()
+	
+	def flush(self):
+		"""Saves if anything changed since the last save."""
+		if self._dirty:
+			self.save()
+	
 	def save(self):
 		self.writetoml(self.tomlpath, **{name: getattr(self, name) for name in self.__fields__().keys()})
+		self._dirty = False
 	
 	def load(self):
 		if self.tomlpath.suffix != '.toml':
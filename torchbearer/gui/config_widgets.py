@@ -59,6 +59,8 @@ class ConfigWindow(QtWidgets.QDialog):
 	field_path: PathLineEdit
 	field_icon: AspectRatioLabel
 	
+	save_tmr: QtCore.QTimer
+	
 	cfgChanged = QtCore.Signal()
 	
 	def __init__(self, cfg: AppConfig):
@@ -114,6 +116,10 @@ class ConfigWindow(QtWidgets.QDialog):
 		self.field_path.pathChanged.connect(self.updateInstance)
 		self.field_name.editingFinished.connect(self.updateInstance)
 		self.field_vrsn.editingFinished.connect(self.updateInstance)
+		
+		# edits are kept in memory and written once typing settles down
+		self.save_tmr = QtCore.QTimer(self, singleShot=True, interval=500)
+		self.save_tmr.timeout.connect(self.saveConfigs)
 	
 		# self.dirwatch = QtCore.QFileSystemWatcher(self)
 		# self.dirwatch.addPath(str(self.cfg.conf))
@@ -121,18 +127,36 @@ class ConfigWindow(QtWidgets.QDialog):
 	
 	@QtCore.Slot()
 	def updateApp(self):
-		self.cfg.cach = self.field_cach.path
-		self.cfg.expo = self.field_expo.path
-		self.cfg.conf = self.field_conf.path
+		with self.cfg.batch(save=False):
+			self.cfg.cach = self.field_cach.path
+			self.cfg.expo = self.field_expo.path
+			self.cfg.conf = self.field_conf.path
+		self.save_tmr.start()
 		
 	@QtCore.Slot()
 	def updateInstance(self):
 		instance = self.instance()
-		instance.name = self.field_name.text
-		instance.version = self.field_vrsn.text
-		instance.path = self.field_path.path
+		moved = instance.path != self.field_path.path
+		with instance.batch(save=False):
+			instance.name = self.field_name.text
+			instance.version = self.field_vrsn.text
+			instance.path = self.field_path.path
+		if moved:
+			instance.rediscover()
+		self.save_tmr.start()
 		self.cfgChanged.emit()
 	
+	@QtCore.Slot()
+	def saveConfigs(self):
+		self.save_tmr.stop()
+		self.cfg.flush()
+		for instance in self.cfg.instances.values():
+			instance.flush()
+	
+	def done(self, result: int):
+		self.saveConfigs()
+		super().done(result)
+	
 	@QtCore.Slot()
 	def populateInstances(self):
 		self.listo.clear()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Any, Literal
 
 import qtawesome as qta
 
@@ -11,16 +12,17 @@ from __feature__ import true_property #type: ignore
 from loguru import logger
 
 from torchbearer.gui.config_widgets import ConfigWindow
-from mulch import PathPlus, byter, PassingException, yamldump, TimerLog, Dictable
-from mulch import TexViewerWidget, UserRoles, HexViewer, HexTableView, TexViewer, qGrid, qBox
+from mulch import PathPlus, PassingException, yamldump, TimerLog, Dictable
+from mulch import TexViewerWidget, JobPool, ByteSource, HexViewer, HexTableView, TexViewer, qGrid, qBox
 from mulch.qt.quick import Quick
 
-from torchbearer.northlight_engine.engine import Admin, TreeAdmin, MetaAdmin, DataAdmin, Folder, File
-from torchbearer.northlight_engine.readers import Reader, ReaderNLEv10
-from torchbearer.northlight_engine.configs import AppConfig, InstanceConfig
+from torchbearer.northlight_engine.engine import Admin, TreeAdmin, MetaAdmin, Folder, File
+from torchbearer.northlight_engine.readers import ReaderNLEv10
+from torchbearer.northlight_engine.configs import AppConfig
 from torchbearer.northlight_internal.textures.decider_tex import tex_handler
-from torchbearer.northlight_internal.packmeta import PackMeta
-from torchbearer.northlight_internal.binfile import bin_explorer
+from torchbearer.northlight_internal.textures.texture_service import TextureService
+from torchbearer.northlight_internal.binfile import bin_explorer, BinFileStreamedResource
+from torchbearer.gui.tree_model import PTIModel, PTIFilterProxy, FilterTask
 
 from torchbearer.northlight_internal.textures.nletex_pil import register
 register()
@@ -29,47 +31,60 @@ register()
 # TODO: document everything (it's a mess)
 
 
-extension_icons = {
-	'bin'           : 'fa6s.file-zipper',
-	'binfnt'        : 'fa6s.font',
-	'ttf'           : 'fa6s.font',
-	'otf'           : 'fa6s.font',
-	'wem'           : 'fa6s.file-audio',
-	'bnk'           : 'fa6s.file-video',
-	'tex'           : 'fa6s.file-image',
-	'flare'         : 'fa6s.fire',
-	'bintimeline'   : 'fa6s.file-invoice',
-	'binanimclip'   : 'fa6s.file-invoice',
-	'binanimgraph'  : 'fa6s.file-invoice',
-	'binclothprof'  : 'fa6s.file-invoice',
-	'bineqs'        : 'fa6s.file-invoice',
-	'binfbx'        : 'fa6s.file-invoice',
-	'binlua'        : 'fa6s.file-invoice',
-	'binmotiondb'   : 'fa6s.file-invoice',
-	'binnav'        : 'fa6s.file-invoice',
-	'binragdollprof': 'fa6s.file-invoice',
-	'binshader'     : 'fa6s.file-invoice',
-	'binskeleton'   : 'fa6s.file-invoice',
-	'xml'           : 'fa6s.file-lines',
-	'json'          : 'fa6s.file-lines',
-	'md'            : 'fa6s.file-lines',
-	'xsl'           : 'fa6s.file-lines',
-	'yaml'          : 'fa6s.file-lines',
-	'asset'         : 'fa6s.file-lines',
-	'txt'           : 'fa6s.file-pen',
-	'ui'            : 'fa6s.file-code',
-	'raw'           : 'fa6s.file-circle-xmark',
-	'info'          : 'fa6s.file-contract',
-	'chroma'        : 'fa6s.file-circle-question',
-	'chunk'         : 'fa6s.file-circle-question',
-	'gfxgraph'      : 'fa6s.file-circle-question',
-	'heightfield'   : 'fa6s.file-circle-question',
-	'ivtree'        : 'fa6s.file-circle-question',
-	'material'      : 'fa6s.file-circle-question',
-	'particle'      : 'fa6s.file-circle-question',
-}
-
-class TreePTI(QtWidgets.QTreeWidget):
+def describe_key(subitem) -> tuple[Any, bool]:
+	"""Cache key of `subitem`'s descriptions and whether they can be cached at all: only things tied to an archive path are stable enough."""
+	if isinstance(subitem, (File, Folder)):
+		return (type(subitem).__name__, subitem.admin.path, subitem.index), True
+	elif isinstance(subitem, Admin):
+		return ('Admin', subitem.path), True
+	elif isinstance(subitem, (MetaAdmin, TreeAdmin)):
+		return (type(subitem).__name__, subitem.admin.path), True
+	return (type(subitem).__name__, id(subitem)), False
+
+
+def describe_text(subitem) -> tuple[Literal['markdown', 'plain'], str]:
+	if isinstance(subitem, File):
+		match subitem.name.split('.')[-1]:
+			case 'md':
+				return 'markdown', subitem.data.decode()
+			case 'bin' | 'resources' | 'ui' | 'flare' | 'gfxgraph' | 'particle' | 'rbf' | 'ivtree' | 'binbt' | 'bineqs' | 'binfsm' | 'binapx' | 'binclothprof' | 'binragdollprof' | 'bintimeline' | 'binnav':
+				return 'plain', bin_explorer(subitem.data, subitem.name)
+			case 'txt' | 'json' | 'xml' | 'xsl' | 'yaml' | 'asset' | 'meta':
+				return 'plain', subitem.data.decode()
+			case 'tex':
+				hndlr = tex_handler(subitem)
+				return 'plain', yamldump(hndlr.dict()) if hndlr is not None else ''
+			case _:
+				return 'plain', ''
+	elif isinstance(subitem, MetaAdmin):
+		if subitem.path is not None:
+			return 'plain', yamldump(subitem.packmeta.dict())
+		elif len(subitem.metadata_types) != 0:
+			return 'plain', yamldump(subitem.metadata_types)
+		else:
+			return 'plain', "No packmeta file associated."
+	elif isinstance(subitem, Admin):
+		return 'plain', yamldump({'Extensions'   : subitem.extensions, 'Top-Level Folders': sorted([x.name for x in subitem.tree.fldr if x.depth == 1]),
+		                          'Second Level Folders': sorted({x.name for x in subitem.tree.fldr if x.depth == 2})})
+	return 'plain', ''
+
+
+def describe_hex(subitem) -> ByteSource | None:
+	"""What the hex view reads from, None to leave it as it is. Files and packmetas are read in place, a page at a time as they scroll into view."""
+	if isinstance(subitem, File):
+		return ByteSource.of(subitem.range_reader())
+	elif isinstance(subitem, ReaderNLEv10):
+		return ByteSource.of(subitem.uhd)
+	elif isinstance(subitem, MetaAdmin):
+		return ByteSource.of(subitem.path) if subitem.path is not None else None
+	return ByteSource.of(b'')
+
+
+def describe_other(subitem) -> str:
+	return yamldump(subitem.dict()) if isinstance(subitem, Dictable) else ''
+
+
+class TreePTI(QtWidgets.QTreeView):
 	menu_ctx: QtWidgets.QMenu
 	
 	action_exportf: QtGui.QAction
@@ -78,16 +93,23 @@ class TreePTI(QtWidgets.QTreeWidget):
 	action_clrtree: QtGui.QAction
 	action_cllapse: QtGui.QAction
 	
+	pti_model: PTIModel
+	proxy: PTIFilterProxy
+	textures: TextureService
+	
 	def __init__(self, headers: list[str], /, *, parent: QtWidgets.QWidget | None = None,):
-		super().__init__(parent, columnCount=len(headers))
+		super().__init__(parent)
+		self.pti_model = PTIModel(headers, self)
+		self.proxy = PTIFilterProxy(self)
+		self.proxy.setSourceModel(self.pti_model)
+		self.setModel(self.proxy)
+		self.textures = TextureService()
 		self.indentation = 10
 		self.uniformRowHeights = True
 		self.selectionMode = QtWidgets.QAbstractItemView.SelectionMode.SingleSelection
 		self.sizeAdjustPolicy = QtWidgets.QAbstractScrollArea.SizeAdjustPolicy.AdjustToContents
-		for i, x in enumerate(headers):
-			self.model().setHeaderData(i, QtCore.Qt.Orientation.Horizontal, x)
+		for i in range(len(headers)):
 			self.header().setSectionResizeMode(i, QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
-		self.model().headerDataChanged.emit(QtCore.Qt.Orientation.Horizontal, 0, len(headers) - 1)
 		self.menu_ctx = QtWidgets.QMenu(self)
 		self.contextMenuPolicy = QtCore.Qt.ContextMenuPolicy.DefaultContextMenu
 		
@@ -96,7 +118,7 @@ class TreePTI(QtWidgets.QTreeWidget):
 		self.action_preview = Quick.action(self, self.menu_ctx, 'Preview', self.load_image_preview)
 		self.menu_ctx.addSeparator()
 		self.action_clrtree = Quick.action(self, self.menu_ctx, 'Clear Tree', self.tree_clear, icon=qta.icon('fa6s.eraser'))
-		self.action_cllapse = Quick.action(self, self.menu_ctx, 'Collapse', lambda: self.selection().setExpanded(False))
+		self.action_cllapse = Quick.action(self, self.menu_ctx, 'Collapse', lambda: self.collapse(self.selection()))
 		
 	def contextMenuEvent(self, event: QtGui.QContextMenuEvent):
 		subitem = self.ptisel()
@@ -122,27 +144,21 @@ class TreePTI(QtWidgets.QTreeWidget):
 		event.ignore()
 		return False
 	
-	def selection(self) -> QtWidgets.QTreeWidgetItem:
-		selected = self.selectedItems()
+	def selection(self) -> QtCore.QModelIndex:
+		selected = self.selectionModel().selectedRows()
 		if not len(selected) == 1:
 			raise PassingException("contextMenuEvent", f"A single item is not selected (selections: {len(selected)}).")
 		return selected[0]
 	
 	def ptisel(self):
-		return self.selection().data(0, UserRoles.PTI)
-	
-	def nested_children(self, item: QtWidgets.QTreeWidgetItem):
-		for ci in range(item.childCount()):
-			child = item.child(ci)
-			yield from self.nested_children(child)
-			yield child
+		return self.proxy.item(self.selection())
 	
 	@QtCore.Slot()
 	def tree_clear(self) -> None:
-		item = self.selection()
-		for x in list(self.nested_children(item)):
-			x.parent().removeChild(x)
-		subitem = item.data(0, UserRoles.PTI)
+		index = self.selection()
+		subitem = self.proxy.item(index)
+		self.collapse(index)
+		self.pti_model.clear_children(self.proxy.mapToSource(index))
 		if isinstance(subitem, Admin):
 			subitem.clear()
 	
@@ -150,11 +166,15 @@ class TreePTI(QtWidgets.QTreeWidget):
 	def load_image_preview(self):
 		subitem = self.ptisel()
 		if isinstance(subitem, File):
-			if not subitem.is_exported:
-				subitem.export()
-			popup = TexViewer()
-			popup.updateImage(subitem.export_path)
-			popup.show()
+			try:
+				img = self.textures.decode(subitem)
+			except (NotImplementedError, OSError, SyntaxError, ValueError) as err:
+				logger.error(f"Can't show image preview of {subitem.name}: {err}")
+				return
+			if img is not None:
+				popup = TexViewer()
+				popup.updateImageData(img, subitem.name)
+				popup.show()
 	
 	@QtCore.Slot()
 	def export_file(self) -> None:
@@ -185,6 +205,12 @@ class MainTree(QtWidgets.QWidget):
 	fltr_txt: QtWidgets.QLineEdit
 	fltr_col: QtWidgets.QComboBox
 	fltr_eql: QtWidgets.QToolButton
+	fltr_tmr: QtCore.QTimer
+	
+	jobs: JobPool
+	
+	_fltr_gen: int
+	_fltr_tasks: dict[int, FilterTask]     # running searches by generation, kept alive until they finish
 	
 	l_body: qBox
 	r_body: qGrid
@@ -196,19 +222,28 @@ class MainTree(QtWidgets.QWidget):
 		super().__init__()
 		self.appcfg = appcfg
 		self.headers = ["Name", "Extension", "File Size", "Type"]
+		BinFileStreamedResource.bind_datapairs(self.appcfg.cach / 'streamed_datapairs.json')
 
 		with TimerLog("MapTree - tree init"):
 			self.tree_pti = TreePTI(self.headers)
 			self.load_instances()
-			self.tree_pti.itemSelectionChanged.connect(self.updateDesc)
+			self.tree_pti.selectionModel().selectionChanged.connect(self.updateDesc)
 
 		with TimerLog("MapTree - widget init"):
+			self.jobs = JobPool(cache_size=32, parent=self)
+			self.jobs.finished.connect(self.job_finished)
+			self.jobs.failed.connect(self.job_failed)
 			self.desc_txt = Quick.txtview()
 			self.desc_oth = Quick.txtview()
 			self.desc_hex = HexViewer()
 			self.desc_img = TexViewerWidget()
 			self.fltr_txt = QtWidgets.QLineEdit(clearButtonEnabled=True, placeholderText='Search...')
+			self.fltr_tmr = QtCore.QTimer(self, singleShot=True, interval=250)
+			self.fltr_tmr.timeout.connect(self.filter_items)
+			self.fltr_txt.textChanged.connect(self.fltr_tmr.start)
 			self.fltr_txt.editingFinished.connect(self.filter_items)
+			self._fltr_gen = 0
+			self._fltr_tasks = dict()
 			self.fltr_txt.setContentsMargins(0, 0, 0, 0)
 			self.fltr_col = Quick.combobox(*self.headers, indexChanged=self.filter_items)
 			self.fltr_eql = Quick.toolbutton_check(self.filter_items, toolTip='Enable Strict Filtering', icon=qta.icon('fa6s.underline'))
@@ -229,87 +264,36 @@ class MainTree(QtWidgets.QWidget):
 		self.r_body.replaceWidget(self._ru_widget, widget)
 		self._ru_widget = widget
 	
-	def pti_factory(self, item, parent: QtWidgets.QTreeWidgetItem | None = None) -> QtWidgets.QTreeWidgetItem:
-		qtwi = QtWidgets.QTreeWidgetItem(parent)
-		qtwi.setData(0, UserRoles.PTI, item)
-
-		if isinstance(item, InstanceConfig):
-			qtwi.setIcon(0, QtGui.QIcon(f"./torchbearer/style/{item.tomlpath.stem}.svg"))
-		elif isinstance(item, Reader):
-			qtwi.setIcon(0, qta.icon('fa6s.barcode'))
-		elif isinstance(item, Admin):
-			qtwi.setIcon(0, qta.icon('fa6s.box-archive'))
-		elif isinstance(item, TreeAdmin):
-			qtwi.setIcon(0, qta.icon('fa6s.folder-tree'))
-		elif isinstance(item, DataAdmin):
-			qtwi.setIcon(0, qta.icon('fa6s.sitemap'))
-		elif isinstance(item, MetaAdmin):
-			qtwi.setIcon(0, qta.icon('fa6s.square-binary'))
-		elif isinstance(item, File):
-			qtwi.setIcon(0, qta.icon(extension_icons.get(item.extension, 'fa6.file')))
-		elif isinstance(item, Folder):
-			qtwi.setIcon(0, qta.icon('fa6s.folder', color=QtGui.QColor(0xFF, 0xD9, 0x60)))
-
-		for i, key in enumerate(self.headers):
-			val = None
-			match key:
-				case 'Name':
-					if isinstance(item, (InstanceConfig, Folder, File, Admin, Path)):
-						val = item.name if item.name != '' else '<EmptyName>'
-					elif isinstance(item, TreeAdmin):
-						val = "Filesystem"
-					elif isinstance(item, DataAdmin):
-						val = "Archives"
-					elif isinstance(item, MetaAdmin):
-						val = "Metadata"
-					elif isinstance(item, Reader):
-						val = "Reader"
-				case 'Extension':
-					if isinstance(item, Path):
-						val = item.suffix[1:]
-					elif hasattr(item, "extension"):
-						val = item.extension
-				case 'File Size':
-					if isinstance(item, (InstanceConfig, Admin, File)):
-						val = byter(len(item))
-					elif isinstance(item, Path):
-						val = byter(item.stat().st_size)
-			if val is not None:
-				qtwi.setData(i, QtCore.Qt.ItemDataRole.DisplayRole, val)
-		return qtwi
-	
 	@QtCore.Slot()
 	def filter_items(self) -> None:
-		mdl = self.tree_pti.model()
-		headerdict = {mdl.headerData(i, QtCore.Qt.Orientation.Horizontal): i for i in range(mdl.columnCount())}
-		with TimerLog(f"Executing filter on tree"):
-			if self.fltr_txt.text == '':
-				for x in QtWidgets.QTreeWidgetItemIterator(self.tree_pti, flags=QtWidgets.QTreeWidgetItemIterator.IteratorFlag.Hidden):
-					x.value().setHidden(False)
-			else:
-				for tli in [self.tree_pti.topLevelItem(i) for i in range(self.tree_pti.topLevelItemCount)]:
-					for item in self.tree_pti.nested_children(tli):
-						subitem = item.data(0, UserRoles.PTI)
-						if isinstance(subitem, File):
-							if self.fltr_eql.checked:
-								decision = item.text(headerdict[self.fltr_col.currentText]) != self.fltr_txt.text
-							else:
-								decision = self.fltr_txt.text not in item.text(headerdict[self.fltr_col.currentText])
-						elif isinstance(subitem, Folder):
-							decision = True
-							for kid in [item.child(ci) for ci in range(item.childCount())]:
-								if not kid.isHidden():
-									decision = False
-									break
-						else:
-							continue
-						if item.isHidden() != decision:
-							item.setHidden(decision)
+		self.fltr_tmr.stop()
+		self._fltr_gen += 1
+		self.tree_pti.proxy.reset_results(self.fltr_txt.text != '')
+		if self.fltr_txt.text == '':
+			return
+		# only archives whose filesystem has been mapped can be searched, the rest has nothing loaded to hide anyway
+		trees = [admin.tree for instance in self.appcfg.instances.values() for admin in instance.admindict.values() if admin.is_mapped]
+		task = FilterTask(self._fltr_gen, trees, self.fltr_col.currentText, self.fltr_txt.text, self.fltr_eql.checked)
+		task.signals.result.connect(self.filter_result)
+		task.signals.finished.connect(self.filter_finished)
+		task.setAutoDelete(False)
+		self._fltr_tasks[self._fltr_gen] = task
+		QtCore.QThreadPool.globalInstance().start(task)
+	
+	@QtCore.Slot(int, object, object, object)
+	def filter_result(self, generation: int, tree: TreeAdmin, files, folders) -> None:
+		if generation == self._fltr_gen:
+			self.tree_pti.proxy.add_results(tree, files, folders)
+			logger.info(f"Filter matched {int(files.sum())} files in {tree.admin.name}")
+	
+	@QtCore.Slot(int)
+	def filter_finished(self, generation: int) -> None:
+		self._fltr_tasks.pop(generation, None)
 	
 	@QtCore.Slot()
 	def updateDesc(self) -> None:
 		item = self.tree_pti.selection()
-		subitem = item.data(0, UserRoles.PTI)
+		subitem = self.tree_pti.proxy.item(item)
 		
 		if isinstance(subitem, File):
 			if subitem.name.split('.')[-1] in ['tex', 'dds']:
@@ -327,108 +311,69 @@ class MainTree(QtWidgets.QWidget):
 		self.updateDesc_Other(subitem)
 
 	def updateDesc_Text(self, subitem) -> None:
-		if isinstance(subitem, File):
-			match subitem.name.split('.')[-1]:
-				case 'md':
-					self.desc_txt.markdown = subitem.data.decode()
-				case 'bin' | 'resources' | 'ui' | 'flare' | 'gfxgraph' | 'particle' | 'rbf' | 'ivtree' | 'binbt' | 'bineqs' | 'binfsm' | 'binapx' | 'binclothprof' | 'binragdollprof' | 'bintimeline' | 'binnav':
-					self.desc_txt.plainText = bin_explorer(subitem.data, subitem.name)
-				case 'txt' | 'json' | 'xml' | 'xsl' | 'yaml' | 'asset' | 'meta':
-					self.desc_txt.plainText = subitem.data.decode()
-				case 'tex':
-					hndlr = tex_handler(subitem)
-					if hndlr is not None:
-						self.desc_txt.plainText = yamldump(hndlr.dict())
-					else:
-						self.desc_txt.plainText = ''
-				case _:
-					self.desc_txt.plainText = ''
-		elif isinstance(subitem, MetaAdmin):
-			if subitem.path is not None:
-				self.desc_txt.plainText = yamldump(PackMeta(subitem.path, subitem.admin.reader().version_minor).dict())
-			elif len(subitem.metadata_types) != 0:
-				self.desc_txt.plainText = yamldump(subitem.metadata_types)
-			else:
-				self.desc_txt.plainText = "No packmeta file associated."
-		elif isinstance(subitem, Admin):
-			self.desc_txt.plainText = yamldump({'Extensions'   : subitem.extensions, 'Top-Level Folders': sorted([x.name for x in subitem.tree.fldr if x.depth == 1]),
-			                             'Second Level Folders': sorted({x.name for x in subitem.tree.fldr if x.depth == 2})})
-		else:
-			self.desc_txt.plainText = ''
+		key, cache = describe_key(subitem)
+		if not self.jobs.submit('text', key, describe_text, subitem, cache=cache):
+			self.desc_txt.plainText = "Loading..."
 	
 	def updateDesc_Image(self, subitem) -> None:
 		if isinstance(subitem, File):
 			if subitem.name.split('.')[-1] in ['tex', 'dds']:
-				logger.info('update image pls')
-				if not subitem.is_exported:
-					subitem.export()
-				self.desc_img.updateImage(subitem.export_path)
+				key, _ = describe_key(subitem)
+				self.jobs.submit('image', key, self.tree_pti.textures.thumbnail, subitem, cache=False)
 		
-	def updateDesc_Gen(self, item: QtWidgets.QTreeWidgetItem, subitem) -> None:
+	def updateDesc_Gen(self, item: QtCore.QModelIndex, subitem) -> None:
+		# expanding is all it takes, the model looks children up when the view first asks for them
 		if isinstance(subitem, Admin):
 			if not subitem.is_set:
-				self.pti_factory(subitem.reader(), item)
-				self.pti_factory(subitem.data, item)
-				self.pti_factory(subitem.meta, item)
-				self.pti_factory(subitem.tree, item)
-				item.setExpanded(True)
+				self.tree_pti.expand(item)
 		elif isinstance(subitem, TreeAdmin):
-			if item.childCount() == 0:
-				genlist_d = dict()
-				dlg = QtWidgets.QProgressDialog(self, labelText=f"Loading filemap tree for {subitem.admin.path.stem}...", maximum=300, autoClose=False, value=0, autoReset=False, minimumDuration=100)
-				dlg.windowTitle = "Torchbearer Tree Mapper"
-				dlg.setModal(True)
-				dlg.minimumWidth = 400
-				dlg.open()
-				dlg.show()
-				for d in subitem.fldr:
-					genlist_d[d.index] = self.pti_factory(d, item if d.index == 0 and d.parent_idx <= 0 else genlist_d[d.parent_idx])
-				dlg.value += 100
-				genlist_f = {f.index: self.pti_factory(f, genlist_d[f.parent_idx]) for f in subitem.file}
-				dlg.value += 100
-				for it in [*genlist_d.values(), *genlist_f.values()]:
-					it.setExpanded(True)
-				item.setExpanded(True)
-				logger.info(f'Finished tree generation for {subitem.admin.name}, generated {len(genlist_d)} folders and {len(genlist_f)} files')
-				if dlg.wasCanceled:
-					logger.info('Treegen - I got cancelled! Clearing...')
-					for i in genlist_d.values():
-						item.removeChild(i)
-				dlg.close()
+			mdl = self.tree_pti.proxy
+			if mdl.canFetchMore(item):
+				mdl.fetchMore(item)
+			self.tree_pti.expand(item)
+			root = mdl.index(0, 0, item)
+			if root.isValid():
+				self.tree_pti.expand(root)
 		
 	def updateDesc_Other(self, subitem) -> None:
-		if isinstance(subitem, File):
-			self.desc_hex.load(subitem.data)
-		elif isinstance(subitem, ReaderNLEv10):
-			self.desc_hex.load(subitem.uhd)
-		elif isinstance(subitem, MetaAdmin):
-			if subitem.path is not None:
-				self.desc_hex.load(subitem.path.read_bytes())
-		else:
-			self.desc_hex.bytedata = b''
-		
-		if isinstance(subitem, Dictable):
-			self.desc_oth.plainText = yamldump(subitem.dict())
-		else:
-			self.desc_oth.plainText = ''
+		key, cache = describe_key(subitem)
+		if (source := describe_hex(subitem)) is not None:
+			self.desc_hex.load(source)
+		if not self.jobs.submit('other', key, describe_other, subitem, cache=cache):
+			self.desc_oth.plainText = "Loading..."
+	
+	@QtCore.Slot(str, object, object)
+	def job_finished(self, channel: str, key, result) -> None:
+		match channel:
+			case 'text':
+				kind, text = result
+				if kind == 'markdown':
+					self.desc_txt.markdown = text
+				else:
+					self.desc_txt.plainText = text
+			case 'image':
+				if result is not None:
+					self.desc_img.updateImage(result)
+				else:
+					self.desc_img.reset()
+			case 'other':
+				self.desc_oth.plainText = result
+	
+	@QtCore.Slot(str, object, str)
+	def job_failed(self, channel: str, key, error: str) -> None:
+		match channel:
+			case 'text':
+				self.desc_txt.plainText = error
+			case 'image':
+				self.desc_img.reset()
+			case 'other':
+				self.desc_oth.plainText = error
 	
 	@QtCore.Slot()
 	def load_instances(self):
-		for i, item in enumerate([self.tree_pti.topLevelItem(x) for x in range(self.tree_pti.topLevelItemCount)]):
-			for x in list(self.tree_pti.nested_children(item)):
-				x.parent().removeChild(x)
-		self.tree_pti.clear()
+		self.tree_pti.pti_model.set_instances(self.appcfg.instances.values())
 		for instance_name, instance_cfg in self.appcfg.instances.items():
-			instance_pti = self.pti_factory(instance_cfg)
-			for item in instance_cfg.keys:
-				if item in instance_cfg.keys:
-					if item not in instance_cfg.admindict.keys():
-						instance_cfg.admindict[item] = Admin(item, instance_cfg)
-					self.pti_factory(instance_cfg.admindict[item], instance_pti)
-				else:
-					raise KeyError
-			self.tree_pti.addTopLevelItem(instance_pti)
-			logger.info(f"MapTree - manager {instance_name} finished reader init, {len(instance_cfg.files)} files in directory ({len(instance_cfg.keys)} that match filter)")
+			logger.info(f"MapTree - manager {instance_name} finished reader init, {len(instance_cfg.discovery)} candidate files in directory ({len(instance_cfg.keys)} that match filter)")
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import qtawesome as qta
+
+from PySide6 import QtGui, QtCore
+from __feature__ import true_property #type: ignore
+
+from mulch import byter, UserRoles
+
+from torchbearer.northlight_engine.engine import Admin, TreeAdmin, MetaAdmin, DataAdmin, Folder, File
+from torchbearer.northlight_engine.readers import Reader
+from torchbearer.northlight_engine.configs import InstanceConfig
+
+__all__ = [
+	"PTIModel",
+	"PTIFilterProxy",
+	"VFSIndex",
+	"FilterTask",
+	"extension_icons",
+]
+
+
+extension_icons = {
+	'bin'           : 'fa6s.file-zipper',
+	'binfnt'        : 'fa6s.font',
+	'ttf'           : 'fa6s.font',
+	'otf'           : 'fa6s.font',
+	'wem'           : 'fa6s.file-audio',
+	'bnk'           : 'fa6s.file-video',
+	'tex'           : 'fa6s.file-image',
+	'flare'         : 'fa6s.fire',
+	'bintimeline'   : 'fa6s.file-invoice',
+	'binanimclip'   : 'fa6s.file-invoice',
+	'binanimgraph'  : 'fa6s.file-invoice',
+	'binclothprof'  : 'fa6s.file-invoice',
+	'bineqs'        : 'fa6s.file-invoice',
+	'binfbx'        : 'fa6s.file-invoice',
+	'binlua'        : 'fa6s.file-invoice',
+	'binmotiondb'   : 'fa6s.file-invoice',
+	'binnav'        : 'fa6s.file-invoice',
+	'binragdollprof': 'fa6s.file-invoice',
+	'binshader'     : 'fa6s.file-invoice',
+	'binskeleton'   : 'fa6s.file-invoice',
+	'xml'           : 'fa6s.file-lines',
+	'json'          : 'fa6s.file-lines',
+	'md'            : 'fa6s.file-lines',
+	'xsl'           : 'fa6s.file-lines',
+	'yaml'          : 'fa6s.file-lines',
+	'asset'         : 'fa6s.file-lines',
+	'txt'           : 'fa6s.file-pen',
+	'ui'            : 'fa6s.file-code',
+	'raw'           : 'fa6s.file-circle-xmark',
+	'info'          : 'fa6s.file-contract',
+	'chroma'        : 'fa6s.file-circle-question',
+	'chunk'         : 'fa6s.file-circle-question',
+	'gfxgraph'      : 'fa6s.file-circle-question',
+	'heightfield'   : 'fa6s.file-circle-question',
+	'ivtree'        : 'fa6s.file-circle-question',
+	'material'      : 'fa6s.file-circle-question',
+	'particle'      : 'fa6s.file-circle-question',
+}
+
+
+@dataclass(slots=True)
+class PTINode:
+	item:       Any
+	parent:     int                             # node id, 0 is the invisible root
+	row:        int
+	children:   list[int]                       = field(default_factory=list)
+	count:      int | None                      = None  # children available, None until the item's children are looked up
+	getter:     Callable[[int], Any] | None     = None  # n-th child of the item
+
+
+class PTIModel(QtCore.QAbstractItemModel):
+	"""Lazy model over instances, archives and their VFS tables.
+
+	Nothing below a node is looked at until the view asks for it: children are resolved from the folders' child id lists a batch at a time through
+	`canFetchMore`/`fetchMore`, and every cell is computed in `data` on demand, so opening an archive only ever costs what is on screen."""
+	headers: list[str]
+	batch: int
+	_nodes: dict[int, PTINode]
+	_next_id: int
+	_icons: dict[str, QtGui.QIcon]
+
+	def __init__(self, headers: list[str], parent: QtCore.QObject | None = None, *, batch: int = 1000):
+		super().__init__(parent)
+		self.headers = headers
+		self.batch = batch
+		self._nodes = {0: PTINode(None, -1, 0, count=0)}
+		self._next_id = 1
+		self._icons = dict()
+
+	# Structure
+
+	def set_instances(self, instances: Iterable[InstanceConfig]):
+		instances = list(instances)
+		self.beginResetModel()
+		self._nodes = {0: PTINode(None, -1, 0, count=len(instances), getter=instances.__getitem__)}
+		self._next_id = 1
+		self._append(0, len(instances))
+		self.endResetModel()
+
+	@staticmethod
+	def children_of(item) -> tuple[int, Callable[[int], Any]] | None:
+		"""(count, getter) of `item`'s children, None if it can't have any. Looking up an Admin's children opens its archive."""
+		if isinstance(item, InstanceConfig):
+			admins = item.admins()
+			return len(admins), admins.__getitem__
+		elif isinstance(item, Admin):
+			sections = [item.reader(), item.data, item.meta, item.tree]
+			return len(sections), sections.__getitem__
+		elif isinstance(item, TreeAdmin):
+			return (1, lambda i: item.fldr[0]) if len(item.fldr) != 0 else (0, lambda i: None)
+		elif isinstance(item, Folder):
+			folders = [x for x in item.children_d_ids if x != item.index]
+			files = item.children_f_ids
+			return len(folders) + len(files), lambda i: item.admin.tree.fldr[folders[i]] if i < len(folders) else item.admin.tree.file[files[i - len(folders)]]
+		return None
+
+	@staticmethod
+	def may_have_children(item) -> bool:
+		if isinstance(item, (InstanceConfig, Admin, TreeAdmin)):
+			return True
+		elif isinstance(item, Folder):
+			return item.size != 0
+		return False
+
+	def _resolve(self, node: PTINode):
+		if node.count is None:
+			node.count, node.getter = self.children_of(node.item) or (0, None)
+
+	def _append(self, node_id: int, n: int):
+		node = self._nodes[node_id]
+		for row in range(len(node.children), len(node.children) + n):
+			self._nodes[self._next_id] = PTINode(node.getter(row), node_id, row)
+			node.children.append(self._next_id)
+			self._next_id += 1
+
+	def node(self, index: QtCore.QModelIndex) -> PTINode:
+		return self._nodes[index.internalId()] if index.isValid() else self._nodes[0]
+
+	def item(self, index: QtCore.QModelIndex):
+		return self.node(index).item if index.isValid() else None
+
+	def node_index(self, node_id: int) -> QtCore.QModelIndex:
+		if node_id == 0:
+			return QtCore.QModelIndex()
+		return self.createIndex(self._nodes[node_id].row, 0, node_id)
+
+	def walk(self, node_id: int = 0) -> Iterable[tuple[int, PTINode]]:
+		"""(id, node) of every loaded node under `node_id`, children before their parents."""
+		for child in self._nodes[node_id].children:
+			yield from self.walk(child)
+			yield child, self._nodes[child]
+
+	def clear_children(self, index: QtCore.QModelIndex):
+		"""Drops everything loaded under `index`, the next expansion looks its children up again."""
+		node_id = index.internalId() if index.isValid() else 0
+		node = self._nodes[node_id]
+		if len(node.children) != 0:
+			self.beginRemoveRows(index, 0, len(node.children) - 1)
+			for x, _ in list(self.walk(node_id)):
+				del self._nodes[x]
+			node.children.clear()
+			node.count, node.getter = None, None
+			self.endRemoveRows()
+		else:
+			node.count, node.getter = None, None
+
+	# QAbstractItemModel
+
+	def index(self, row: int, column: int, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:
+		node = self.node(parent)
+		if 0 <= row < len(node.children) and 0 <= column < len(self.headers):
+			return self.createIndex(row, column, node.children[row])
+		return QtCore.QModelIndex()
+
+	def parent(self, index: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:
+		if not index.isValid():
+			return QtCore.QModelIndex()
+		return self.node_index(self._nodes[index.internalId()].parent)
+
+	def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+		if parent.isValid() and parent.column() != 0:
+			return 0
+		return len(self.node(parent).children)
+
+	def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+		return len(self.headers)
+
+	def hasChildren(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+		if parent.isValid() and parent.column() != 0:
+			return False
+		node = self.node(parent)
+		if node.count is None:
+			return self.may_have_children(node.item)
+		return node.count != 0
+
+	def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+		if parent.isValid() and parent.column() != 0:
+			return False
+		node = self.node(parent)
+		if node.count is None:
+			return self.may_have_children(node.item)
+		return len(node.children) < node.count
+
+	def fetchMore(self, parent: QtCore.QModelIndex):
+		if parent.isValid() and parent.column() != 0:
+			return
+		node = self.node(parent)
+		self._resolve(node)
+		n = min(self.batch, node.count - len(node.children))
+		if n <= 0:
+			return
+		self.beginInsertRows(parent, len(node.children), len(node.children) + n - 1)
+		self._append(parent.internalId() if parent.isValid() else 0, n)
+		self.endInsertRows()
+
+	def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+		if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole and section < len(self.headers):
+			return self.headers[section]
+		return None
+
+	def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlag:
+		if not index.isValid():
+			return QtCore.Qt.ItemFlag.NoItemFlags
+		return QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsSelectable
+
+	def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+		if not index.isValid():
+			return None
+		item = self._nodes[index.internalId()].item
+		if role == QtCore.Qt.ItemDataRole.DisplayRole:
+			return self.text(item, self.headers[index.column()])
+		elif role == QtCore.Qt.ItemDataRole.DecorationRole and index.column() == 0:
+			return self.icon(item)
+		elif role == UserRoles.PTI:
+			return item
+		return None
+
+	# Cells
+
+	@staticmethod
+	def text(item, key: str) -> str | None:
+		match key:
+			case 'Name':
+				if isinstance(item, (InstanceConfig, Folder, File, Admin, Path)):
+					return item.name if item.name != '' else '<EmptyName>'
+				elif isinstance(item, TreeAdmin):
+					return "Filesystem"
+				elif isinstance(item, DataAdmin):
+					return "Archives"
+				elif isinstance(item, MetaAdmin):
+					return "Metadata"
+				elif isinstance(item, Reader):
+					return "Reader"
+			case 'Extension':
+				if isinstance(item, Path):
+					return item.suffix[1:]
+				elif hasattr(item, "extension"):
+					return item.extension
+			case 'File Size':
+				if isinstance(item, (InstanceConfig, Admin, File)):
+					return byter(len(item))
+				elif isinstance(item, Path):
+					return byter(item.stat().st_size)
+		return None
+
+	def icon(self, item) -> QtGui.QIcon | None:
+		"""Icons are made once per extension/kind and shared, qtawesome icons are not cheap to build."""
+		if isinstance(item, InstanceConfig):
+			key, make = f"instance:{item.tomlpath.stem}", lambda: QtGui.QIcon(f"./torchbearer/style/{item.tomlpath.stem}.svg")
+		elif isinstance(item, Reader):
+			key, make = 'reader', lambda: qta.icon('fa6s.barcode')
+		elif isinstance(item, Admin):
+			key, make = 'admin', lambda: qta.icon('fa6s.box-archive')
+		elif isinstance(item, TreeAdmin):
+			key, make = 'tree', lambda: qta.icon('fa6s.folder-tree')
+		elif isinstance(item, DataAdmin):
+			key, make = 'data', lambda: qta.icon('fa6s.sitemap')
+		elif isinstance(item, MetaAdmin):
+			key, make = 'meta', lambda: qta.icon('fa6s.square-binary')
+		elif isinstance(item, File):
+			name = extension_icons.get(item.extension, 'fa6.file')
+			key, make = name, lambda: qta.icon(name)
+		elif isinstance(item, Folder):
+			key, make = 'folder', lambda: qta.icon('fa6s.folder', color=QtGui.QColor(0xFF, 0xD9, 0x60))
+		else:
+			return None
+		if key not in self._icons:
+			self._icons[key] = make()
+		return self._icons[key]
+
+
+class VFSIndex:
+	"""Per-column text of every file of a TreeAdmin as numpy string arrays, plus the folder hierarchy as parent arrays, so a filter is a few vectorized passes.
+
+	Columns are built on first use and kept for as long as the tree is, see `of`."""
+	tree: TreeAdmin
+	file_parents: np.ndarray    # folder index of every file
+	fldr_parents: np.ndarray    # parent folder index of every folder, -1 for the root
+	_columns: dict[str, np.ndarray]
+
+	_cache: weakref.WeakKeyDictionary[TreeAdmin, VFSIndex] = weakref.WeakKeyDictionary()
+
+	def __init__(self, tree: TreeAdmin):
+		self.tree = tree
+		self.file_parents = np.fromiter((x.parent_idx for x in tree.file.mapping.values()), dtype=np.int64, count=len(tree.file))
+		self.fldr_parents = np.fromiter((-1 if x.parent is None else x.parent_idx for x in tree.fldr.mapping.values()), dtype=np.int64, count=len(tree.fldr))
+		self._columns = dict()
+
+	@classmethod
+	def of(cls, tree: TreeAdmin) -> VFSIndex:
+		if tree not in cls._cache:
+			cls._cache[tree] = cls(tree)
+		return cls._cache[tree]
+
+	def column(self, key: str) -> np.ndarray:
+		if key not in self._columns:
+			self._columns[key] = np.array([PTIModel.text(x, key) or '' for x in self.tree.file.mapping.values()], dtype=str)
+		return self._columns[key]
+
+	def match(self, key: str, text: str, strict: bool = False) -> tuple[np.ndarray, np.ndarray]:
+		"""Boolean masks of (files matching `text` in column `key`, folders holding any of them at any depth)."""
+		column = self.column(key)
+		files = column == text if strict else np.char.find(column, text) != -1
+		folders = np.zeros(len(self.fldr_parents), dtype=bool)
+		frontier = np.unique(self.file_parents[files])
+		while len(frontier) != 0:
+			frontier = frontier[(frontier >= 0) & ~folders[np.maximum(frontier, 0)]]
+			folders[frontier] = True
+			frontier = np.unique(self.fldr_parents[frontier])
+		return files, folders
+
+
+class PTIFilterProxy(QtCore.QSortFilterProxyModel):
+	"""Hides files and folders that are not part of the current filter results, everything else always shows.
+
+	Results come in per TreeAdmin as the search gets to them, trees without results yet show unfiltered."""
+	active: bool
+	_results: dict[int, tuple[np.ndarray, np.ndarray]]     # id(TreeAdmin) -> file mask, folder mask
+
+	def __init__(self, parent: QtCore.QObject | None = None):
+		super().__init__(parent)
+		self.active = False
+		self._results = dict()
+
+	def item(self, index: QtCore.QModelIndex):
+		return self.sourceModel.item(self.mapToSource(index))
+
+	def reset_results(self, active: bool):
+		self.active = active
+		self._results.clear()
+		self.invalidateRowsFilter()
+
+	def add_results(self, tree: TreeAdmin, files: np.ndarray, folders: np.ndarray):
+		self._results[id(tree)] = (files, folders)
+		self.invalidateRowsFilter()
+
+	def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+		if not self.active:
+			return True
+		item = self.sourceModel.item(self.sourceModel.index(source_row, 0, source_parent))
+		if isinstance(item, (File, Folder)):
+			results = self._results.get(id(item.admin.tree))
+			if results is not None:
+				return bool(results[0 if isinstance(item, File) else 1][item.index])
+		return True
+
+
+class FilterSignals(QtCore.QObject):
+	result = QtCore.Signal(int, object, object, object)    # generation, tree, file mask, folder mask
+	finished = QtCore.Signal(int)
+
+
+class FilterTask(QtCore.QRunnable):
+	"""Matches a filter against a set of trees on the thread pool, emitting each tree's masks as soon as they're done.
+
+	`generation` tags every result, receivers drop the ones of a search that has since been replaced."""
+	signals: FilterSignals
+
+	def __init__(self, generation: int, trees: list[TreeAdmin], key: str, text: str, strict: bool):
+		super().__init__()
+		self.signals = FilterSignals()
+		self.generation = generation
+		self.trees = trees
+		self.key = key
+		self.text = text
+		self.strict = strict
+
+	def run(self):
+		for tree in self.trees:
+			files, folders = VFSIndex.of(tree).match(self.key, self.text, self.strict)
+			self.signals.result.emit(self.generation, tree, files, folders)
+		self.signals.finished.emit(self.generation)
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 from mulch.toml import ConfigTOML, field
+from torchbearer.northlight_engine.discovery import Discovery
 
 if TYPE_CHECKING:
 	from torchbearer.northlight_engine.engine import Admin
@@ -89,16 +90,35 @@ class InstanceConfig(ConfigTOML):
 		self.app.instances[tomlpath.stem] = self
 
 	@cached_property
+	def discovery(self) -> Discovery:
+		return Discovery(self.path, self.app.cach / self.key / 'discovery.json')
+	
+	def rediscover(self):
+		"""Walks the install again, only rescanning directories that changed since."""
+		for k in ['discovery', 'keys']:
+			self.__dict__.pop(k, None)
+	
+	@property
 	def files(self) -> list[Path]:
-		return [z for z in self.path.rglob("**/*.*") if z.is_file()]
+		"""Archive candidates (.rmdp, .rmdtoc, .bin, .packmeta) of the install, not every file in it."""
+		return self.discovery.paths()
 	
-	@cached_property
+	@property
 	def dir_size(self) -> int:
-		return sum([x.stat().st_size for x in self.files])
+		"""Sized in the background on first access, partial until that's done."""
+		return self.discovery.size
 	
-	@property
-	def keys(self):
-		return [zz for zz in [z for z in self.files if z.suffix[1:] in ['rmdp', 'rmdtoc']] if zz.stat().st_size != 0]
+	@cached_property
+	def keys(self) -> list[Path]:
+		return self.discovery.paths('.rmdp', '.rmdtoc', nonempty=True)
+	
+	def admins(self) -> list[Admin]:
+		"""An Admin per archive of `keys`, opening the ones `admindict` doesn't hold yet."""
+		from torchbearer.northlight_engine.engine import Admin
+		for key in self.keys:
+			if key not in self.admindict.keys():
+				self.admindict[key] = Admin(key, self)
+		return [self.admindict[key] for key in self.keys]
 	
 	def __len__(self):
 		return self.dir_size
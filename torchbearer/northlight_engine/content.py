@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from mulch import ColumnTable, TimerLog, byter
+from torchbearer.northlight_engine.configs import InstanceConfig
+from torchbearer.northlight_engine.engine import Admin, File
+
+__all__ = [
+	"ContentIndex",
+	"hash_file",
+]
+
+
+DIGEST_SIZE = 16
+
+
+def hash_file(file: File) -> tuple:
+	"""One index row for `file`: BLAKE2b of its decompressed data, fed a chunk at a time (hashlib and lz4 both let go of the GIL while at it)."""
+	digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+	for chunk in file.chunks:
+		digest.update(chunk.read())
+	return file.admin.instance.key, file.admin.name, file.index, file.path_raw(), file.out_size, digest.hexdigest()
+
+
+class ContentIndex(ColumnTable):
+	"""
+	Content addressed index of every file in a set of archives, one numpy array per column. Identical files, within an archive, across archives or across
+	games (AW1/AWR, Control and its DLC share plenty), end up with the same digest, see `dict()` for how much that saves and `export()` for cashing in on it.
+	`files` holds the indexed Files when the index was built here rather than loaded, exporting needs them.
+	"""
+	COLUMNS = [
+		('instance', 'U'),
+		('archive', 'U'),
+		('index', '<i4'),
+		('path', 'U'),
+		('size', '<u8'),
+		('digest', f'S{DIGEST_SIZE * 2}'),     # hex, raw digests would lose trailing zero bytes to numpy
+	]
+	ROWS = 'files'
+	files: list[File] | None
+
+	def __init__(self, columns: dict[str, np.ndarray], files: list[File] | None = None):
+		super().__init__(columns)
+		self.files = files
+
+	@classmethod
+	def build(cls, admins: Iterable[Admin], workers: int = 8) -> ContentIndex:
+		files = [f for admin in admins for f in admin.tree.file if len(f.chunks_ids) != 0]
+		with TimerLog(f"ContentIndex - hashed {len(files)} files"):
+			with ThreadPoolExecutor(max_workers=workers) as pool:
+				rows = list(pool.map(hash_file, files))
+		index = cls.from_rows(rows)
+		index.files = files
+		return index
+
+	@classmethod
+	def from_instance(cls, instance: InstanceConfig, workers: int = 8) -> ContentIndex:
+		return cls.build(instance.admins(), workers)
+
+	@classmethod
+	def from_instances(cls, instances: Iterable[InstanceConfig], workers: int = 8) -> ContentIndex:
+		return cls.concat(*[cls.from_instance(x, workers) for x in instances])
+
+	@classmethod
+	def concat(cls, *indices: ContentIndex) -> ContentIndex:
+		index = super().concat(*indices)
+		index.files = [f for x in indices for f in x.files] if all(x.files is not None for x in indices) else None
+		return index
+
+	def where(self, mask: np.ndarray) -> ContentIndex:
+		index = super().where(mask)
+		index.files = [f for f, m in zip(self.files, mask) if m] if self.files is not None else None
+		return index
+
+	def unique(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+		"""(row of each digest's first file, blob number of every row, files per blob), blobs being numbered in digest order."""
+		_, first, inverse, counts = np.unique(self.columns['digest'], return_index=True, return_inverse=True, return_counts=True)
+		return first, inverse, counts
+
+	def duplicates(self) -> dict[str, list[str]]:
+		"""Paths sharing their content, keyed by hex digest, for blobs stored more than once."""
+		_, inverse, counts = self.unique()
+		groups = dict()
+		for row in np.flatnonzero(counts[inverse] > 1):
+			groups.setdefault(self.columns['digest'][row].decode(), list()).append(f"{self.columns['archive'][row]}:{self.columns['path'][row]}")
+		return groups
+
+	def blob_path(self, cas: Path, digest: bytes) -> Path:
+		name = digest.decode()
+		return cas / name[:2] / name
+
+	def export(self, cas: Path, link: bool = True) -> dict:
+		"""
+		Writes every unique blob once into the content addressed store at `cas` (blobs already in there at the right size are left alone), then, with `link`, hardlinks each
+		file's regular export path to its blob. Falls back to copying where hardlinks can't be made (the export directory on another drive).
+		"""
+		if self.files is None:
+			raise ValueError("Content index was loaded, rebuild it to export")
+		first, inverse, _ = self.unique()
+		written, linked, copied = 0, 0, 0
+		with TimerLog(f"ContentIndex - exported {len(first)} blobs for {len(self)} files"):
+			for row in first:
+				blob = self.blob_path(cas, self.columns['digest'][row])
+				if blob.is_file() and blob.stat().st_size == self.columns['size'][row]:
+					continue
+				# written next to the blob and renamed over it, an interrupted export mustn't leave a truncated blob everything links to
+				blob.parent.mkdir(parents=True, exist_ok=True)
+				temp = blob.with_name(f"{blob.name}.{threading.get_ident()}.tmp")
+				temp.write_bytes(self.files[row]._read())
+				os.replace(temp, blob)
+				written += 1
+			if link:
+				for row, file in enumerate(self.files):
+					blob = self.blob_path(cas, self.columns['digest'][first[inverse[row]]])
+					target = file.export_path
+					target.parent.mkdir(parents=True, exist_ok=True)
+					target.unlink(missing_ok=True)
+					try:
+						os.link(blob, target)
+						linked += 1
+					except OSError:
+						shutil.copyfile(blob, target)
+						copied += 1
+		return {
+			'Blobs'  : len(first),
+			'Written': written,
+			'Linked' : linked,
+			'Copied' : copied,
+		}
+
+	def dict(self):
+		first, _, counts = self.unique()
+		total = int(self.columns['size'].sum())
+		unique = int(self.columns['size'][first].sum())
+		return {
+			'Files'       : len(self),
+			'Unique blobs': len(first),
+			'Duplicated'  : int((counts > 1).sum()),
+			'Size'        : byter(total),
+			'Unique size' : byter(unique),
+			'Saved'       : byter(total - unique),
+			'Dedup ratio' : round(total / unique, 3) if unique else 1.0,
+		}
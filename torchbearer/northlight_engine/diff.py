@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+from pathlib import Path
+from typing import Iterable, Literal, TextIO
+
+import numpy as np
+
+from mulch import ColumnTable, TimerLog, byter
+from torchbearer.northlight_engine.configs import AppConfig, InstanceConfig
+from torchbearer.northlight_engine.engine import Admin
+from torchbearer.northlight_engine.content import ContentIndex
+
+__all__ = [
+	"FileTable",
+	"ArchiveDiff",
+	"main",
+]
+
+
+SIG_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype='<u8')
+
+type DiffBasis = Literal['digest', 'crc', 'chunks', 'size']
+
+
+class FileTable(ColumnTable):
+	"""
+	Every file of a set of archives keyed by path, built from the tables of contents only: sizes, v1.x data crcs and chunk sizes, never file data.
+	A path listed by several archives keeps the entry of the last one, same as a later pack overriding an earlier one. Rows are sorted by path.
+	"""
+	COLUMNS = [
+		('path', 'U'),
+		('archive', 'U'),
+		('size', '<u8'),
+		('crc', 'S8'),          # v1.x data crc as hex, empty for v2.x
+		('chunks', '<u4'),
+		('sig', '<u8'),         # order dependent mix of every chunk's compressed and decompressed size
+		('digest', 'S32'),      # ContentIndex digest, empty unless joined in with `with_digests`
+	]
+	ROWS = 'files'
+
+	@classmethod
+	def build(cls, admins: Iterable[Admin]) -> FileTable:
+		parts = list()
+		for admin in admins:
+			with TimerLog(f"FileTable - indexed {admin.name}"):
+				parts.append(cls.from_admin(admin))
+		return cls.concat(*parts)
+
+	@classmethod
+	def from_admin(cls, admin: Admin) -> FileTable:
+		files = list(admin.tree.file.mapping.values())
+		count = len(files)
+		chunks = admin.data.chnk.mapping
+		comp = np.fromiter((x.size_compressed for x in chunks.values()), dtype='<u8', count=len(chunks))
+		dcmp = np.fromiter((x.size_decompressed for x in chunks.values()), dtype='<u8', count=len(chunks))
+		counts = np.fromiter((len(f.chunks_ids) for f in files), dtype='<u4', count=count)
+		ids = np.fromiter(itertools.chain.from_iterable(f.chunks_ids for f in files), dtype=np.int64, count=int(counts.sum()))
+
+		# chunk k of a file contributes (comp * A ^ dcmp * B) * (k + 1) * C, summed per file, wrapping around like any hash does
+		starts = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)[:-1]]) if count else np.empty(0, dtype=np.int64)
+		position = np.arange(len(ids), dtype='<u8') - np.repeat(starts, counts).astype('<u8') + np.uint64(1)
+		mixed = ((comp[ids] * SIG_MIX[0]) ^ (dcmp[ids] * SIG_MIX[1])) * (position * SIG_MIX[2])
+		sig = np.zeros(count, dtype='<u8')
+		if len(ids):
+			has = counts != 0
+			sig[has] = np.add.reduceat(mixed, starts[has])
+
+		return cls.from_columns({
+			'path'   : np.array([f.path_raw() for f in files], dtype='U'),
+			'archive': np.full(count, admin.name, dtype=f'U{max(1, len(admin.name))}'),
+			'size'   : np.fromiter((f.out_size for f in files), dtype='<u8', count=count),
+			'crc'    : np.array([f.datahash.hex().encode() if f.datahash is not None else b'' for f in files], dtype='S8'),
+			'chunks' : counts,
+			'sig'    : sig,
+			'digest' : np.zeros(count, dtype='S32'),
+		})
+
+	@classmethod
+	def from_instance(cls, instance: InstanceConfig) -> FileTable:
+		return cls.build(instance.admins())
+
+	@classmethod
+	def from_columns(cls, columns: dict[str, np.ndarray]) -> FileTable:
+		"""Sorts by path, keeping the last row of each path."""
+		paths = columns['path']
+		_, last = np.unique(paths[::-1], return_index=True)
+		keep = len(paths) - 1 - last
+		return cls({k: v[keep] for k, v in columns.items()})
+
+	@classmethod
+	def concat(cls, *tables: FileTable) -> FileTable:
+		return cls.from_columns(super().concat(*tables).columns)
+
+	def with_digests(self, index: ContentIndex) -> FileTable:
+		"""Joins in the digests of a ContentIndex by path, making them the first thing a diff compares."""
+		other = FileTable.from_columns({'path': index['path'], 'digest': index['digest']})
+		_, mine, theirs = np.intersect1d(self.columns['path'], other['path'], assume_unique=True, return_indices=True)
+		columns = dict(self.columns)
+		columns['digest'] = columns['digest'].copy()
+		columns['digest'][mine] = other['digest'][theirs]
+		return FileTable(columns)
+
+
+class ArchiveDiff:
+	"""Two FileTables joined by path. Rows in `added` index into `new`, rows in `removed` into `old`, `old_rows`/`new_rows` pair up the common paths."""
+	old: FileTable
+	new: FileTable
+	added: np.ndarray
+	removed: np.ndarray
+	old_rows: np.ndarray
+	new_rows: np.ndarray
+	modified: np.ndarray    # bool per common path
+	verified: np.ndarray    # bool per common path, whether its verdict rests on its content (digests, crcs) rather than sizes alone
+	basis: np.ndarray       # what the verdict of each common path rests on, see `DiffBasis`
+
+	def __init__(self, old: FileTable, new: FileTable):
+		self.old = old
+		self.new = new
+		with TimerLog(f"ArchiveDiff - joined {len(old)} and {len(new)} files"):
+			_, self.old_rows, self.new_rows = np.intersect1d(old['path'], new['path'], assume_unique=True, return_indices=True)
+			in_old = np.zeros(len(old), dtype=bool)
+			in_old[self.old_rows] = True
+			in_new = np.zeros(len(new), dtype=bool)
+			in_new[self.new_rows] = True
+			self.removed = np.flatnonzero(~in_old)
+			self.added = np.flatnonzero(~in_new)
+			self.compare()
+
+	def compare(self):
+		"""
+		The strongest thing both sides have decides: content digests, then v1.x crcs, then chunk sizes, sizes always count. Sizes can only tell a file
+		changed, never that it didn't: a same size edit of an uncompressed chunk leaves them all as they were, so those matches stay unverified.
+		"""
+		a = {k: v[self.old_rows] for k, v in self.old.columns.items()}
+		b = {k: v[self.new_rows] for k, v in self.new.columns.items()}
+		by_digest = (a['digest'] != b'') & (b['digest'] != b'')
+		by_crc = ~by_digest & (a['crc'] != b'') & (b['crc'] != b'')
+		by_chunks = ~by_digest & (a['crc'] == b'') & (b['crc'] == b'') & (a['chunks'] != 0) & (b['chunks'] != 0)
+		self.modified = a['size'] != b['size']
+		self.modified |= by_digest & (a['digest'] != b['digest'])
+		self.modified |= by_crc & (a['crc'] != b['crc'])
+		self.modified |= by_chunks & ((a['chunks'] != b['chunks']) | (a['sig'] != b['sig']))
+		self.verified = by_digest | by_crc
+		self.basis = np.select([by_digest, by_crc, by_chunks], ['digest', 'crc', 'chunks'], default='size')
+
+	@property
+	def unchanged(self) -> np.ndarray:
+		return ~self.modified & self.verified
+
+	@property
+	def unverified(self) -> np.ndarray:
+		"""Common paths whose sizes all match but whose content nothing on hand could compare."""
+		return ~self.modified & ~self.verified
+
+	def paths(self, kind: Literal['added', 'removed', 'modified', 'unchanged', 'unverified']) -> np.ndarray:
+		match kind:
+			case 'added':
+				return self.new['path'][self.added]
+			case 'removed':
+				return self.old['path'][self.removed]
+			case 'modified':
+				return self.old['path'][self.old_rows[self.modified]]
+			case 'unchanged':
+				return self.old['path'][self.old_rows[self.unchanged]]
+			case 'unverified':
+				return self.old['path'][self.old_rows[self.unverified]]
+
+	def write(self, fp: TextIO, unchanged: bool = False):
+		"""
+		One line per file: `+` added, `-` removed, `M` modified (with both sizes and what gave it away), and if asked for `=` unchanged and `?` same size
+		but not verified (with what was compared).
+		"""
+		for path, size in zip(self.new['path'][self.added], self.new['size'][self.added]):
+			fp.write(f"+ {path} ({byter(int(size))})\n")
+		for path, size in zip(self.old['path'][self.removed], self.old['size'][self.removed]):
+			fp.write(f"- {path} ({byter(int(size))})\n")
+		for i in np.flatnonzero(self.modified if not unchanged else np.ones_like(self.modified)):
+			a, b = self.old_rows[i], self.new_rows[i]
+			if self.modified[i]:
+				fp.write(f"M {self.old['path'][a]} ({byter(int(self.old['size'][a]))} -> {byter(int(self.new['size'][b]))}, by {self.basis[i]})\n")
+			elif self.verified[i]:
+				fp.write(f"= {self.old['path'][a]}\n")
+			else:
+				fp.write(f"? {self.old['path'][a]} (same {'chunk sizes' if self.basis[i] == 'chunks' else 'size'}, content not verified)\n")
+
+	def dict(self):
+		kinds, counts = np.unique(self.basis, return_counts=True)
+		return {
+			'Old files': len(self.old),
+			'New files': len(self.new),
+			'Added'    : len(self.added),
+			'Removed'  : len(self.removed),
+			'Modified' : int(self.modified.sum()),
+			'Unchanged': int(self.unchanged.sum()),
+			'Same size, content not verified': int(self.unverified.sum()),
+			'Compared by': {str(k): int(v) for k, v in zip(kinds, counts)},
+			'Size change': int(self.new['size'].sum()) - int(self.old['size'].sum()),
+		}
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(prog='python -m torchbearer.northlight_engine.diff', description="Diff two instances, or two archives (.rmdtoc/.rmdp) of one, by their tables of contents.")
+	parser.add_argument('old', help="instance key (e.g. ctl) or archive path")
+	parser.add_argument('new', help="instance key or archive path")
+	parser.add_argument('--instance', help="instance key archives are opened with, defaults to the first configured one")
+	parser.add_argument('--digests', nargs=2, type=Path, metavar=('OLD', 'NEW'), help="saved ContentIndexes to compare by content")
+	parser.add_argument('--list', action='store_true', help="list every added/removed/modified file")
+	args = parser.parse_args(argv)
+
+	app = AppConfig()
+
+	def table(arg: str) -> FileTable:
+		if arg.lower() in app.instances.keys():
+			return FileTable.from_instance(app.instances[arg.lower()])
+		path = Path(arg)
+		if path.suffix not in ['.rmdtoc', '.rmdp'] or not path.is_file():
+			parser.error(f"{arg} is neither a configured instance ({', '.join(app.instances.keys())}) nor an archive")
+		if args.instance is not None:
+			instance = app.instances[args.instance.lower()]
+		elif len(app.instances) != 0:
+			instance = next(iter(app.instances.values()))
+		else:
+			parser.error("no instance configured to open archives with")
+		return FileTable.build([Admin(path, instance)])
+
+	old, new = table(args.old), table(args.new)
+	if args.digests is not None:
+		old, new = old.with_digests(ContentIndex.load(args.digests[0])), new.with_digests(ContentIndex.load(args.digests[1]))
+	diff = ArchiveDiff(old, new)
+	if args.list:
+		diff.write(sys.stdout)
+	for k, v in diff.dict().items():
+		print(f"{k}: {v}")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
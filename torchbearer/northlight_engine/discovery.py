@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from loguru import logger
+from orjson import orjson
+
+from mulch import TimerLog
+
+
+__all__ = [
+	"CANDIDATE_SUFFIXES",
+	"DirRecord",
+	"Discovery",
+]
+
+
+CANDIDATE_SUFFIXES = frozenset({'.rmdp', '.rmdtoc', '.bin', '.packmeta'})
+
+
+@dataclass(slots=True)
+class DirRecord:
+	"""One directory of an install as of `mtime_ns`: its subdirectories and candidate files (name: (size, mtime_ns)), relative to the install root."""
+	mtime_ns: int
+	subdirs: list[str] = field(default_factory=list)
+	candidates: dict[str, tuple[int, int]] = field(default_factory=dict)
+	size: int | None = None         # bytes in every file directly inside, None until the background sizing gets to it
+
+	def dict(self):
+		return {'mtime_ns': self.mtime_ns, 'subdirs': self.subdirs, 'candidates': self.candidates, 'size': self.size}
+
+
+class Discovery:
+	"""
+	Archive candidates of a game install, found with scandir instead of globbing and stat-ing every file of it.
+
+	The walk is kept as a manifest of DirRecords persisted at `manifest_path`. A directory whose mtime didn't change since the last walk isn't scanned
+	again (adding, removing or renaming anything in it bumps its mtime), only its candidates are re-stat-ed, so a rediscovery of an unchanged install
+	stats its directories and candidates and nothing else.
+	Total install size needs every file stat-ed, that happens on a background thread the first time `size` is asked for.
+	"""
+	root: Path
+	manifest_path: Path | None
+	dirs: dict[str, DirRecord]
+	_sizing: threading.Thread | None
+	_lock: threading.Lock
+
+	def __init__(self, root: Path, manifest_path: Path | None = None):
+		self.root = root
+		self.manifest_path = manifest_path
+		self.dirs = dict()
+		self._sizing = None
+		self._lock = threading.Lock()
+		old = self.load()
+		with TimerLog(f"Discovery - walked {root}"):
+			self.walk(old)
+		if self.dirs != old:
+			self.save()
+
+	def load(self) -> dict[str, DirRecord]:
+		if self.manifest_path is None or not self.manifest_path.is_file():
+			return dict()
+		try:
+			manifest = orjson.loads(self.manifest_path.read_bytes())
+		except orjson.JSONDecodeError:
+			logger.error(f"Discovery - manifest at {self.manifest_path} is unreadable, rediscovering")
+			return dict()
+		if manifest.get('root') != str(self.root):
+			return dict()
+		return {k: DirRecord(v['mtime_ns'], v['subdirs'], {n: tuple(x) for n, x in v['candidates'].items()}, v['size']) for k, v in manifest['dirs'].items()}
+
+	def save(self):
+		if self.manifest_path is None:
+			return
+		with self._lock:
+			manifest = {'root': str(self.root), 'dirs': {k: v.dict() for k, v in self.dirs.items()}}
+		self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+		self.manifest_path.write_bytes(orjson.dumps(manifest))
+
+	def walk(self, old: dict[str, DirRecord]):
+		stack = ['.']
+		while stack:
+			rel = stack.pop()
+			try:
+				mtime_ns = os.stat(self.root / rel).st_mtime_ns
+			except OSError:
+				continue
+			record = old.get(rel)
+			if record is None or record.mtime_ns != mtime_ns:
+				record = self.scan(rel, mtime_ns)
+			else:
+				record = self.restat(rel, record)
+			self.dirs[rel] = record
+			stack.extend(record.subdirs)
+
+	def scan(self, rel: str, mtime_ns: int) -> DirRecord:
+		record = DirRecord(mtime_ns)
+		with os.scandir(self.root / rel) as it:
+			for entry in it:
+				if entry.is_dir(follow_symlinks=False):
+					record.subdirs.append(entry.name if rel == '.' else f"{rel}/{entry.name}")
+				elif os.path.splitext(entry.name)[1].lower() in CANDIDATE_SUFFIXES and entry.is_file():
+					stat = entry.stat()
+					record.candidates[entry.name] = (stat.st_size, stat.st_mtime_ns)
+		return record
+
+	def restat(self, rel: str, record: DirRecord) -> DirRecord:
+		"""`record` with its candidates stat-ed again: a file rewritten in place leaves its directory's mtime alone. A copy if anything changed."""
+		candidates = dict()
+		for name in record.candidates.keys():
+			try:
+				stat = os.stat(self.root / rel / name)
+			except OSError:
+				continue
+			candidates[name] = (stat.st_size, stat.st_mtime_ns)
+		if candidates == record.candidates:
+			return record
+		return DirRecord(record.mtime_ns, record.subdirs, candidates)
+	
+	def paths(self, *suffixes: str, nonempty: bool = False) -> list[Path]:
+		"""Candidates ending in any of `suffixes` (all of them if none given), sorted."""
+		return sorted(self.root / rel / name for rel, record in self.dirs.items() for name, (size, _) in record.candidates.items()
+		              if (not suffixes or os.path.splitext(name)[1].lower() in suffixes) and (size != 0 or not nonempty))
+
+	def __len__(self) -> int:
+		return sum(len(x.candidates) for x in self.dirs.values())
+
+	@property
+	def size_known(self) -> bool:
+		return all(x.size is not None for x in self.dirs.values())
+
+	@property
+	def size(self) -> int:
+		"""Total bytes of the install. Starts the background sizing if it isn't known yet, what's been sized so far is returned in the meantime."""
+		if not self.size_known and self._sizing is None:
+			self._sizing = threading.Thread(target=self._size_dirs, name=f"Discovery sizing {self.root.name}", daemon=True)
+			self._sizing.start()
+		return sum(x.size for x in self.dirs.values() if x.size is not None)
+
+	def _size_dirs(self):
+		with TimerLog(f"Discovery - sized {self.root}"):
+			for rel, record in list(self.dirs.items()):
+				if record.size is not None:
+					continue
+				total = 0
+				try:
+					with os.scandir(self.root / rel) as it:
+						for entry in it:
+							if entry.is_file(follow_symlinks=False):
+								total += entry.stat().st_size
+				except OSError:
+					pass
+				with self._lock:
+					record.size = total
+		self.save()
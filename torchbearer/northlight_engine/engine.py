@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import os
+import threading
 from abc import ABC, abstractmethod
 from typing import Any, Generator, Literal, Self
 from pathlib import Path
 from functools import cached_property
 from dataclasses import dataclass, field
+from zlib import crc32
 
 from loguru import logger
 
 from mulch import byter, Helper, Stream, TimerLog
 
+from torchbearer.northlight_internal.cid_base import Datastream, DSC
+from torchbearer.northlight_internal.packmeta import PackMetaIndex
+
 from .configs import InstanceConfig
 from .readers import Reader, ReaderNLEv10, ReaderNLEv20
 
@@ -19,7 +25,8 @@ __all__ = [
 	"MetaAdmin",
 	"DataAdmin",
 	"Folder",
-	"File"
+	"File",
+	"FileRangeReader",
 ]
 
 
@@ -140,7 +147,10 @@ class File(GenericVFS):
 		return self.export_path.is_file()
 	
 	def export(self):
-		self.export_path.write_bytes(self._read())
+		# written next to the export and renamed over it, so nobody reading it ever sees half a file
+		temp = self.export_path.with_name(f"{self.export_path.name}.{threading.get_ident()}.tmp")
+		temp.write_bytes(self._read())
+		os.replace(temp, self.export_path)
 	
 	@property
 	def data(self) -> bytes:
@@ -160,6 +170,31 @@ class File(GenericVFS):
 	def _read(self) -> bytes:
 		return b''.join([chunk.read() for chunk in self.chunks])
 	
+	def read_range(self, offset: int, size: int) -> bytes:
+		"""Reads `size` bytes at `offset` of the file's data, only touching the chunks that overlap the range."""
+		return b''.join(chunk.read_range(start, length) for _, chunk, start, length in self.chunk_ranges(offset, size))
+	
+	def chunk_ranges(self, offset: int, size: int) -> Generator[tuple[int, Chunk, int, int], None, None]:
+		"""(chunk id, chunk, offset in the chunk, size) of every chunk overlapping `size` bytes at `offset` of the file's data, in order."""
+		position = 0
+		end = offset + size
+		for chunk_id in self.chunks_ids:
+			chunk = self.admin.data.chnk.mapping[chunk_id]
+			chunk_end = position + chunk.size_decompressed
+			if chunk_end > offset:
+				start = max(offset - position, 0)
+				yield chunk_id, chunk, start, min(end, chunk_end) - position - start
+			position = chunk_end
+			if position >= end:
+				break
+	
+	def range_reader(self) -> FileRangeReader:
+		return FileRangeReader(self)
+	
+	@property
+	def metadata(self) -> list[DSC]:
+		return self.admin.meta.file_metadata(self)
+	
 	def read_first_chunk(self) -> bytes:
 		if len(self.chunks_ids) == 0:
 			logger.error("Tried reading a file with no chunks...")
@@ -185,6 +220,32 @@ class File(GenericVFS):
 		return self.out_size
 
 
+class FileRangeReader:
+	"""
+	`File.read_range` for reading a file a piece at a time, as the hex view pages through it. The last lz4 chunk it decompressed is kept, so reading
+	the next piece of it doesn't decompress the whole chunk all over again.
+	"""
+	file: File
+	out_size: int
+	_last: tuple[int, bytes] | None
+	
+	def __init__(self, file: File):
+		self.file = file
+		self.out_size = file.out_size
+		self._last = None
+	
+	def read_range(self, offset: int, size: int) -> bytes:
+		parts = list()
+		for chunk_id, chunk, start, length in self.file.chunk_ranges(offset, size):
+			if chunk.compressed != 'lz4':
+				parts.append(chunk.read_range(start, length))
+				continue
+			if self._last is None or self._last[0] != chunk_id:
+				self._last = (chunk_id, chunk.read())
+			parts.append(self._last[1][start:start + length])
+		return b''.join(parts)
+
+
 @dataclass
 class Admin[T_Reader: Reader]:
 	path: Path
@@ -203,6 +264,10 @@ class Admin[T_Reader: Reader]:
 	def is_set(self) -> bool:
 		return self._reader is not None
 	
+	@property
+	def is_mapped(self) -> bool:
+		return self._tree is not None
+	
 	@property
 	def name(self):
 		return self.path.stem
@@ -396,6 +461,9 @@ class MetaAdmin:
 	path: Path | None = field(default=None)
 	metadata_types: dict[int, str] = field(default_factory=dict)
 	
+	_file_cache: dict[int, list[DSC]] = field(default_factory=dict, repr=False)
+	_bulk_cache: dict[int, dict[int, DSC]] = field(default_factory=dict, repr=False)
+	
 	def dict(self):
 		return {
 			"Path"          : str(self.path),
@@ -408,10 +476,66 @@ class MetaAdmin:
 		else:
 			with Stream(self.path, spos=offset) as f:
 				return f[size]
-
-# @property
-# def metadata(self) -> bytes:
-#	return self.admin.meta.get(self.metadata_offset, self.metadata_size)
+	
+	@cached_property
+	def packmeta(self) -> PackMetaIndex | None:
+		if self.path is None:
+			return None
+		with TimerLog(f'MetaAdmin[{self.admin.name}] - packmeta indexing'):
+			return PackMetaIndex(self.path, self.admin.reader().version_minor)
+	
+	@cached_property
+	def mtdt(self) -> memoryview | None:
+		"""The metadata block of a v2 reader."""
+		rdr = self.admin.reader()
+		return memoryview(rdr.data_mtdt) if isinstance(rdr, ReaderNLEv20) else None
+	
+	def file_view(self, file: File) -> memoryview:
+		"""Zero-copy slice of the metadata block holding a file's metadata."""
+		if self.mtdt is None or file.metadata_size == 0:
+			return memoryview(b'')
+		return self.mtdt[file.metadata_offset:file.metadata_offset + file.metadata_size]
+	
+	def file_metadata(self, file: File) -> list[DSC]:
+		"""Decoded metadata containers of a file, through the packmeta for v1 readers and the metadata block for v2 ones."""
+		if file.index not in self._file_cache.keys():
+			if self.packmeta is not None:
+				name = file.path_raw()
+				self._file_cache[file.index] = self.packmeta.meta(name) if name in self.packmeta else []
+			else:
+				view = self.file_view(file)
+				with Stream(view) as stream:
+					metas = list()
+					while stream.tell() < len(view):
+						metas.append(Datastream.beef_container(stream))
+				self._file_cache[file.index] = metas
+		return self._file_cache[file.index]
+	
+	def bulk(self, datatype: str | type[Datastream]) -> dict[int, DSC]:
+		"""Decodes the metadata of one type (by name, like 'rend::TextureMetadata', or Datastream class) for every file of a v2 reader in one pass.
+		Other containers only get their headers peeked. Returns file index -> container, and caches the result."""
+		typehash = int(datatype.__ds_hash__, 16) if isinstance(datatype, type) else crc32(datatype.lower().encode())
+		if typehash not in self._bulk_cache.keys():
+			found = dict()
+			if self.mtdt is not None:
+				with TimerLog(f'MetaAdmin[{self.admin.name}] - bulk metadata decode ({datatype if isinstance(datatype, str) else datatype.__ds_name__})'):
+					for file in self.admin.tree.file:
+						if file.index in self._file_cache.keys():
+							match = [x for x in self._file_cache[file.index] if x.hashval == typehash]
+							if len(match) != 0:
+								found[file.index] = match[0]
+							continue
+						view = self.file_view(file)
+						pos = 0
+						while pos < len(view):
+							size, hashval = DSC.header_at(view, pos)
+							if hashval == typehash:
+								with Stream(view[pos:pos + size]) as stream:
+									found[file.index] = Datastream.beef_container(stream)
+								break
+							pos += size
+			self._bulk_cache[typehash] = found
+		return self._bulk_cache[typehash]
 
 
 
@@ -474,6 +598,15 @@ class Chunk:
 				case False:
 					return f.read(self.size)
 	
+	def read_range(self, offset: int, size: int) -> bytes:
+		"""Uncompressed chunks are read straight from the archive, lz4 chunks have to be decompressed whole first."""
+		match self.compressed:
+			case 'lz4':
+				return self.read()[offset:offset + size]
+			case False:
+				with Stream(self.archive.path, spos=self.offset + offset) as f:
+					return f.read(min(size, self.size_decompressed - offset))
+	
 	def dict(self):
 		return {
 			'compressed': self.compressed,
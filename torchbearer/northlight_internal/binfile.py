@@ -3,8 +3,12 @@ from __future__ import annotations
 import zlib
 from dataclasses import dataclass
 from functools import cached_property
+from pathlib import Path
 from typing import Any, ClassVar
 
+import numpy as np
+from orjson import orjson
+
 from mulch import Stream, OutOfBoundsException, yamldump, find_start_of_nts_array
 from .cid_base import Datastream, DSC, RMDL_DSC
 from .obrs import ObjectBinaryReadStream_v1, UnknownObjectOBRS
@@ -182,6 +186,27 @@ class StreamedResource:
 	metadata: Any | None
 	name: str | None
 	
+	@staticmethod
+	def dtype(metadata_size: int) -> np.dtype:
+		"""Record layout for resources with fixed size metadata: RID, name offset, FileInfoMetadata_v1, then the raw metadata."""
+		fields = [('rid', 'V4'), ('offset', '<u4'), ('fileinfo', 'V12')]
+		if metadata_size != 0:
+			fields.append(('metadata', f'V{metadata_size}'))
+		return np.dtype(fields)
+	
+	@classmethod
+	def via_void(cls, void: np.void, v1: int, v2: int, filename: str) -> StreamedResource:
+		self = cls.__new__(cls)
+		self.rid = RID(Stream(bytes(void['rid'])))
+		self.offset = int(void['offset'])
+		self.fileinfometadata = Metadata.FileInfoMetadata_v1(Stream(bytes(void['fileinfo'])))
+		self.name = None
+		metadata = bytes(void['metadata']) if 'metadata' in void.dtype.names else None
+		match v1, v2:
+			case (4, 32) | (7, 32) | (10, 32) | (4, 36):    self.metadata = metadata
+			case _:                                         self.metadata = UnknownMetadataOBRS(filename, metadata, v1, v2) if metadata is not None else None
+		return self
+	
 	def __init__(self, stream: Stream, v1: int, v2: int, filename: str, discovered_namesize: int):
 		self.rid = RID(stream)
 		self.offset = int(stream)
@@ -215,6 +240,25 @@ class BinFileStreamedResource:
 	"""Average Resource Metadata Size"""
 	
 	datapairs: ClassVar[dict[str, int]] = dict()
+	"""Discovered metadata sizes of unknown v1/v2 pairs, keyed by f"{name}_{v1}_{v2}"."""
+	datapairs_path: ClassVar[Path | None] = None
+	"""Where datapairs gets persisted to, see bind_datapairs()."""
+	
+	@classmethod
+	def bind_datapairs(cls, path: Path):
+		"""Persist discovered datapairs at path, loading whatever was discovered in earlier sessions."""
+		cls.datapairs_path = path
+		if path.is_file():
+			try:
+				cls.datapairs.update(orjson.loads(path.read_bytes()))
+			except orjson.JSONDecodeError:
+				logger.error(f"BFSR - Datapair cache at {path} is unreadable, rediscovering")
+	
+	@classmethod
+	def save_datapairs(cls):
+		if cls.datapairs_path is not None:
+			cls.datapairs_path.parent.mkdir(parents=True, exist_ok=True)
+			cls.datapairs_path.write_bytes(orjson.dumps(cls.datapairs, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
 	
 	def dict(self):
 		return {
@@ -228,6 +272,27 @@ class BinFileStreamedResource:
 			'Average Resource Metadata Size': self.arms
 		}
 	
+	def discover_namesize(self, data: bytes, start_resources: int) -> int:
+		key = f"{self.name}_{self.v1}_{self.v2}"
+		if key in self.__class__.datapairs.keys():
+			discovered_namesize = self.__class__.datapairs[key]
+			# check the cached size against the name array size it implies, a stale entry gets dropped and rediscovered
+			names_start = start_resources + (self.numResources * (20 + discovered_namesize))
+			if names_start + 4 <= len(data) and int.from_bytes(data[names_start:names_start + 4], byteorder='little') == len(data) - names_start - 4:
+				return discovered_namesize
+			logger.info(f"BFSR - Cached datapair size ({self.name}, {self.v1}/{self.v2}) of {discovered_namesize} doesn't fit, rediscovering")
+			del self.__class__.datapairs[key]
+		
+		naemsize = ((((len(data) - find_start_of_nts_array(self.numResources, data)) - 4) - start_resources) / self.numResources) - 20
+		if naemsize.is_integer():
+			discovered_namesize = int(naemsize)
+			logger.info(f"BFSR - New datapair size found ({self.name}, {self.v1}/{self.v2}): {discovered_namesize}")
+			self.__class__.datapairs[key] = discovered_namesize
+			self.__class__.save_datapairs()
+			return discovered_namesize
+		else:
+			raise ValueError(f"BFSR - Datapair combo unknown ({self.name}, {self.v1}/{self.v2})")
+	
 	def __init__(self, name: str, data: bytes):
 		self.name = name
 		self.size = len(data)
@@ -245,26 +310,38 @@ class BinFileStreamedResource:
 			
 			start_resources = stream.tell()
 			match (self.v1, self.v2):
-				case (4, 32) | (4, 36) | (5, 100) | (6, 160) | (7, 200) | (7, 32) | (5, 68) | (10, 100) | (10, 32):
-					pass
+				case (4, 32) | (7, 32) | (10, 32):
+					record_metadata_size = 0
+				case (4, 36):
+					record_metadata_size = 4
+				case (5, 100) | (6, 160) | (7, 200) | (5, 68) | (10, 100):
+					record_metadata_size = None
 				case _:
-					if f"{name}_{self.v1}_{self.v2}" in self.__class__.datapairs.keys():
-						discovered_namesize = self.__class__.datapairs[f"{name}_{self.v1}_{self.v2}"]
-					else:
-						naemsize = ((((len(data) - find_start_of_nts_array(self.numResources, data)) - 4) - start_resources) / self.numResources) - 20
-						if naemsize.is_integer():
-							discovered_namesize = int(naemsize)
-							logger.info(f"BFSR - New datapair size found ({name}, {self.v1}/{self.v2}): {discovered_namesize}")
-							self.__class__.datapairs[f"{name}_{self.v1}_{self.v2}"] = discovered_namesize
-						else:
-							raise ValueError(f"BFSR - Datapair combo unknown ({name}, {self.v1}/{self.v2})")
+					record_metadata_size = self.discover_namesize(data, start_resources) if self.numResources != 0 else 0
+			
+			if record_metadata_size is None:
+				self.objs = {i: StreamedResource(stream, self.v1, self.v2, name, 0) for i in range(self.numResources)}
+			else:
+				# fixed size records, so read them all at once
+				records = np.frombuffer(data, dtype=StreamedResource.dtype(record_metadata_size), count=self.numResources, offset=start_resources)
+				self.objs = {i: StreamedResource.via_void(x, self.v1, self.v2, name) for i, x in enumerate(records)}
+				stream.seek(start_resources + records.nbytes)
 			
-			self.objs = {i: StreamedResource(stream, self.v1, self.v2, name, discovered_namesize) for i in range(self.numResources)}
 			self.arms = (((stream.tell() - start_resources) / self.numResources) - 20) if self.numResources != 0 else 0
 			self.nameSize = int(stream)
-			for i in range(self.numResources):
-				stream.seek(-self.nameSize + self.objs[i].offset, 2)
-				self.objs[i].name = str(stream)
+			names_start = stream.tell()
+			# names are in the same order as their offsets, so split the array once and match them up
+			names = dict()
+			name_offset = 0
+			for x in data[names_start:names_start + self.nameSize].split(b'\x00'):
+				names[name_offset] = x.decode()
+				name_offset += len(x) + 1
+			for obj in self.objs.values():
+				if obj.offset in names.keys():
+					obj.name = names[obj.offset]
+				else:
+					stream.seek(names_start + obj.offset)
+					obj.name = str(stream)
 
 
 
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import struct
+from collections import Counter, defaultdict
+from enum import IntEnum
 from weakref import WeakSet
 
 from abc import ABC
@@ -12,10 +14,34 @@ from mulch import Stream, ByteStreamField, StreamFields, StreamObject
 
 from .types_general import BoundBox, RID
 
+
+class TrackMode(IntEnum):
+	Off     = 0     # no tracking
+	Count   = 1     # per class construction counters
+	Weak    = 2     # counters, plus per class WeakSets of the live instances
+
+
+class Tracking:
+	"""Instance tracking for Datastream and DSC construction. Only the PackMeta.log_* debugging helpers use it, so it's off by default."""
+	mode: ClassVar[TrackMode] = TrackMode.Off
+	
+	@classmethod
+	def set(cls, mode: TrackMode):
+		cls.mode = mode
+	
+	@staticmethod
+	def reset():
+		Datastream.__ds_meta_objs__.clear()
+		Datastream.__ds_meta_cnts__.clear()
+		DSC.__dsc_objs__.clear()
+		DSC.__dsc_cnts__.clear()
+
+
 class Datastream[CType](ABC, StreamObject):
 	__ds_meta_scls__: ClassVar[set[type[Datastream]]]                       = set()
-	__ds_meta_dcls__: ClassVar[dict[str, type[Datastream]]]                 = dict()
+	__ds_meta_dcls__: ClassVar[dict[int, type[Datastream]]]                 = dict()
 	__ds_meta_objs__: ClassVar[dict[type[Datastream], WeakSet[Datastream]]] = defaultdict(WeakSet)
+	__ds_meta_cnts__: ClassVar[Counter[type[Datastream]]]                   = Counter()
 	
 	__ds_name__: ClassVar[str]; """Datastream subclass name"""
 	__ds_hash__: ClassVar[str]; """Datastream subclass hash"""
@@ -31,6 +57,11 @@ class Datastream[CType](ABC, StreamObject):
 	def __ds_iden__(cls) -> str:
 		return f"{cls.__ds_hash__} v{cls.__ds_vrsn__}"
 	
+	@classmethod
+	def __ds_ikey__(cls) -> int:
+		"""Registry key, the typehash and version packed as (u32 hash << 32) | u32 version, same as DSC.typekey"""
+		return (int(cls.__ds_hash__, 16) << 32) | cls.__ds_vrsn__
+	
 	def __init__(self, container: CType, stream: Stream):
 		self.container = container
 		StreamObject.__init__(self, stream)
@@ -39,12 +70,12 @@ class Datastream[CType](ABC, StreamObject):
 		cls.__ds_name__ = name
 		cls.__ds_vrsn__ = vrsn
 		cls.__ds_hash__ = typehash
-		if typehash != "FFFFFFFF":
-			iden = cls.__ds_iden__()
-			if iden in Datastream.__ds_meta_dcls__.keys():
-				logger.error(f"Duplicate subclass! '{iden}' is already defined as '{Datastream.__ds_meta_dcls__[iden].__name__}'")
-				raise KeyError(iden)
-			Datastream.__ds_meta_dcls__[iden] = cls
+		if typehash not in ("FFFFFFFF", ""):
+			ikey = cls.__ds_ikey__()
+			if ikey in Datastream.__ds_meta_dcls__.keys():
+				logger.error(f"Duplicate subclass! '{cls.__ds_iden__()}' is already defined as '{Datastream.__ds_meta_dcls__[ikey].__name__}'")
+				raise KeyError(cls.__ds_iden__())
+			Datastream.__ds_meta_dcls__[ikey] = cls
 		Datastream.__ds_meta_scls__.add(cls)
 		super().__init_subclass__()
 	
@@ -52,25 +83,28 @@ class Datastream[CType](ABC, StreamObject):
 		if cls is Datastream:
 			raise TypeError(f"Only children of Datastream may be instantiated.")
 		instance = super().__new__(cls)
-		Datastream.__ds_meta_objs__[cls].add(instance)
+		if Tracking.mode:
+			Datastream.__ds_meta_cnts__[cls] += 1
+			if Tracking.mode is TrackMode.Weak:
+				Datastream.__ds_meta_objs__[cls].add(instance)
 		return instance
 
 	@final
 	@classmethod
-	def process(cls, container: DSC, data: bytes) -> Datastream[DSC]:
-		key = container.typekey
-		if key in Datastream.__ds_meta_dcls__.keys():
-			with Stream(data) as stream:
-				ds_type = Datastream.__ds_meta_dcls__[key]
-				x = ds_type(container, stream)
-				try:
-					assert len(stream) == stream.tell(), (len(stream), stream.tell(), key)
-				except AssertionError as e:
-					logger.error(f"Process read too little with key {key}, read {stream.tell()}/{len(stream)}. All data (truncated at 512):\n{Stream.debug.print(data, decode=False)}")
-					raise e
-				return x
-		else:
-			return UnknownBinData(container, data, key)
+	def process(cls, container: DSC, stream: Stream, size: int) -> Datastream[DSC]:
+		"""Parses the next size bytes of stream as the payload of container, bounding the stream to them instead of copying them out."""
+		ds_type = Datastream.__ds_meta_dcls__.get(container.typekey, None)
+		if ds_type is None:
+			return UnknownBinData(container, stream[size], container.typekey)
+		start = stream.tell()
+		with stream.window(size):
+			x = ds_type(container, stream)
+			try:
+				assert len(stream) == stream.tell(), (len(stream), stream.tell(), container.typeiden)
+			except AssertionError as e:
+				logger.error(f"Process read too little with key {container.typeiden}, read {stream.tell() - start}/{size}. All data (truncated at 512):\n{Stream.debug.print(stream.read_at(start, size), decode=False)}")
+				raise e
+		return x
 	
 	@final
 	@classmethod
@@ -83,34 +117,34 @@ class Datastream[CType](ABC, StreamObject):
 	@final
 	@classmethod
 	def beef_container(cls, stream: Stream) -> DSC[Datastream[DSC]]:
-		peeker = stream.peek(4)[::-1].hex().upper()
+		peeker = stream.peek(4)
 		match peeker:
-			case 'D34DB33F':
+			case b'\x3F\xB3\x4D\xD3':
 				return DSCv2(stream, datatype=cls if cls is not Datastream else None)
-			case 'DEADBEEF':
+			case b'\xEF\xBE\xAD\xDE':
 				return DSCv1(stream, datatype=cls if cls is not Datastream else None)
 			case _:
-				logger.error(f"Encountered an error trying to determine the container type. Expected a deadbeef, got {peeker}")
+				logger.error(f"Encountered an error trying to determine the container type. Expected a deadbeef, got {peeker[::-1].hex().upper()}")
 				prevlen = min(stream.tell(), 32)
 				raise ValueError(f"{Stream.debug.print(stream.peekskip(-prevlen, prevlen), decode=False)}  -> {Stream.debug.print(stream.peek(4), decode=False)} <-  {Stream.debug.print(stream.peekskip(4, 12), decode=False)}")
 
 
 
 class UnknownBinData(Datastream, name='UnknownBinData', typehash='', vrsn=0):
-	__bin_unkw__: ClassVar[set[str]] = set()
+	__bin_unkw__: ClassVar[set[int]] = set()
 	
 	key: str
 	data: bytes
 	
-	def __init__(self, container: DSC | None, data: bytes, key: str):
+	def __init__(self, container: DSC | None, data: bytes, key: int):
 		datlen = len(data)
+		self.key = f"{key >> 32:08X} v{key & 0xFFFFFFFF}"
 		if key not in UnknownBinData.__bin_unkw__:
 			logger.error(
-				f"Can't find class for {key} (initial encounter data ({datlen}): {Stream.debug.print(data[:256] if datlen > 256 else data, decode=False)})")
+				f"Can't find class for {self.key} (initial encounter data ({datlen}): {Stream.debug.print(data[:256] if datlen > 256 else data, decode=False)})")
 		UnknownBinData.__bin_unkw__.add(key)
 		super().__init__(container, Stream(data))
 		self.data = data
-		self.key = key
 		
 	def dict(self):
 		return {'key': self.key, 'data': self.data.hex().upper()}
@@ -162,7 +196,7 @@ class BatchDSC[ETYPE: Datastream](StreamObject[str]):
 			'vrsn': self.vrsn,
 			'ctyp': self.ctyp,
 			'unko': self.unko,
-			'entries': {x.lutval.hex().upper(): x.dscval.dict() for x in self.entries}
+			'entries': {x.lutval.hex().upper(): x.dscval for x in self.entries}
 		}
 
 
@@ -197,23 +231,35 @@ class RMDL_DSC[ETYPE: Datastream[None]]:
 				self.entries[v['name']] = BatchDSC(stream, v['name'])
 	
 	def dict(self):
-		return {k: {'types': v.entry_types(), 'dict': v.dict()} for k, v in self.entries.items()}
+		return {k: {'types': v.entry_types(), 'dict': v} for k, v in self.entries.items()}
 
 
 class DSC[T: Datastream[DSC]](ABC):
 	size:       int  # size
-	typehash:   str  # contentHash (crc32 of lowercase name)
+	hashval:    int  # contentHash (crc32 of lowercase name)
 	vrsn:       int  # tagVersion
-	typekey:    str
+	typekey:    int  # (hashval << 32) | vrsn, see Datastream.__ds_ikey__
 	data:       T
 
 	__dsc_objs__: ClassVar[dict[type[DSC], WeakSet[DSC]]]   = defaultdict(WeakSet)
+	__dsc_cnts__: ClassVar[Counter[type[DSC]]]              = Counter()
 
 	def __new__(cls, *args, **kwargs):
 		instance = super().__new__(cls)
-		DSC.__dsc_objs__[cls].add(instance)
+		if Tracking.mode:
+			DSC.__dsc_cnts__[cls] += 1
+			if Tracking.mode is TrackMode.Weak:
+				DSC.__dsc_objs__[cls].add(instance)
 		return instance
 	
+	@property
+	def typehash(self) -> str:
+		return f"{self.hashval:08X}"
+	
+	@property
+	def typeiden(self) -> str:
+		return f"{self.typehash} v{self.vrsn}"
+	
 	def dict(self):
 		return {
 			'size'    : self.size,
@@ -222,17 +268,26 @@ class DSC[T: Datastream[DSC]](ABC):
 			'data'    : self.data.dict()
 		}
 	
+	@staticmethod
+	def header_at(data: bytes | memoryview, pos: int) -> tuple[int, int]:
+		"""Size and typehash (as an integer) of the container at pos, without decoding it."""
+		match bytes(data[pos:pos + 4]):
+			case b'\xEF\xBE\xAD\xDE':
+				return struct.unpack_from('<II', data, pos + 4)
+			case b'\x3F\xB3\x4D\xD3':
+				return struct.unpack_from('<II', data, pos + 8)
+			case _:
+				raise ValueError(f"Expected a deadbeef at {pos}, got {bytes(data[pos:pos + 4]).hex().upper()}")
+	
 
 
 class DSCv1[T](DSC[T]):
 	def __init__(self, stream: Stream, /, *, datatype: type[T] | None = None) -> None:
-		assert stream.crc == 'DEADBEEF'
-		self.size = int(stream)
-		self.typehash = stream.crc
-		self.vrsn = int(stream)
-		self.typekey = f"{self.typehash} v{self.vrsn}"
-		self.data = Datastream.process(self, stream[self.size - 20]) if datatype is None else datatype(self, stream)
-		assert stream.crc == 'DEADBEEF'
+		magic, self.size, self.hashval, self.vrsn = struct.unpack('<4I', stream[16])
+		assert magic == 0xDEADBEEF
+		self.typekey = (self.hashval << 32) | self.vrsn
+		self.data = Datastream.process(self, stream, self.size - 20) if datatype is None else datatype(self, stream)
+		assert stream[4] == b'\xEF\xBE\xAD\xDE'
 	
 
 class DSCv2[T](DSC[T]):
@@ -240,15 +295,12 @@ class DSCv2[T](DSC[T]):
 	xtra:       int | None
 	
 	def __init__(self, stream: Stream, /, *, datatype: type[T] | None = None) -> None:
-		assert stream.crc == 'D34DB33F'
-		self.unko = int(stream)
-		self.size = int(stream)
-		self.typehash = stream.crc
-		self.vrsn = int(stream)
+		magic, self.unko, self.size, self.hashval, self.vrsn = struct.unpack('<5I', stream[20])
+		assert magic == 0xD34DB33F
 		self.xtra = int(stream) if self.unko == 1 else None
-		self.typekey = f"{self.typehash} v{self.vrsn}"
-		self.data = Datastream.process(self, stream[self.size - (24 if self.xtra is None else 28)]) if datatype is None else datatype(self, stream)
-		assert stream.crc == 'D34DB33F'
+		self.typekey = (self.hashval << 32) | self.vrsn
+		self.data = Datastream.process(self, stream, self.size - (24 if self.xtra is None else 28)) if datatype is None else datatype(self, stream)
+		assert stream[4] == b'\x3F\xB3\x4D\xD3'
 
 
 class DSF:
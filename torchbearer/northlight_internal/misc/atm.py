@@ -1,8 +1,36 @@
 from __future__ import annotations
 
+from functools import cached_property
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from loguru import logger
 from pyglm.glm import vec3
 
-from mulch import Stream
+from mulch import Stream, TimerLog
+from torchbearer.northlight_engine.configs import InstanceConfig
+from torchbearer.northlight_engine.engine import Admin, File
+
+
+NUM_STARS = 256
+
+# (dtype, channels) the LUT is tried as, in order, the first one giving a power of two texel count wins
+LUT_LAYOUTS = [('<f4', 4), ('<f2', 4), ('<f4', 3), ('<f4', 1), ('u1', 4)]
+
+
+def infer_lut_layout(size: int) -> tuple[np.dtype, tuple[int, ...]]:
+	"""Guesses a dtype and shape for a LUT of `size` bytes: (height, width, channels), as square as the texel count allows. Raw bytes if nothing fits."""
+	for dtype, channels in LUT_LAYOUTS:
+		dtype = np.dtype(dtype)
+		texel = dtype.itemsize * channels
+		if size == 0 or size % texel != 0:
+			continue
+		texels = size // texel
+		if texels & (texels - 1) == 0:
+			width = 1 << (texels.bit_length() // 2)
+			return dtype, (texels // width, width, channels)
+	return np.dtype('u1'), (size,)
 
 
 class ATMFile:
@@ -11,9 +39,9 @@ class ATMFile:
 	v2: vec3
 	v3: vec3
 	unkValue: float
-	stars: dict[int, vec3]
+	stars: np.ndarray       # (256, 3) <f4
 	atmosphericLUT: bytes
-	
+
 	def __init__(self, stream: Stream):
 		self.version = int(stream)
 		if self.version != 1:
@@ -23,5 +51,90 @@ class ATMFile:
 			self.v2 = vec3(x=stream.f4, y=stream.f4, z=stream.f4)
 			self.v3 = vec3(x=stream.f4, y=stream.f4, z=stream.f4)
 			self.unkValue = float(stream)
-			self.stars = {i: vec3(x=stream.f4, y=stream.f4, z=stream.f4) for i in range(256)}
-			self.atmosphericLUT = stream.read()
\ No newline at end of file
+			self.stars = np.frombuffer(stream.read(NUM_STARS * 12), dtype='<f4').reshape(NUM_STARS, 3)
+			self.atmosphericLUT = stream.read()
+
+	@classmethod
+	def from_file(cls, file: File) -> ATMFile:
+		return cls(Stream(file.read_range(0, file.out_size)))
+
+	@cached_property
+	def lut(self) -> np.ndarray:
+		"""The atmospheric LUT as an array, see `infer_lut_layout` for how its dtype and shape are worked out."""
+		return self.lut_as(*infer_lut_layout(len(self.atmosphericLUT)))
+
+	def lut_as(self, dtype: np.dtype | str, shape: tuple[int, ...]) -> np.ndarray:
+		return np.frombuffer(self.atmosphericLUT, dtype=dtype).reshape(shape)
+
+	@property
+	def vectors(self) -> np.ndarray:
+		"""v1, v2 and v3 as a (3, 3) array."""
+		return np.array([[v.x, v.y, v.z] for v in [self.v1, self.v2, self.v3]], dtype='<f4')
+
+	def dict(self):
+		return {
+			'version'   : self.version,
+			'v1'        : list(self.v1),
+			'v2'        : list(self.v2),
+			'v3'        : list(self.v3),
+			'unkValue'  : self.unkValue,
+			'stars'     : len(self.stars),
+			'LUT dtype' : str(self.lut.dtype),
+			'LUT shape' : list(self.lut.shape),
+		}
+
+
+class ATMStack:
+	"""Every atmosphere file of a set of archives stacked along a first axis, for comparing them side by side."""
+	names: np.ndarray       # (n,) file paths
+	vectors: np.ndarray     # (n, 3, 3) v1, v2, v3
+	unk: np.ndarray         # (n,)
+	stars: np.ndarray       # (n, 256, 3)
+	luts: np.ndarray        # (n, *lut shape), only stacked if all LUTs share a size
+
+	def __init__(self, atms: dict[str, ATMFile]):
+		self.names = np.array(list(atms.keys()), dtype='U')
+		self.vectors = np.stack([x.vectors for x in atms.values()]) if atms else np.empty((0, 3, 3), dtype='<f4')
+		self.unk = np.array([x.unkValue for x in atms.values()], dtype='<f4')
+		self.stars = np.stack([x.stars for x in atms.values()]) if atms else np.empty((0, NUM_STARS, 3), dtype='<f4')
+		sizes = {len(x.atmosphericLUT) for x in atms.values()}
+		if len(sizes) == 1:
+			self.luts = np.stack([x.lut for x in atms.values()])
+		else:
+			if len(sizes) > 1:
+				logger.warning(f"Atmosphere LUTs come in {len(sizes)} different sizes, not stacking them")
+			self.luts = np.empty(0, dtype='u1')
+
+	@classmethod
+	def from_files(cls, files: Iterable[File]) -> ATMStack:
+		atms = dict()
+		with TimerLog("ATMStack - loaded atmosphere files"):
+			for file in files:
+				try:
+					atms[file.path_raw()] = ATMFile.from_file(file)
+				except Exception as err:
+					logger.error(f"Failed to read {file.path_raw()}: {err}")
+		return cls(atms)
+
+	@classmethod
+	def from_admins(cls, admins: Iterable[Admin]) -> ATMStack:
+		return cls.from_files(f for admin in admins for f in admin.tree.file if f.extension == 'atm')
+
+	@classmethod
+	def from_instance(cls, instance: InstanceConfig) -> ATMStack:
+		return cls.from_admins(instance.admins())
+
+	def __len__(self):
+		return len(self.names)
+
+	def save(self, path: Path):
+		np.savez_compressed(path, names=self.names, vectors=self.vectors, unk=self.unk, stars=self.stars, luts=self.luts)
+
+	def spread(self) -> dict[str, float]:
+		"""Largest per-element deviation from the mean across all files, a quick look at how much they actually differ."""
+		return {
+			'vectors': float(np.abs(self.vectors - self.vectors.mean(axis=0)).max(initial=0)),
+			'unk'    : float(np.abs(self.unk - self.unk.mean()).max(initial=0)) if len(self) else 0.0,
+			'stars'  : float(np.abs(self.stars - self.stars.mean(axis=0)).max(initial=0)),
+			'luts'   : float(np.abs(self.luts.astype(np.float32) - self.luts.mean(axis=0)).max(initial=0)) if self.luts.ndim > 1 else 0.0,
+		}
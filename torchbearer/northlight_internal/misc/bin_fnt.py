@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import ctypes
+import re
 from io import BytesIO
 from enum import IntEnum
-from struct import pack, unpack, Struct
+from struct import pack, Struct
 from typing import BinaryIO
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from dataclasses import dataclass, field
 
+import numpy as np
 from PIL import Image
 
-from mulch import Stream, OLen
+from mulch import Stream, TimerLog
 
 # This is a refactor of NorthlightTools' binfnt implementation combined with eprilx/NorthlightFontMaker and AWTools functions.
 
@@ -22,7 +25,7 @@ class Glyph:
 	indexOffset: int
 	indexCount: int
 	glyphWidth: float
-	unknown: OLen.bytes(36)
+	unknown: bytes
 	
 	def __init__(self, stream: Stream):     # width: 44 bytes
 		with stream(size=2):
@@ -52,7 +55,7 @@ class Vertex:
 class BinFont:
 	version: int
 	textureSize: int
-	skipped: OLen.bytes(8)
+	skipped: bytes
 	ddsStream: bytes
 	
 	numVertices: int
@@ -97,6 +100,27 @@ class BinFont:
 			self.ddsStream = stream.read()
 
 
+@dataclass
+class Kernel:
+	a: int
+	b: int
+	val: float
+	
+	__struct_8__ = Struct("2Hf")
+	__struct_12__ = Struct("2If")
+	
+	@classmethod
+	def read_8(cls, stream: Stream) -> Kernel:
+		return cls(*cls.__struct_8__.unpack(stream[8]))
+	
+	@classmethod
+	def read_12(cls, stream: Stream) -> Kernel:
+		return cls(*cls.__struct_12__.unpack(stream[12]))
+	
+	def pack(self) -> bytes:
+		return self.__struct_8__.pack(self.a, self.b, self.val)
+
+
 class FontVersionEnum(IntEnum):
 	AW1 = 3
 	AWR = 4
@@ -124,8 +148,8 @@ class UnknDesc(ctypes.Structure):
 class AdvcDesc(ctypes.Structure):
 	_fields_ = [
 		("plus4", ctypes.c_uint16), ("num4", ctypes.c_uint16), ("plus6", ctypes.c_uint16), ("num6", ctypes.c_uint16), ("chnl", ctypes.c_uint32),
-		("x1_1", ctypes.c_float), ("x1_2", ctypes.c_float), ("x2_1", ctypes.c_float), ("x2_2", ctypes.c_float),
-		("y1_1", ctypes.c_float), ("y1_2", ctypes.c_float), ("y2_1", ctypes.c_float), ("y2_2", ctypes.c_float),
+		("x1_1", ctypes.c_float), ("y1_1", ctypes.c_float), ("x2_1", ctypes.c_float), ("y1_2", ctypes.c_float),
+		("x2_2", ctypes.c_float), ("y2_1", ctypes.c_float), ("x1_2", ctypes.c_float), ("y2_2", ctypes.c_float),
 	]
 	
 	plus4: int
@@ -133,176 +157,50 @@ class AdvcDesc(ctypes.Structure):
 	plus6: int
 	num6: int
 	chnl: int
-	x1_1: float; x1_2: float; x2_1: float; x2_2: float; y1_1: float; y1_2: float; y2_1: float; y2_2: float
+	x1_1: float; y1_1: float; x2_1: float; y1_2: float; x2_2: float; y2_1: float; x1_2: float; y2_2: float
 
 
+class KernDesc8(ctypes.Structure):
+	_fields_ = [("a", ctypes.c_uint16), ("b", ctypes.c_uint16), ("val", ctypes.c_float)]
+	a: int; b: int; val: float
 
-@dataclass
-class Kernel:
-	a: int
-	b: int
-	val: float
-	
-	__struct_8__ = Struct("2Hf")
-	__struct_12__ = Struct("2If")
-	
-	@classmethod
-	def read_8(cls, stream: Stream) -> Kernel:
-		return cls(*cls.__struct_8__.unpack(stream[8]))
-	
-	@classmethod
-	def read_12(cls, stream: Stream) -> Kernel:
-		return cls(*cls.__struct_12__.unpack(stream[12]))
-	
-	def pack(self) -> OLen.bytes(8):
-		return self.__struct_8__.pack(self.a, self.b, self.val)
 
-@dataclass
-class Advance:
-	plus4: int
-	num4: int
-	plus6: int
-	num6: int
-	chnl: int
-	
-	x1_1: float
-	x1_2: float
-	x2_1: float
-	x2_2: float
-	y1_1: float
-	y1_2: float
-	y2_1: float
-	y2_2: float
-	
-	__struct__ = Struct("4HI8f")
-	
-	@classmethod
-	def from_single(cls, plus4: int, num4: int, plus6: int, num6: int, chnl: int, x1: float, x2: float, y1: float, y2: float) -> Advance:
-		return cls(plus4=plus4, num4=num4, plus6=plus6, num6=num6, chnl=chnl, x1_1=x1, x1_2=x1, x2_1=x2, x2_2=x2, y1_1=y1, y1_2=y1, y2_1=y2, y2_2=y2)
-	
-	@classmethod
-	def read(cls, stream: Stream) -> Advance:
-		return cls(*cls.__struct__.unpack(stream[44]))
-	
-	def pack(self) -> bytes:
-		return self.__struct__.pack(self.plus4, self.num4, self.plus6, self.num6, self.chnl, self.x1_1, self.y1_1, self.x2_1, self.y1_2, self.x2_2, self.y2_1, self.x1_2, self.y2_2)
+class KernDesc12(ctypes.Structure):
+	_fields_ = [("a", ctypes.c_uint32), ("b", ctypes.c_uint32), ("val", ctypes.c_float)]
+	a: int; b: int; val: float
 
 
+CHAR_DTYPE = np.dtype(CharDesc)
+UNKN_DTYPE = np.dtype(UnknDesc)
+ADVC_DTYPE = np.dtype(AdvcDesc)
+KERN_DTYPES = {
+	FontVersionEnum.AW1: np.dtype(KernDesc12),
+	FontVersionEnum.AWR: np.dtype(KernDesc12),
+	FontVersionEnum.QBR: np.dtype(KernDesc8),
+}
 
-	
-
-@dataclass
-class Character:
-	bearingX1_1: float
-	bearingX1_2: float
-	bearingY1_1: float
-	bearingY1_2: float
-	bearingX2_1: float
-	bearingX2_2: float
-	bearingY2_1: float
-	bearingY2_2: float
-	x_lo_1: float
-	x_hi_1: float
-	x_lo_2: float
-	x_hi_2: float
-	y_lo_1: float
-	y_hi_1: float
-	y_lo_2: float
-	y_hi_2: float
-	
-	@classmethod
-	def read(cls, stream: Stream) -> Character:
-		return cls(*unpack("16f", stream[64]))
-	
-	@classmethod
-	def from_single(cls, x1: float, x2: float, y1: float, y2: float, x_lo: float, x_hi: float, y_lo: float, y_hi: float) -> Character:
-		return cls(
-			bearingX1_1=x1, bearingX1_2=x1, bearingX2_1=x2, bearingX2_2=x2, bearingY1_1=y1, bearingY1_2=y1, bearingY2_1=y2, bearingY2_2=y2,
-			x_lo_1=x_lo, x_lo_2=x_lo, x_hi_1=x_hi, x_hi_2=x_hi, y_lo_1=y_lo, y_lo_2=y_lo, y_hi_1=y_hi, y_hi_2=y_hi,
-		)
-	
-	def point_x(self, width: int):
-		return self.x_lo_1 * width
-	
-	def point_y(self, height: int):
-		return self.y_lo_1 * height
-	
-	def point_w(self, width: int):
-		return (self.x_hi_1 * width) - (self.x_lo_1 * width)
-	
-	def point_h(self, height: int):
-		return (self.y_hi_1 * height) - (self.y_lo_1 * height)
-
-	def toEntry(self, width: int, height: int, lineHeight: float, size: float) -> CharacterEntry:
-		return CharacterEntry(
-			idx=None,
-			x=int(round(self.point_x(width), 2)),
-			y=int(round(self.point_y(height), 2)),
-			w=int(round(self.point_w(width), 2)),
-			h=int(round(self.point_h(height), 2)),
-			x_o=self.bearingX1_1 * size,
-			y_o=lineHeight - self.bearingY2_1 * size - self.point_h(height),
-			x_adv=None,
-			page=0,
-			chnl=None,
-		)
-	
-	def pack(self) -> bytes:
-		return pack("16f", self.bearingX1_1, self.bearingY2_1, self.x_lo_1, self.y_hi_1, self.bearingX2_1, self.bearingY2_2, self.x_hi_1, self.y_hi_2, self.bearingX2_2, self.bearingY1_1,
-		            self.x_hi_2, self.y_lo_1, self.bearingX1_2, self.bearingY1_2, self.x_lo_2, self.y_lo_2)
-
-
-@dataclass
-class CharacterEntry:
-	idx: None
-	x: int
-	y: int
-	w: int
-	h: int
-	x_o: float
-	y_o: float
-	x_adv: float | None
-	page: int
-	chnl: int | None
+# One row per BMFont `char` line, in the order the line lists them
+BMFONT_CHAR_DTYPE = np.dtype([
+	('id', '<u4'), ('x', '<i4'), ('y', '<i4'), ('width', '<i4'), ('height', '<i4'),
+	('xoffset', '<f8'), ('yoffset', '<f8'), ('xadvance', '<f8'), ('page', '<u1'), ('chnl', '<u1'),
+])
+BMFONT_KERN_DTYPE = np.dtype([('first', '<u4'), ('second', '<u4'), ('amount', '<f8')])
+BMFONT_CHAR_LINE = "char id=%d x=%d y=%d width=%d height=%d xoffset=%s yoffset=%s xadvance=%s page=%d chnl=%d"
+BMFONT_KERN_LINE = "kerning first=%d second=%d amount=%s"
 
+# tab, line feed, carriage return and space get no bearings
+BLANK_IDS = [9, 10, 13, 32]
 
 
-@dataclass
-class Point:
-	x: float
-	y: float
-	w: float
-	h: float
-	
-	def uv_n(self, height: int):
-		return self.y / height
-	
-	def uv_s(self, height: int):
-		return (self.y + self.h) / height
-	
-	def uv_e(self, width: int):
-		return (self.x + self.w) / width
-	
-	def uv_w(self, width: int):
-		return self.x / width
-
+def _bmfont_line(line: str) -> dict[str, str]:
+	return {k: v.strip('"') for k, v in re.findall(r'(\w+)=("[^"]*"|\S+)', line)}
 
-@dataclass
-class Unknown:
-	n1: int
-	n2: int
-	n3: int
-	n4: int
-	n5: int
-	n6: int
-	
-	@classmethod
-	def read(cls, stream: Stream) -> Unknown:
-		return cls(*unpack("6H", stream[12]))
-	
-	def pack(self) -> bytes:
-		return pack("6H", self.n1, self.n2, self.n3, self.n4, self.n5, self.n6)
 
+def _mode(values: np.ndarray) -> float:
+	if len(values) == 0:
+		return 0.0
+	unique, counts = np.unique(values, return_counts=True)
+	return float(unique[counts.argmax()])
 
 
 @dataclass
@@ -313,42 +211,38 @@ class BinaryFont:
 	textureHeight: int
 	textureBytes: bytes
 	
-	characters: list[Character]     = field(default_factory=list)
-	unknown:    list[Unknown]       = field(default_factory=list)
-	advance:    list[Advance]       = field(default_factory=list)
-	ids:        list[int]           = field(default_factory=list)
-	kerning:    list[Kernel]        = field(default_factory=list)
-	fontSize:   float               = field(default=0.0)
-	lineHeight: float               = field(default=0.0)
+	characters: np.recarray     # CHAR_DTYPE
+	unknown:    np.recarray     # UNKN_DTYPE, the 6 triangle indices of every glyph quad
+	advance:    np.recarray     # ADVC_DTYPE
+	ids:        np.ndarray      # character code of every glyph
+	kerning:    np.recarray     # KERN_DTYPES[version]
+	fontSize:   float           = field(default=0.0)
+	lineHeight: float           = field(default=0.0)
 	
 	def __init__(self, stream: Stream):
 		self.version = FontVersionEnum(int(stream))
 		
 		self.char_count = int(stream) // 4
-		self.characters = [x for x in (CharDesc * self.char_count).from_buffer_copy(stream[64 * self.char_count])]
+		self.characters = np.frombuffer(stream[CHAR_DTYPE.itemsize * self.char_count], dtype=CHAR_DTYPE).view(np.recarray)
 		
 		self.unknown_entries = int(stream) // 6
-		self.unknown = [x for x in (UnknDesc * self.char_count).from_buffer_copy(stream[24 * self.char_count])]
+		self.unknown = np.frombuffer(stream[UNKN_DTYPE.itemsize * self.unknown_entries], dtype=UNKN_DTYPE).view(np.recarray)
 		
 		self.advance_count = int(stream)
-		self.advance = [x for x in (AdvcDesc * self.char_count).from_buffer_copy(stream[24 * self.char_count])]
-		
-		idvals = list()
-		for i in range(0xFFFF + 1):
-			idx = stream.i2
-			if idx != 0:
-				self.ids.append(i)
-				idvals.append(idx)
-		self.ids.insert(0, self.ids[0] - 1)
-		
+		self.advance = np.frombuffer(stream[ADVC_DTYPE.itemsize * self.advance_count], dtype=ADVC_DTYPE).view(np.recarray)
+		
+		# code -> glyph index, 0 is both "no glyph" and the first glyph, which is assumed to sit right before the first mapped code
+		id_table = np.frombuffer(stream[2 * 0x10000], dtype='<u2')
+		codes = np.flatnonzero(id_table)
+		self.ids = np.zeros(self.char_count, dtype=np.uint32)
+		self.ids[id_table[codes]] = codes
+		if len(codes) != 0:
+			self.ids[0] = codes[0] - 1
+		
+		if self.version not in KERN_DTYPES:
+			raise ValueError("Unsupported font version")
 		self.kerns_count = int(stream)
-		for _ in range(self.kerns_count):
-			if self.version == FontVersionEnum.QBR:
-				self.kerning.append(Kernel.read_8(stream))
-			elif self.version == FontVersionEnum.AWR:
-				self.kerning.append(Kernel.read_12(stream))
-			else:
-				raise ValueError("Unsupported font version")
+		self.kerning = np.frombuffer(stream[KERN_DTYPES[self.version].itemsize * self.kerns_count], dtype=KERN_DTYPES[self.version]).view(np.recarray)
 		
 		if self.version in [FontVersionEnum.AW1, FontVersionEnum.AWR]:
 			self.textureSize = int(stream)
@@ -366,50 +260,41 @@ class BinaryFont:
 		stream.seek(texturePos)
 		self.textureBytes = stream.read()
 		
-		sizes = []
-		lineHeights = []
-		
-		for idx, char in enumerate(self.characters):
-			size = (char.point_h(self.textureHeight) / (char.bearingY1_1 - char.bearingY2_1)) if char.bearingY1_1 != char.bearingY2_1 else 0.0
-			sizes.append(size)
-			lineHeights.append(-self.advance[idx].y2_1 * size + char.point_h(self.textureHeight) + char.bearingY2_1 * size)
-		self.fontSize = max(set(sizes), key=sizes.count)
-		self.lineHeight = max(set(lineHeights), key=lineHeights.count)
+		chars = self.characters
+		n = min(len(chars), len(self.advance))
+		point_h = chars.y_hi_1.astype(np.float64) * self.textureHeight - chars.y_lo_1.astype(np.float64) * self.textureHeight
+		span = chars.b_y1_1.astype(np.float64) - chars.b_y2_1
+		sizes = np.divide(point_h, span, out=np.zeros_like(point_h), where=span != 0)
+		lineHeights = -self.advance.y2_1[:n].astype(np.float64) * sizes[:n] + point_h[:n] + chars.b_y2_1[:n] * sizes[:n]
+		self.fontSize = _mode(sizes)
+		self.lineHeight = _mode(lineHeights)
 	
 	def write(self, writer: BinaryIO):
 		writer.write(self.version.value.to_bytes(4, "little", signed=False))
 		
 		# char block
 		writer.write((len(self.characters) * 4).to_bytes(4, "little", signed=False))
-		writer.write(b''.join(c.pack() for c in self.characters))
-		
-		# unknown block
-		writer.write((len(self.unknown) * 6).to_bytes(4, "little", signed=False))
-		last_entry = None
-		for i in range(len(self.characters)):
-			# If we reached the end of the unknown list, write the last unknown entry till the end
-			if last_entry == self.unknown[-1]:
-				writer.write(self.unknown[-1].pack())
-			else:
-				writer.write(self.unknown[i].pack())
-				last_entry = self.unknown[i]
+		writer.write(self.characters.tobytes())
+		
+		# unknown block, one entry per character, repeating the last one if there are fewer
+		unknown = self.unknown[:len(self.characters)]
+		if 0 < len(unknown) < len(self.characters):
+			unknown = np.concatenate([unknown, np.repeat(unknown[-1:], len(self.characters) - len(unknown))])
+		writer.write((len(unknown) * 6).to_bytes(4, "little", signed=False))
+		writer.write(unknown.tobytes())
 		
 		# advance block
 		writer.write(len(self.advance).to_bytes(4, "little", signed=False))
-		writer.write(b''.join(a.pack() for a in self.advance))
+		writer.write(self.advance.tobytes())
 		
 		# id block
-		id_table = {i: 0 for i in range(0xFFFF + 1)}
-		base_id = 0
-		for idx in self.ids:
-			id_table[idx] = base_id
-			base_id += 1
-		for idx in id_table.values():
-			writer.write(idx.to_bytes(2, "little", signed=False))
+		id_table = np.zeros(0x10000, dtype='<u2')
+		id_table[self.ids] = np.arange(len(self.ids), dtype='<u2')
+		writer.write(id_table.tobytes())
 		
 		# kerning block
 		writer.write(len(self.kerning).to_bytes(4, "little", signed=False))
-		writer.write(b''.join(kerning.pack() for kerning in self.kerning))
+		writer.write(self.kerning.astype(KERN_DTYPES[self.version]).tobytes())
 		
 		# texture block
 		if self.version in [FontVersionEnum.AW1, FontVersionEnum.AWR]:
@@ -418,117 +303,105 @@ class BinaryFont:
 			writer.write(self.textureUnknownVal)
 		writer.write(self.textureBytes)
 	
-	def convert_to_bmfont(self) -> tuple[list[CharacterEntry], list[Kernel]]:
-		characters = [char.toEntry(self.textureWidth, self.textureHeight, self.lineHeight, self.fontSize) for char in self.characters]
-		for idx, id_value in enumerate(self.ids):
-			characters[idx].idx = id_value
-		
-		for idx, advance in enumerate(self.advance):
-			characters[idx].x_adv = advance.x2_1 * self.fontSize
-			if advance.chnl == 0:
-				characters[idx].chnl = 4
-			elif advance.chnl == 1:
-				characters[idx].chnl = 2
-			elif advance.chnl == 2:
-				characters[idx].chnl = 1
-		
-		kernings = []
+	def convert_to_bmfont(self) -> tuple[np.ndarray, np.ndarray]:
+		"""The glyph and kerning tables as BMFONT_CHAR_DTYPE and BMFONT_KERN_DTYPE arrays, computed column-wise."""
+		chars = self.characters
+		width, height = self.textureWidth, self.textureHeight
+		x_lo = chars.x_lo_1.astype(np.float64) * width
+		y_lo = chars.y_lo_1.astype(np.float64) * height
+		point_w = chars.x_hi_1.astype(np.float64) * width - x_lo
+		point_h = chars.y_hi_1.astype(np.float64) * height - y_lo
+		
+		characters = np.zeros(len(chars), dtype=BMFONT_CHAR_DTYPE)
+		characters['id'] = self.ids[:len(chars)]
+		characters['x'] = np.round(x_lo, 2)
+		characters['y'] = np.round(y_lo, 2)
+		characters['width'] = np.round(point_w, 2)
+		characters['height'] = np.round(point_h, 2)
+		characters['xoffset'] = chars.b_x1_1 * self.fontSize
+		characters['yoffset'] = self.lineHeight - chars.b_y2_1 * self.fontSize - point_h
+		
+		n = min(len(chars), len(self.advance))
+		characters['xadvance'][:n] = self.advance.x2_1[:n] * self.fontSize
+		chnl = self.advance.chnl[:n]
+		characters['chnl'][:n] = np.select([chnl == 0, chnl == 1, chnl == 2], [4, 2, 1], 15)    # 15 is BMFont for all channels
+		
+		kernings = np.zeros(len(self.kerning), dtype=BMFONT_KERN_DTYPE)
+		kernings['first'] = self.kerning.a
+		kernings['second'] = self.kerning.b
 		if self.version == FontVersionEnum.QBR:
-			for kerning in self.kerning:
-				kerning.val = kerning.val * self.fontSize
-				kernings.append(kerning)
-		elif self.version == FontVersionEnum.AWR:
-			for kerning in self.kerning:
-				kerning.val = kerning.val / self.fontSize
-				kernings.append(kerning)
+			kernings['amount'] = self.kerning.val * self.fontSize
+		else:
+			kernings['amount'] = self.kerning.val / self.fontSize
 		
 		return characters, kernings
 	
 	def apply_bmfont_to_binfnt(self, bmfont: list[str]):
-		info_line = bmfont[0].split(" ")
-		info = {x.split("=")[0]: x.split("=")[1].strip() for x in info_line[1:]}
+		info = _bmfont_line(bmfont[0])
 		self.fontSize = float(info["size"])
 		
-		common_line = bmfont[1].split(" ")
-		common = {x.split("=")[0]: x.split("=")[1].strip() for x in common_line[1:]}
+		common = _bmfont_line(bmfont[1])
 		self.lineHeight = float(common["lineHeight"])
 		self.textureWidth = int(common["scaleW"])
 		self.textureHeight = int(common["scaleH"])
 		
-		page = {x.split("=")[0]: x.split("=")[1].strip() for x in bmfont[2].split(" ")[1:]}
-		chars = {x.split("=")[0]: x.split("=")[1].strip() for x in bmfont[3].split(" ")[1:]}
-		expected_chars = int(chars["count"])
-		
-		self.characters.clear()
+		page = _bmfont_line(bmfont[2])
+		expected_chars = int(_bmfont_line(bmfont[3])["count"])
+		
+		keys = ['id', 'x', 'y', 'width', 'height', 'xoffset', 'yoffset', 'xadvance', 'chnl']
+		table = np.array([[float(line[k]) for k in keys] for line in map(_bmfont_line, bmfont[4:4 + expected_chars])], dtype=np.float64).reshape(-1, len(keys))
+		ids, x, y, w, h, xoffset, yoffset, xadvance, chnl = table.T
+		empty = (w == 0) & (h == 0)
+		w = np.where(empty, 6, w)
+		h = np.where(empty, 6, h)
+		size, lineHeight = self.fontSize, self.lineHeight
+		
+		characters = np.zeros(expected_chars, dtype=CHAR_DTYPE).view(np.recarray)
+		for suffix in ['_1', '_2']:
+			characters[f'b_x1{suffix}'] = xoffset / size
+			characters[f'b_x2{suffix}'] = (xoffset + w) / size
+			characters[f'b_y1{suffix}'] = (lineHeight - yoffset) / size
+			characters[f'b_y2{suffix}'] = (lineHeight - yoffset - h) / size
+			characters[f'x_lo{suffix}'] = x / self.textureWidth
+			characters[f'y_lo{suffix}'] = y / self.textureHeight
+			characters[f'x_hi{suffix}'] = (x + w) / self.textureWidth
+			characters[f'y_hi{suffix}'] = (y + h) / self.textureHeight
+		blank = np.isin(ids, BLANK_IDS)
+		for name in ['b_x1_1', 'b_y2_1', 'b_x2_1', 'b_y1_1']:
+			characters[name][blank] = 0
 		
 		num4 = self.advance[0].num4
 		num6 = self.advance[0].num6
+		index = np.arange(expected_chars)
+		
+		advance = np.zeros(expected_chars, dtype=ADVC_DTYPE).view(np.recarray)
+		advance.plus4 = num4 * index
+		advance.num4 = num4
+		advance.plus6 = num6 * index
+		advance.num6 = num6
+		advance.chnl = np.select([chnl == 2, chnl == 1], [1, 2], 0)
+		for suffix in ['_1', '_2']:
+			advance[f'x2{suffix}'] = xadvance / size
+			advance[f'y1{suffix}'] = -yoffset / size - h / size
+			advance[f'y2{suffix}'] = -yoffset / size
+		
+		self.characters = characters
+		self.advance = advance
+		self.ids = ids.astype(np.uint32)
+		
+		expected_kernings = int(_bmfont_line(bmfont[4 + expected_chars])["count"])
+		kernings = [_bmfont_line(line) for line in bmfont[5 + expected_chars:5 + expected_chars + expected_kernings]]
+		kerning = np.zeros(expected_kernings, dtype=KERN_DTYPES[self.version]).view(np.recarray)
+		kerning.a = [int(x["first"]) for x in kernings]
+		kerning.b = [int(x["second"]) for x in kernings]
+		amount = np.array([float(x["amount"]) for x in kernings], dtype=np.float64)
+		if self.version in [FontVersionEnum.AW1, FontVersionEnum.AWR]:
+			kerning.val = amount * size
+		elif self.version == FontVersionEnum.QBR:
+			kerning.val = amount / size
+		self.kerning = kerning
 		
-		self.advance.clear()
-		self.ids.clear()
-		
-		for i in range(expected_chars):
-			char: dict[str, str | int] = {x.split("=")[0]: x.split("=")[1].strip() for x in bmfont[4 + i].split(" ")[1:]}
-			
-			if int(char["width"]) == 0 and int(char["height"]) == 0:
-				char["width"] = 6
-				char["height"] = 6
-			
-			point = Point(x=float(char["x"]), y=float(char["y"]), w=int(char["width"]), h=int(char["height"]))
-			binfntChar = Character.from_single(
-				x1=float(char["xoffset"]) / self.fontSize,
-				x2=(float(char["xoffset"]) + float(char["width"])) / self.fontSize,
-				y1=(self.lineHeight - float(char["yoffset"])) / self.fontSize,
-				y2=(self.lineHeight - float(char["yoffset"]) - int(char["height"])) / self.fontSize,
-				x_lo=point.uv_w(self.textureWidth), y_lo=point.uv_n(self.textureHeight),
-				x_hi=point.uv_e(self.textureWidth), y_hi=point.uv_s(self.textureHeight),
-			)
-			
-			if int(char["id"]) in [9, 10, 13, 32]:
-				binfntChar.bearingX1_1 = 0
-				binfntChar.bearingY2_1 = 0
-				binfntChar.bearingX2_1 = 0
-				binfntChar.bearingY1_1 = 0
-			
-			self.characters.append(binfntChar)
-			
-			match int(char["chnl"]):
-				case 2:
-					chnl = 1
-				case 1:
-					chnl = 2
-				case _:
-					chnl = 0
-			
-			advance = Advance.from_single(
-				plus4=num4 * i, num4=num4, plus6=num6 * i, num6=num6,
-				chnl=chnl, x1=0, x2=float(char["xadvance"]) / self.fontSize,
-				y1=(-float(char["yoffset"]) / self.fontSize) - int(char["height"]) / self.fontSize, y2=-float(char["yoffset"]) / self.fontSize,
-			)
-			
-			self.advance.append(advance)
-			self.ids.append(int(char["id"]))
-		
-		kernings_line = bmfont[4 + expected_chars].split(" ")
-		kernings = {x.split("=")[0]: x.split("=")[1].strip() for x in kernings_line[1:]}
-		expected_kernings = int(kernings["count"])
-		
-		self.kerning.clear()
-		
-		for i in range(expected_kernings):
-			kerning_line = bmfont[5 + expected_chars + i].split(" ")
-			kerning = {x.split("=")[0]: x.split("=")[1].strip() for x in kerning_line[1:]}
-			
-			if self.version in [FontVersionEnum.AW1, FontVersionEnum.AWR]:
-				amount = float(kerning["amount"]) * self.fontSize
-			elif self.version == FontVersionEnum.QBR:
-				amount = float(kerning["amount"]) / self.fontSize
-			else:
-				amount = None
-			
-			self.kerning.append(Kernel(a=int(kerning["first"]), b=int(kerning["second"]), val=amount))
-		
-		return page["file"].strip('"')
+		return page["file"]
 	
 	def decompile(self, name: str, output_dir: Path, separate_chars: bool = False):
 		characters, kernings = self.convert_to_bmfont()
@@ -544,12 +417,9 @@ class BinaryFont:
 			f.write(f"common lineHeight={self.lineHeight} base=0 scaleW={self.textureWidth} scaleH={self.textureHeight} pages=1\n")
 			f.write(f'page id=0 file="{bitmap_file.name}"\n')
 			f.write(f"chars count={len(characters)}\n")
-			for char in characters:
-				f.write(
-					f"char id={char.idx} x={char.x} y={char.y} width={round(char.w)} height={round(char.h)} xoffset={char.x_o} yoffset={char.y_o} xadvance={char.x_adv} page={char.page} chnl={char.chnl}\n")
+			np.savetxt(f, characters, fmt=BMFONT_CHAR_LINE)
 			f.write(f"kernings count={len(kernings)}\n")
-			for kerning in kernings:
-				f.write(f"kerning first={kerning.a} second={kerning.b} amount={kerning.val}\n")
+			np.savetxt(f, kernings, fmt=BMFONT_KERN_LINE)
 		
 		if self.version.value == 7:
 			bitmap = Image.open(BytesIO(convert_r16f_to_bgra8(Stream(self.textureBytes))))
@@ -558,11 +428,9 @@ class BinaryFont:
 				char_bitmap_dir = output_dir / "chars"
 				char_bitmap_dir.mkdir(parents=True, exist_ok=True)
 				
-				for char in characters:
-					if char.w == 0 or char.h == 0:
-						continue
-					char_bitmap = bitmap.crop((char.x, char.y, char.x + char.w, char.y + char.h))
-					char_bitmap.save(char_bitmap_dir / f"{char.idx}.png")
+				for char in characters[(characters['width'] != 0) & (characters['height'] != 0)]:
+					char_bitmap = bitmap.crop((char['x'], char['y'], char['x'] + char['width'], char['y'] + char['height']))
+					char_bitmap.save(char_bitmap_dir / f"{char['id']}.png")
 			else:
 				with open(bitmap_file, "wb") as f:
 					bitmap.save(f, "PNG")
@@ -573,7 +441,7 @@ class BinaryFont:
 	def compile(self, modified_file: Path, output_file: Path | None = None) -> None:
 		if modified_file.suffix != ".fnt":
 			raise ValueError(f"{modified_file} is not a .fnt file!")
-
+		
 		with open(modified_file, "r") as f:
 			bitmap_file_path = self.apply_bmfont_to_binfnt(f.readlines())
 		
@@ -598,13 +466,12 @@ class BinaryFont:
 						f"Neither {char_dir} or {bitmap_file_path} exist! Please ensure that the character bitmaps are in a directory named 'chars' in the same directory as the .fnt file.")
 				
 				compiled_bitmap = Image.new("RGBA", (self.textureWidth, self.textureHeight), (255, 255, 255, 127))
-				for i, char in enumerate(self.characters):
-					idx = self.ids[i]
-					if not (char_dir / f"{idx}.png").exists():
+				characters, _ = self.convert_to_bmfont()
+				for char in characters:
+					if not (char_dir / f"{char['id']}.png").exists():
 						continue
-					point = char.toEntry(self.textureWidth, self.textureHeight, self.lineHeight, self.fontSize)
-					bitmap_char = Image.open(char_dir / f"{idx}.png")
-					compiled_bitmap.paste(bitmap_char, (point.x, point.y))
+					bitmap_char = Image.open(char_dir / f"{char['id']}.png")
+					compiled_bitmap.paste(bitmap_char, (int(char['x']), int(char['y'])))
 			else:
 				raise AssertionError(f"{bitmap_file_path} unsupported binfnt version: {self.version}")
 		else:
@@ -627,6 +494,7 @@ class BinaryFont:
 		with open(output_file, "wb") as f:
 			self.write(f)
 
+
 def convert_r16f_to_bgra8(r16f: Stream) -> bytes:
 	r16f.seek(12)
 	
@@ -646,22 +514,13 @@ def convert_r16f_to_bgra8(r16f: Stream) -> bytes:
 	bgra8 += b"DDS |\x00\x00\x00\x0f\x10\x02\x00" + textureHeight.to_bytes(4, "little") + textureWidth.to_bytes(4, "little") + (textureWidth * 2).to_bytes(4, "little")
 	bgra8 += b"\x01\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00A\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\xff\x00\x00\xff\x00\x00\xff\x00\x00\x00\x00\x00\x00\xff\x00\x10\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
 	
-	# Convert R16F to BGRA8
-	for _ in range(textureWidth * textureHeight):
-		hGray = r16f.f2
-		# normalize alpha to [-9,9]
-		normalized_value = ((9 - hGray) * 255) / 18
-		if normalized_value < 0:
-			alpha = 0
-		elif normalized_value > 255:
-			alpha = 255
-		else:
-			alpha = int(normalized_value)
-		
-		if alpha > 0:
-			bgra8 += pack("BBBB", 255, 255, 255, alpha)
-		else:
-			bgra8 += pack("BBBB", 0, 0, 0, 0)
+	# Convert R16F to BGRA8, normalizing [-9,9] to an alpha of [255,0]
+	hGray = np.frombuffer(r16f[textureWidth * textureHeight * 2], dtype='<f2').astype(np.float64)
+	alpha = np.nan_to_num(np.clip(((9 - hGray) * 255) / 18, 0, 255), nan=0).astype(np.uint8)
+	pixels = np.zeros((alpha.size, 4), dtype=np.uint8)
+	pixels[alpha > 0] = 255
+	pixels[:, 3] = alpha
+	bgra8 += pixels.tobytes()
 	return bytes(bgra8)
 
 
@@ -673,27 +532,90 @@ def convert_bgra8_to_r16f(bgra8: Stream) -> bytes:
 	
 	bgra8.seek(128)
 	
-	r16f = bytearray
+	r16f = bytearray()
 	r16f += b"DDS |\x00\x00\x00\x0f\x10\x02\x00"
 	r16f += textureHeight.to_bytes(4, "little")
 	r16f += textureWidth.to_bytes(4, "little")
 	r16f += (textureWidth * 2).to_bytes(4, "little")
 	r16f += b"\x01\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x04\x00\x00\x00o\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x10\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
 	
-	# Read BGRA8 and convert to grayscale R16F
-	for _ in range(textureWidth * textureHeight):
-		b, g, r, a = bgra8.read(4)
-		
-		# Normalize alpha to [-9,9]
-		hGray = -(18 * a / 255.0 - 9.0)
-		
-		if a > 0:
-			# Convert hGray to float16
-			r16f += pack("f", hGray)
-		else:
-			r16f += pack("h", 32767)
-	
+	# Read BGRA8 alpha and convert to grayscale R16F, normalizing it to [-9,9]. Fully transparent pixels get 0x7FFF.
+	alpha = np.frombuffer(bgra8[textureWidth * textureHeight * 4], dtype=np.uint8)[3::4]
+	hGray = np.clip(9.0 - alpha.astype(np.float64) * (18 / 255), -9.0, 9.0).astype('<f2')
+	r16f += np.where(alpha > 0, hGray.view('<u2'), np.uint16(0x7FFF)).astype('<u2').tobytes()
 	return bytes(r16f)
 
 
-
+def benchmark_atlas_conversion(sizes: tuple[int, ...] = (512, 1024, 2048, 4096)):
+	"""Round-trips random glyph atlases through both conversions, checking alpha survives within 1 and logging throughput."""
+	for size in sizes:
+		alpha = np.random.default_rng(size).integers(0, 256, size * size, dtype=np.uint8)
+		pixels = np.zeros((size * size, 4), dtype=np.uint8)
+		pixels[:, 3] = alpha
+		header = bytearray(128)
+		header[12:20] = size.to_bytes(4, "little") + size.to_bytes(4, "little")
+		bgra8 = bytes(header) + pixels.tobytes()
+		
+		with TimerLog(f"binfnt BGRA8 -> R16F, {size}x{size} ({size * size * 4 / 1048576:.1f} MB)"):
+			r16f = convert_bgra8_to_r16f(Stream(bgra8))
+		with TimerLog(f"binfnt R16F -> BGRA8, {size}x{size} ({size * size * 2 / 1048576:.1f} MB)"):
+			back = convert_r16f_to_bgra8(Stream(r16f))
+		
+		alpha_back = np.frombuffer(back, dtype=np.uint8, offset=128)[3::4]
+		diff = np.abs(alpha_back.astype(np.int16) - alpha.astype(np.int16))
+		assert len(r16f) == 128 + size * size * 2, len(r16f)
+		assert np.all(diff <= 1), f"alpha round trip off by up to {diff.max()}"
+		assert not np.any(alpha_back[alpha == 0]), "transparent pixels did not survive the round trip"
+
+
+def benchmark_font_round_trip(glyphs: int = 20000, kernings: int = 5000):
+	"""Round-trips a synthetic Quantum Break font the size of a CJK localization through binfnt and BMFont, logging how long each step takes."""
+	rng = np.random.default_rng(glyphs)
+	characters = np.zeros(glyphs, dtype=CHAR_DTYPE)
+	for name in CHAR_DTYPE.names:
+		characters[name] = rng.random(glyphs, dtype=np.float32)
+	unknown = np.zeros(glyphs, dtype=UNKN_DTYPE)
+	for name, value in zip(UNKN_DTYPE.names, [0, 1, 2, 0, 2, 3]):
+		unknown[name] = value
+	advance = np.zeros(glyphs, dtype=ADVC_DTYPE)
+	for name in ADVC_DTYPE.names[5:]:
+		advance[name] = rng.random(glyphs, dtype=np.float32)
+	advance['num4'], advance['num6'], advance['chnl'] = 4, 6, rng.integers(0, 3, glyphs)
+	id_table = np.zeros(0x10000, dtype='<u2')
+	id_table[0x4E00:0x4E00 + glyphs] = np.arange(glyphs)
+	kerning = np.zeros(kernings, dtype=KERN_DTYPES[FontVersionEnum.QBR])
+	kerning['a'], kerning['b'] = rng.integers(0x4E00, 0x4E00 + glyphs, (2, kernings))
+	kerning['val'] = rng.random(kernings, dtype=np.float32)
+	texture = bytearray(128 + 64 * 64 * 2)
+	texture[:4] = b"DDS "
+	texture[12:20] = (64).to_bytes(4, "little") + (64).to_bytes(4, "little")
+	texture[84:88] = (111).to_bytes(4, "little")
+	binfnt = b''.join([
+		pack("<2I", FontVersionEnum.QBR, glyphs * 4), characters.tobytes(),
+		pack("<I", glyphs * 6), unknown.tobytes(),
+		pack("<I", glyphs), advance.tobytes(),
+		id_table.tobytes(),
+		pack("<I", kernings), kerning.tobytes(),
+		bytes(8), texture,
+	])
+
+	with TimerLog(f"binfnt read, {glyphs} glyphs"):
+		font = BinaryFont(Stream(binfnt))
+	with TimerLog(f"binfnt write, {glyphs} glyphs"):
+		written = BytesIO()
+		font.write(written)
+	assert written.getvalue() == binfnt, "binfnt did not survive a read/write round trip"
+
+	with TemporaryDirectory() as tmp:
+		with TimerLog(f"binfnt -> BMFont, {glyphs} glyphs"):
+			font.decompile("bench", Path(tmp))
+		with TimerLog(f"BMFont -> binfnt, {glyphs} glyphs"):
+			with open(Path(tmp) / "bench.fnt") as f:
+				font.apply_bmfont_to_binfnt(f.readlines())
+	assert len(font.characters) == glyphs and len(font.kerning) == kernings
+	assert np.array_equal(font.ids[1:], np.arange(0x4E01, 0x4E00 + glyphs))
+
+
+if __name__ == '__main__':
+	benchmark_atlas_conversion()
+	benchmark_font_round_trip()
@@ -1,45 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Literal
+
+import numpy as np
+from loguru import logger
+
+from mulch import Stream, TimerLog
+
+
+VERTEX_DTYPE = np.dtype([('position', '<f4', (3,)), ('extra', 'i1', (4,))])    # extra: 4 signed bytes, meaning unknown
+PLY_FACE_DTYPE = np.dtype([('count', 'u1'), ('indices', '<u4', (3,))])
 
-from mulch import Stream
 
+@dataclass
+class GrassMesh:
+	name: str
+	vertices: np.ndarray    # VERTEX_DTYPE
+	faces: np.ndarray       # (n, 3) <u2, indices into this mesh's vertices
 
-def bingrs2dict(bingrsfile: Path):
-	with Stream(bingrsfile) as stream:
+	@property
+	def positions(self) -> np.ndarray:
+		return self.vertices['position']
+
+	def dict(self):
+		return {
+			'name'    : self.name,
+			'vertices': len(self.vertices),
+			'faces'   : len(self.faces),
+		}
+
+
+@dataclass
+class GrassFile:
+	version: int
+	num_vert: int
+	num_indc: int
+	uniforms: dict[str, str] = field(kw_only=True)
+	meshes: list[GrassMesh] = field(kw_only=True)
+
+	@classmethod
+	def read(cls, stream: Stream) -> GrassFile:
 		version = int(stream)
 		if version != 3:
 			raise Exception("Invalid version")
-		
+
 		num_mesh = int(stream)
 		num_vert = int(stream)
 		num_indc = int(stream)
-		
+
 		# Uniforms
-		num_uniforms = int(stream)
-		for i in range(num_uniforms):
+		uniforms = dict()
+		for i in range(int(stream)):
 			name = stream.string(int(stream))
-			
 			uniform_type = int(stream)
 			if uniform_type == 7:
-				texture_name = stream.integer(stream)
+				uniforms[name] = stream.string(int(stream))
 			else:
 				# Both Alan Wake and Alan Wakes American nightmare only have one color map sampler
-				raise Exception("")
-		
+				raise Exception(f"Unknown uniform type {uniform_type} for {name}")
+
 		# Meshes
+		meshes = list()
 		for i in range(num_mesh):
-			object_name = f"grass_{i}"
 			num_mesh_vertices = int(stream)
 			num_mesh_indices = int(stream)
-			
-			for j in range(num_mesh_vertices):
-				pos = dict(x=float(stream), y=float(stream), z=float(stream))
-				unk1_1 = stream.unpack('b')[0]
-				unk1_2 = stream.unpack('b')[0]
-				unk1_3 = stream.unpack('b')[0]
-				unk1_4 = stream.unpack('b')[0]
-			
-			for j in range(0, num_mesh_indices, 3):
-				face = [1, 1, 1]
-				face[0] += stream.integer(2)
-				face[1] += stream.integer(2)
-				face[2] += stream.integer(2)
\ No newline at end of file
+			vertices = np.frombuffer(stream.read(num_mesh_vertices * VERTEX_DTYPE.itemsize), dtype=VERTEX_DTYPE, count=num_mesh_vertices)
+			indices = np.frombuffer(stream.read(num_mesh_indices * 2), dtype='<u2', count=num_mesh_indices)
+			if num_mesh_indices % 3 != 0:
+				logger.warning(f"grass_{i} has {num_mesh_indices} indices, dropping the last {num_mesh_indices % 3}")
+			meshes.append(GrassMesh(f"grass_{i}", vertices, indices[:num_mesh_indices - num_mesh_indices % 3].reshape(-1, 3)))
+		return cls(version, num_vert, num_indc, uniforms=uniforms, meshes=meshes)
+
+	@classmethod
+	def from_path(cls, path: Path) -> GrassFile:
+		with Stream(path) as stream:
+			return cls.read(stream)
+
+	def dict(self):
+		return {
+			'version' : self.version,
+			'vertices': self.num_vert,
+			'indices' : self.num_indc,
+			'uniforms': self.uniforms,
+			'meshes'  : [x.dict() for x in self.meshes],
+		}
+
+	def write_obj(self, path: Path):
+		"""Writes every mesh as its own OBJ object, a mesh at a time."""
+		offset = 1
+		with open(path, 'w') as f:
+			for name, texture in self.uniforms.items():
+				f.write(f"# {name}: {texture}\n")
+			for mesh in self.meshes:
+				f.write(f"o {mesh.name}\n")
+				np.savetxt(f, mesh.positions, fmt='v %.6f %.6f %.6f')
+				np.savetxt(f, mesh.faces.astype(np.uint32) + offset, fmt='f %d %d %d')
+				offset += len(mesh.vertices)
+
+	def write_ply(self, path: Path):
+		"""Writes all meshes merged into one binary PLY, the unknown vertex bytes kept as char properties."""
+		vertices = sum(len(x.vertices) for x in self.meshes)
+		faces = sum(len(x.faces) for x in self.meshes)
+		with open(path, 'wb') as f:
+			f.write('\n'.join([
+				'ply', 'format binary_little_endian 1.0',
+				f'element vertex {vertices}', 'property float x', 'property float y', 'property float z',
+				*[f'property char extra{i}' for i in range(4)],
+				f'element face {faces}', 'property list uchar uint vertex_indices',
+				'end_header', '']).encode())
+			for mesh in self.meshes:
+				f.write(mesh.vertices.tobytes())
+			offset = 0
+			for mesh in self.meshes:
+				face_records = np.empty(len(mesh.faces), dtype=PLY_FACE_DTYPE)
+				face_records['count'] = 3
+				face_records['indices'] = mesh.faces.astype(np.uint32) + offset
+				f.write(face_records.tobytes())
+				offset += len(mesh.vertices)
+
+
+def bingrs2dict(bingrsfile: Path) -> dict:
+	return GrassFile.from_path(bingrsfile).dict()
+
+
+def convert_bingrs(paths: Iterable[Path], out_dir: Path, fmt: Literal['obj', 'ply'] = 'obj') -> list[Path]:
+	"""Converts a whole set of grass files, one output file per input."""
+	out_dir.mkdir(parents=True, exist_ok=True)
+	written = list()
+	with TimerLog(f"convert_bingrs - {fmt}"):
+		for path in paths:
+			grs = GrassFile.from_path(path)
+			out = out_dir / f"{path.stem}.{fmt}"
+			match fmt:
+				case 'obj':
+					grs.write_obj(out)
+				case 'ply':
+					grs.write_ply(out)
+			written.append(out)
+	return written
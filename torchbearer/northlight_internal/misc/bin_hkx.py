@@ -1,54 +1,173 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 
-from mulch import Stream
-
-
-def binhkx2dict(binhkxfile: Path):
-	with Stream(binhkxfile) as stream:
-		magic_id_1 = int(stream)
-		magic_id_2 = int(stream)
-		
-		if magic_id_1 != 0x57e0e057 or magic_id_2 != 0x10c0c010:
-			raise Exception("Invalid magic id")
-		
-		user_tag = int(stream)
-		file_version = int(stream)
-		unknown_skip = stream[4]  # Structure layout rules
-		
-		num_sections = int(stream)
-		
-		contents_section_index = int(stream)
-		contents_section_offset = int(stream)
-		class_name_section_index = int(stream)
-		class_name_section_offset = int(stream)
-		reserved = stream[16]  # Reserved
-		flags = int(stream)
-		pad = stream[4]  # Pad
-		
-		class_names = {}
-		
+import numpy as np
+
+
+HKX_MAGIC = struct.pack('<2I', 0x57E0E057, 0x10C0C010)     # reads the same in either byte order
+
+
+def fixup_dtype(endi: str, *names: str) -> np.dtype:
+	return np.dtype([(x, f'{endi}u4') for x in names])
+
+
+@dataclass
+class HKXSection:
+	index: int
+	tag: str
+	start: int                  # absolute, every other offset is relative to it
+	local_fixups_offset: int
+	global_fixups_offset: int
+	virtual_fixups_offset: int
+	exports_offset: int
+	imports_offset: int
+	end_offset: int
+	packfile: HKXPackfile = field(kw_only=True, repr=False)
+
+	@property
+	def data(self) -> memoryview:
+		"""The section's object data, without the fixup tables that follow it."""
+		return self.packfile.buffer[self.start:self.start + self.local_fixups_offset]
+
+	def _fixups(self, begin: int, end: int, dtype: np.dtype) -> np.ndarray:
+		count = (end - begin) // dtype.itemsize
+		fixups = np.frombuffer(self.packfile.buffer, dtype=dtype, count=count, offset=self.start + begin)
+		return fixups[fixups[dtype.names[0]] != 0xFFFFFFFF]  # tables are padded with 0xFF
+
+	@cached_property
+	def local_fixups(self) -> np.ndarray:
+		"""Pointers within this section: (src, dst)."""
+		return self._fixups(self.local_fixups_offset, self.global_fixups_offset, fixup_dtype(self.packfile.endi, 'src', 'dst'))
+
+	@cached_property
+	def global_fixups(self) -> np.ndarray:
+		"""Pointers into any section: (src, dst_section, dst)."""
+		return self._fixups(self.global_fixups_offset, self.virtual_fixups_offset, fixup_dtype(self.packfile.endi, 'src', 'dst_section', 'dst'))
+
+	@cached_property
+	def virtual_fixups(self) -> np.ndarray:
+		"""Object instances: (src, class_section, class_offset), the latter pointing at a name in the classnames section."""
+		return self._fixups(self.virtual_fixups_offset, self.exports_offset, fixup_dtype(self.packfile.endi, 'src', 'class_section', 'class_offset'))
+
+	def dict(self):
+		return {
+			'tag'           : self.tag,
+			'start'         : self.start,
+			'size'          : self.local_fixups_offset,
+			'local fixups'  : len(self.local_fixups),
+			'global fixups' : len(self.global_fixups),
+			'virtual fixups': len(self.virtual_fixups),
+		}
+
+
+class HKXPackfile:
+	"""Index of a Havok packfile: header, section table, classnames and fixup arrays. Sections are views of the source buffer, nothing gets copied."""
+	buffer: memoryview
+	endi: str
+	user_tag: int
+	file_version: int
+	layout_rules: bytes     # bytes in pointer, little endian, reuse padding optimization, empty base class optimization
+	contents_section_index: int
+	contents_section_offset: int
+	class_name_section_index: int
+	class_name_section_offset: int
+	contents_version: str
+	flags: int
+	sections: list[HKXSection]
+
+	def __init__(self, buffer: bytes | bytearray | memoryview | mmap.mmap):
+		self.buffer = memoryview(buffer)
+		if bytes(self.buffer[:8]) != HKX_MAGIC:
+			raise ValueError("Invalid magic id")
+		# the magic is a palindrome, the byte order is only told by the second layout rule
+		self.endi = '<' if self.buffer[17] else '>'
+		(self.user_tag, self.file_version, self.layout_rules, num_sections, self.contents_section_index, self.contents_section_offset,
+		 self.class_name_section_index, self.class_name_section_offset, contents_version, self.flags, max_predicate, predicate_size) = struct.unpack_from(f'{self.endi}2I4s5I16sIhh', self.buffer, 8)
+		self.contents_version = contents_version.split(b'\0')[0].decode('ascii')
+
+		position = 64
+		if self.file_version >= 11 and max_predicate != -1:
+			position += predicate_size
+		header_size = 64 if self.file_version >= 11 else 48
+		self.sections = list()
 		for i in range(num_sections):
-			section_name = stream[19].decode("ascii").replace("\0", "")
-			stream.seek(1, 1)
-			
-			section_node = {
-				'type'                 : section_name,
-				'absolute_data_start'  : int(stream),
-				'local_fixups_offset'  : int(stream),
-				'global_fixups_offset' : int(stream),
-				'virtual_fixups_offset': int(stream),
-				'exports_offset'       : int(stream),
-				'imports_offset'       : int(stream),
-				'end_offset'           : int(stream)
-			}
-			
-			with stream(ofst=section_node['absolute_data_start']):
-				if section_name == "__classnames__":
-					while True:
-						tag = int(stream)
-						if tag == 0xFFFFFFFF:
-							break
-				elif section_name == "__types__":
-					pass
-				elif section_name == "__data__":
-					pass
\ No newline at end of file
+			tag, *offsets = struct.unpack_from(f'{self.endi}20s7I', self.buffer, position)
+			self.sections.append(HKXSection(i, tag.split(b'\0')[0].decode('ascii'), *offsets, packfile=self))
+			position += header_size
+
+	@classmethod
+	def from_path(cls, path: Path) -> HKXPackfile:
+		"""Maps the file instead of reading it, the map lives as long as any view of it does."""
+		with open(path, 'rb') as f:
+			return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+	@staticmethod
+	def find_offsets(data: bytes | bytearray | memoryview | mmap.mmap) -> list[int]:
+		"""Offsets of every packfile magic in `data`, for containers that embed one or more packfiles."""
+		haystack = bytes(data) if isinstance(data, memoryview) else data
+		found = list()
+		position = haystack.find(HKX_MAGIC)
+		while position != -1:
+			found.append(position)
+			position = haystack.find(HKX_MAGIC, position + 1)
+		return found
+
+	@classmethod
+	def find_all(cls, data: bytes | bytearray | memoryview | mmap.mmap) -> list[HKXPackfile]:
+		view = memoryview(data)
+		return [cls(view[x:]) for x in cls.find_offsets(data)]
+
+	def section(self, tag: str) -> HKXSection | None:
+		for x in self.sections:
+			if x.tag == tag:
+				return x
+		return None
+
+	@cached_property
+	def classnames(self) -> dict[int, tuple[int, str]]:
+		"""Classname section entries keyed by the offset of their name (what virtual fixups point at): (signature, name)."""
+		names = dict()
+		section = self.sections[self.class_name_section_index]
+		data = bytes(section.data)   # small enough, and bytes.index beats walking a memoryview
+		position = 0
+		while position + 5 <= len(data):
+			signature, = struct.unpack_from(f'{self.endi}I', data, position)
+			if signature == 0xFFFFFFFF or data[position + 4] != 0x09:
+				break
+			end = data.index(b'\0', position + 5)
+			names[position + 5] = (signature, data[position + 5:end].decode('ascii'))
+			position = end + 1
+		return names
+
+	def objects(self, tag: str = '__data__') -> list[tuple[int, str]]:
+		"""(offset in section, class name) of every object instance in a section."""
+		section = self.section(tag)
+		if section is None:
+			return list()
+		names = self.classnames
+		return [(int(x['src']), names.get(int(x['class_offset']), (0, '?'))[1]) for x in section.virtual_fixups]
+
+	def dict(self):
+		classes = dict()
+		for _, name in self.objects():
+			classes[name] = classes.get(name, 0) + 1
+		return {
+			'endian'          : 'little' if self.endi == '<' else 'big',
+			'user tag'        : self.user_tag,
+			'file version'    : self.file_version,
+			'layout rules'    : list(self.layout_rules),
+			'contents version': self.contents_version,
+			'flags'           : self.flags,
+			'sections'        : [x.dict() for x in self.sections],
+			'classnames'      : len(self.classnames),
+			'objects'         : dict(sorted(classes.items())),
+		}
+
+
+def binhkx2dict(binhkxfile: Path) -> dict:
+	return HKXPackfile.from_path(binhkxfile).dict()
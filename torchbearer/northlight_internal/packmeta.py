@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import inspect
+import struct
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Literal
 from zlib import crc32
+
+import numpy as np
 from loguru import logger
 
-from mulch import Stream
-from .cid_base import Datastream, DSC, FileMetadataEntry_v1, FileMetadataEntry_v2, ResourceID_content_v1, ResourceID_v1
+from mulch import Stream, TimerLog, yamlstream, jsonstream, jsonlines, bindump
+from .cid_base import Datastream, DSC, Tracking, TrackMode, FileMetadataEntry_v1, FileMetadataEntry_v2, ResourceID_content_v1, ResourceID_v1
 from .types_general import RID
 
 
@@ -112,7 +116,26 @@ class PackMeta:
 			self.pmf_defs.append(PackMetaFile(ofst=k, name=self.names[i], rid=self.rid_ofsts.get(k, None), meta=metas))
 	
 	def dict(self) -> dict:
-		return {'tdefs': [x.dict() for x in self.pmt_defs], 'files': [x.dict() for x in self.pmf_defs]}
+		# shallow, the serializers descend into each file as they get to it
+		return {'tdefs': self.pmt_defs, 'files': self.pmf_defs}
+	
+	def export(self, path: Path, mode: Literal['yaml', 'json', 'jsonl', 'bin'] = 'yaml', truncate: int | None = 256):
+		"""
+		Writes dict() to `path` as it's walked, a whole Control packmeta never has to sit in memory as text or as a converted tree. 'bin' writes the binary
+		tree format instead, which mulch.binload maps back in without reparsing anything.
+		"""
+		if mode == 'bin':
+			with TimerLog(f"PackMeta export of '{self.file.name}' to {mode}"):
+				bindump(self.dict(), path)
+			return
+		with TimerLog(f"PackMeta export of '{self.file.name}' to {mode}"), path.open('w', encoding='utf-8') as f:
+			match mode:
+				case 'yaml':
+					yamlstream(self.dict(), f, truncate=truncate)
+				case 'json':
+					jsonstream(self.dict(), f, truncate=truncate)
+				case 'jsonl':
+					jsonlines(self.dict(), f, truncate=truncate)
 	
 	def log_partial_files(self):
 		for x in self.pmf_defs:
@@ -126,16 +149,21 @@ class PackMeta:
 	
 	@staticmethod
 	def log_instances_containers():
-		for k, v in DSC.__dsc_objs__.items():
-			logger.info(f"Container instance count for {k.__name__}: {len(v)}")
+		"""Needs Tracking in Count or Weak mode."""
+		for k, v in DSC.__dsc_cnts__.items():
+			logger.info(f"Container instance count for {k.__name__}: {v}")
 		
 	@staticmethod
 	def log_instances_datastream():
-		for k, v in Datastream.__ds_meta_objs__.items():
-			logger.info(f"Datastream instance count for {k.__ds_name__} v{k.__ds_vrsn__}: {len(v)}")
+		"""Needs Tracking in Count or Weak mode."""
+		for k, v in Datastream.__ds_meta_cnts__.items():
+			logger.info(f"Datastream instance count for {k.__ds_name__} v{k.__ds_vrsn__}: {v}")
 	
 	@staticmethod
 	def log_unknown_dsc_subtypes():
+		"""Needs Tracking in Weak mode, as it looks at the instances themselves."""
+		if Tracking.mode is not TrackMode.Weak:
+			logger.warning(f"Unknown DSC subtypes can only be logged with weak instance tracking (current mode: {Tracking.mode.name})")
 		for k, v in Datastream.__ds_meta_objs__.items():
 			annos = inspect.get_annotations(k)
 			for subfield in k.__so_fields__():
@@ -150,6 +178,7 @@ class PackMeta:
 	
 	@staticmethod
 	def debug_all_packmetas():
+		Tracking.set(TrackMode.Weak)
 		z = list()
 		for pmf in Path('D:/northlight').rglob('*.packmeta'):
 			if 'control' in str(pmf).lower():
@@ -162,6 +191,146 @@ class PackMeta:
 		PackMeta.log_instances_containers()
 		PackMeta.log_instances_datastream()
 		PackMeta.log_unknown_dsc_subtypes()
+	
+	@staticmethod
+	def benchmark_tracking(pmf: Path, vrsn_minor: int = 9, repeats: int = 3):
+		"""Times full decodes of a packmeta (Control's being the big one) in each tracking mode."""
+		mode = Tracking.mode
+		for track in TrackMode:
+			Tracking.set(track)
+			for i in range(repeats):
+				Tracking.reset()
+				with TimerLog(f"PackMeta decode of '{pmf.name}' with tracking {track.name} ({i + 1}/{repeats})"):
+					PackMeta(pmf, vrsn_minor)
+		Tracking.reset()
+		Tracking.set(mode)
+
+
+class PackMetaIndex:
+	"""Lazy take on PackMeta: the header, name table and offset table get parsed up front, the RID table, metadata trees and
+	FileMetadataEntry list only get indexed by container position, and the metadata of a single file gets decoded when asked for."""
+	file:           Path
+	vrsn_minor:     int
+	data:           bytes
+	count_files:    int                 # file count
+	count_mtdtt:    int                 # idk, metadata tree count?
+	count_telem:    int                 # elements on the metadata trees
+	count_nsize:    int                 # namesize
+	names:          list[str]           # element names
+	ofsts:          np.ndarray          # element offsets
+	name_index:     dict[str, int]      # element name -> element index
+	rid_index:      dict[int, int]      # element offset -> position of its RID
+	pmt_defs:       list[PackMetaType]
+	tree_pos:       list[np.ndarray]    # container positions for each metadata tree
+	fme_pos:        dict[int, int]      # element offset -> position of its FileMetadataEntry container
+	
+	_tree_cache:    dict[int, DSC]
+	
+	def __init__(self, file: Path, vrsn_minor: int):
+		self.file = file
+		self.vrsn_minor = vrsn_minor
+		self.data = file.read_bytes()
+		self._tree_cache = dict()
+		logger.info(f"Indexing packmeta file '{file}' (length: {len(self.data)}, minor version: {vrsn_minor})")
+		
+		self.count_files, self.count_mtdtt, self.count_telem, self.count_nsize = struct.unpack_from('<4I', self.data, 0)
+		self.names = [x.decode() for x in self.data[16:16 + self.count_nsize].split(b'\x00')[:self.count_files]]
+		self.name_index = {x: i for i, x in enumerate(self.names)}
+		pos = 16 + self.count_nsize
+		self.ofsts = np.frombuffer(self.data, dtype='<u4', count=self.count_files, offset=pos)
+		pos += self.ofsts.nbytes
+		
+		# RIDs come first, then the offsets they belong to
+		rid_count = int.from_bytes(self.data[pos:pos + 4], byteorder='little')
+		rid_size = 4 if vrsn_minor == 7 else 8
+		rid_ofsts = np.frombuffer(self.data, dtype='<u4', count=rid_count, offset=pos + 4 + (rid_count * rid_size))
+		self.rid_index = {k: pos + 4 + (i * rid_size) for i, k in enumerate(rid_ofsts.tolist())}
+		pos += 4 + (rid_count * rid_size) + rid_ofsts.nbytes
+		
+		with Stream(self.data, spos=pos) as stream:
+			self.pmt_defs = [PackMetaType(i, stream, vrsn_minor) for i in range(int(stream))]
+			pos = stream.tell()
+		
+		self.tree_pos = list()
+		for x in self.pmt_defs:
+			positions, pos = self.container_positions(self.data, pos, x.size)
+			self.tree_pos.append(positions)
+		positions, pos = self.container_positions(self.data, pos, self.count_files)
+		self.fme_pos = {self.container_peek_uint(self.data, x): x for x in positions.tolist()}
+	
+	@staticmethod
+	def container_positions(data: bytes, pos: int, count: int) -> tuple[np.ndarray, int]:
+		"""Walk count consecutive DSCs starting at pos by their size fields, returns their positions and the position after the last one."""
+		positions = np.empty(count, dtype=np.int64)
+		for i in range(count):
+			positions[i] = pos
+			pos += DSC.header_at(data, pos)[0]
+		return positions, pos
+	
+	@staticmethod
+	def container_peek_uint(data: bytes, pos: int) -> int:
+		"""First uint of the payload of the DSC at pos, without decoding it."""
+		if data[pos:pos + 4] == b'\xEF\xBE\xAD\xDE':
+			payload = pos + 16
+		else:
+			payload = pos + (20 if int.from_bytes(data[pos + 4:pos + 8], byteorder='little') != 1 else 24)
+		return int.from_bytes(data[payload:payload + 4], byteorder='little')
+	
+	def container(self, pos: int) -> DSC:
+		with Stream(self.data, spos=pos) as stream:
+			return Datastream.beef_container(stream)
+	
+	def index(self, key: int | str) -> int:
+		"""Element index for an element index or name."""
+		if isinstance(key, str):
+			if key not in self.name_index.keys():
+				raise KeyError(key)
+			return self.name_index[key]
+		elif not (0 <= key < self.count_files):
+			raise KeyError(key)
+		return key
+	
+	def rid(self, key: int | str) -> ResourceID_content_v1 | ResourceID_v1 | None:
+		ofst = int(self.ofsts[self.index(key)])
+		if ofst not in self.rid_index.keys():
+			return None
+		with Stream(self.data, spos=self.rid_index[ofst]) as stream:
+			return ResourceID_content_v1.containerless(stream) if self.vrsn_minor == 7 else ResourceID_v1.containerless(stream)
+	
+	def fme(self, key: int | str) -> DSC[FileMetadataEntry_v1 | FileMetadataEntry_v2] | None:
+		ofst = int(self.ofsts[self.index(key)])
+		return self.container(self.fme_pos[ofst]) if ofst in self.fme_pos.keys() else None
+	
+	def tree(self, meta_index: int, file_index: int) -> DSC:
+		pos = int(self.tree_pos[meta_index][file_index])
+		if pos not in self._tree_cache.keys():
+			self._tree_cache[pos] = self.container(pos)
+		return self._tree_cache[pos]
+	
+	def meta(self, key: int | str) -> list[DSC]:
+		fme = self.fme(key)
+		return [self.tree(x.data.meta_index, x.data.file_index) for x in fme.data.subitems] if fme is not None else []
+	
+	def __len__(self):
+		return self.count_files
+	
+	def __contains__(self, key: int | str):
+		return key in self.name_index.keys() if isinstance(key, str) else (0 <= key < self.count_files)
+	
+	def __getitem__(self, key: int | str) -> PackMetaFile:
+		i = self.index(key)
+		return PackMetaFile(ofst=int(self.ofsts[i]), name=self.names[i], rid=self.rid(i), meta=self.meta(i))
+	
+	def dict(self) -> dict:
+		return {
+			'files': self.count_files,
+			'mtdtt': self.count_mtdtt,
+			'telem': self.count_telem,
+			'nsize': self.count_nsize,
+			'rids' : len(self.rid_index),
+			'fmes' : len(self.fme_pos),
+			'tdefs': [x.dict() for x in self.pmt_defs]
+		}
 
 
 if __name__ == '__main__':
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import ctypes
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from mulch import ColumnTable, Stream, TimerLog
+from torchbearer.northlight_engine.configs import InstanceConfig
+from torchbearer.northlight_engine.engine import Admin, File
+from torchbearer.northlight_internal.textures.nletex import NorthlightTexHeader
+from torchbearer.northlight_internal.textures.radtools_bink import BINK_Header
+from torchbearer.northlight_internal.textures.directx.structs import DDS_FILEHEAD
+
+__all__ = [
+	"TextureCatalog",
+	"scan_texture",
+]
+
+
+HEADER_BYTES = ctypes.sizeof(DDS_FILEHEAD)
+
+
+def scan_texture(file: File) -> tuple:
+	"""One catalog row for `file`, decoded from its first `HEADER_BYTES` bytes only. Failures end up in the format column instead of raising."""
+	head = file.read_range(0, HEADER_BYTES)
+	kind, fmt, w, h, d, mips, cube, array, frames = 'unknown', '', 0, 0, 0, 0, False, 0, 0
+	try:
+		if head[:4] == b'DDS ':
+			kind = 'dds'
+			filehead = DDS_FILEHEAD.from_data(head.ljust(HEADER_BYTES, b'\0'))
+			if filehead.is_dx10:
+				fmt = filehead.header10.dxgiFormat.name
+				array = filehead.header10.arraySize
+			else:
+				fmt = filehead.header.ddspf.dwFourCC.strip('\0') or f"RGB{filehead.header.ddspf.dwRGBBitCount}"
+				array = 1
+			w, h, d = filehead.header.dwWidth, filehead.header.dwHeight, max(1, filehead.header.dwDepth)
+			mips, cube = max(1, filehead.header.dwMipMapCount), filehead.is_cube
+		elif head[:3] in [b'BIK', b'KB2']:
+			kind = 'bink'
+			bink = BINK_Header(Stream(head))
+			fmt, w, h, frames = bink.signature.name, bink.video_width, bink.video_height, bink.frames
+		elif file.admin.reader().version in ['v1.7', 'v1.3', 'v1.2']:
+			kind = 'nletex'
+			header = NorthlightTexHeader.from_buffer_copy(head[:32].ljust(32, b'\0'))
+			fmt, w, h, d, mips, cube, array = header.texture_format, header.width, header.height, header.depth, header.mipmap, header.textype == 2, 1
+	except (ValueError, UnicodeDecodeError) as err:
+		fmt = f"error: {err}"
+	return file.admin.name, file.index, file.path_raw(), kind, fmt, w, h, d, mips, cube, array, frames, file.out_size
+
+
+class TextureCatalog(ColumnTable):
+	"""Columnar table of every texture header in a set of archives, one numpy array per column."""
+	COLUMNS = [
+		('archive', 'U'),
+		('index', '<i4'),
+		('path', 'U'),
+		('kind', 'U'),
+		('format', 'U'),
+		('width', '<u4'),
+		('height', '<u4'),
+		('depth', '<u4'),
+		('mips', '<u4'),
+		('cube', '?'),
+		('array', '<u4'),
+		('frames', '<u4'),
+		('size', '<u8'),
+	]
+	ROWS = 'textures'
+
+	@classmethod
+	def build(cls, admins: Iterable[Admin], workers: int = 8) -> TextureCatalog:
+		files = [f for admin in admins for f in admin.tree.file if f.extension == 'tex']
+		with TimerLog(f"TextureCatalog - scanned {len(files)} texture headers"):
+			with ThreadPoolExecutor(max_workers=workers) as pool:
+				rows = list(pool.map(scan_texture, files))
+		return cls.from_rows(rows)
+
+	@classmethod
+	def from_instance(cls, instance: InstanceConfig, workers: int = 8) -> TextureCatalog:
+		return cls.build(instance.admins(), workers)
+
+	def dict(self):
+		return {
+			'Textures': len(self),
+			'Kinds'   : self.counts('kind'),
+			'Formats' : self.counts('format'),
+			'Cubes'   : int(self.columns['cube'].sum()),
+			'Size'    : int(self.columns['size'].sum()),
+		}
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import ctypes
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal
+
+from loguru import logger
+
+from mulch import TimerLog
+from torchbearer.northlight_engine.engine import Admin
+from torchbearer.northlight_internal.textures.nletex import NorthlightTexHeader
+from torchbearer.northlight_internal.textures.directx.structs import DDS_HEADER
+
+__all__ = [
+	"convert_admin_tex_to_dds",
+	"convert_tex_batch",
+]
+
+
+DDS_PREFIX = 4 + ctypes.sizeof(DDS_HEADER)
+
+type TexJob = tuple[int, int, str]   # offset in the archive, size of the .tex, output path
+
+
+def convert_tex_batch(archive: str, jobs: list[TexJob]) -> list[tuple[str, str, Literal['ok', 'mismatch', 'unsupported', 'failed'], str]]:
+	"""Converts `.tex` files of one archive to `.dds`, returning (output path, format, outcome, message) per job. Mismatched ones are still written.
+
+	Every output gets a single buffer sized for the DDS header plus the texture data, and the texture data is read straight into its tail, so nothing is copied after the read."""
+	results = list()
+	try:
+		f = open(archive, 'rb')
+	except OSError as err:
+		return [(out, '', 'failed', f"can't open {archive}: {err}") for _, _, out in jobs]
+	with f:
+		for offset, size, out in jobs:
+			if size < 32:
+				results.append((out, '', 'failed', f"{size} bytes is too short for a TEX header"))
+				continue
+			fmt = ''
+			try:
+				f.seek(offset)
+				header = NorthlightTexHeader.from_buffer_copy(f.read(32))
+				fmt = header.texture_format
+				try:
+					dds_header = header.to_dds_header()
+				except NotImplementedError as err:
+					results.append((out, fmt, 'unsupported', str(err)))
+					continue
+				expected = sum(x[1] for x in header.mipmap_specs_bytes())
+				buffer = bytearray(DDS_PREFIX + size - 32)
+				buffer[:4] = b"DDS "
+				buffer[4:DDS_PREFIX] = bytes(dds_header)
+				read = f.readinto(memoryview(buffer)[DDS_PREFIX:])
+				if read != size - 32:
+					results.append((out, fmt, 'failed', f"truncated, read {read} of {size - 32} bytes"))
+					continue
+				with open(out, 'wb') as o:
+					o.write(buffer)
+			except (OSError, ValueError) as err:
+				# one bad texture (unreadable header, unwritable output) shouldn't take the rest of the batch down with it
+				results.append((out, fmt, 'failed', f"{type(err).__name__}: {err}"))
+				continue
+			if expected == size - 32:
+				results.append((out, fmt, 'ok', ''))
+			else:
+				results.append((out, fmt, 'mismatch', f"mips add up to {expected} bytes but the data is {size - 32}"))
+	return results
+
+
+def convert_admin_tex_to_dds(admin: Admin, workers: int | None = None, batch: int = 256) -> dict:
+	"""Converts every `.tex` of a legacy (AW1/AWN/AWR) archive next to its regular export path, returning a summary of what did and didn't convert."""
+	if admin.reader().version not in ['v1.7', 'v1.3', 'v1.2']:
+		raise ValueError(f"{admin.name} is a {admin.reader().version} archive, only v1.2/v1.3/v1.7 ones contain Northlight TEX textures")
+
+	jobs = list()
+	for file in admin.tree.file:
+		if file.extension == 'tex' and len(file.chunks_ids) != 0:
+			chunk = file.chunks[0]
+			jobs.append((chunk.offset, chunk.size_decompressed, str(file.export_path.with_suffix('.dds'))))
+	archive = str(admin.data.arch[0].path)
+
+	converted = dict()
+	unsupported = dict()
+	mismatched = dict()
+	failed = dict()
+	with TimerLog(f"convert_admin_tex_to_dds[{admin.name}] - {len(jobs)} textures"):
+		with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+			batches = [jobs[i:i + batch] for i in range(0, len(jobs), batch)]
+			for results in pool.map(convert_tex_batch, [archive] * len(batches), batches):
+				for out, fmt, outcome, message in results:
+					match outcome:
+						case 'ok' | 'mismatch':
+							converted[fmt] = converted.get(fmt, 0) + 1
+							if outcome == 'mismatch':
+								mismatched[out] = message
+						case 'unsupported':
+							unsupported[fmt] = unsupported.get(fmt, 0) + 1
+						case 'failed':
+							failed[out] = message
+
+	for out, message in failed.items():
+		logger.error(f"Failed to convert {out}: {message}")
+	for out, message in mismatched.items():
+		logger.warning(f"Size mismatch in {out}: {message}")
+	if len(unsupported) != 0:
+		logger.warning(f"Skipped {sum(unsupported.values())} textures in unsupported formats: {unsupported}")
+	return {
+		'Archive'    : admin.name,
+		'Textures'   : len(jobs),
+		'Converted'  : converted,
+		'Unsupported': unsupported,
+		'Mismatched' : len(mismatched),
+		'Failed'     : len(failed),
+	}
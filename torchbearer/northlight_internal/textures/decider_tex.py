@@ -17,16 +17,15 @@ def tex_handler(file: File) -> DDS_FILEHEAD | NorthlightTex | BINK_Header | None
 			if file.chunks[0].size_decompressed == 148:
 				return DDS_FILEHEAD.from_data(file.read_first_chunk())
 			else:
-				return BINK_Header(Stream(file.read_first_chunk()))
+				return BINK_Header.from_range_reader(file.read_range)
 		case 'v1.8' | 'v1.9':
 			# either actual DDS or BINK file
 			# games: QBR, CTL
-			with Stream(file.data) as f:
-				magic = f.peek(3)
-				if magic == b'DDS':
-					return DDS_FILEHEAD.from_stream(f)
-				else:
-					return BINK_Header(Stream(file.read_first_chunk()))
+			head = file.read_range(0, 148)
+			if head[:3] == b'DDS':
+				return DDS_FILEHEAD.from_data(head)
+			else:
+				return BINK_Header.from_range_reader(file.read_range)
 		case 'v1.7' | 'v1.3' | 'v1.2':
 			# custom Northlight TEX type
 			# games: AW1, AWR, AWN
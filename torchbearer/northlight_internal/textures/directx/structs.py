@@ -271,7 +271,7 @@ class DDS_HEADER(ctypes.Structure):
 	@property
 	def dwWidth(self) -> int:
 		"""Surface width (in pixels)."""
-		return self._dwHeight
+		return self._dwWidth
 	
 	@property
 	def dwPitchOrLinearSize(self) -> int:
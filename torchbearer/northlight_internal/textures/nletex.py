@@ -158,13 +158,17 @@ class NorthlightTexHeader(ctypes.LittleEndianStructure):
 		return getformat(self.texfmt)
 	
 	def to_dds_header(self) -> DDS_HEADER:
-		imgsize = getimgsize(self.texfmt, self.width, self.height, self.depth)
+		"""Legacy (non-DX10) DDS header for this texture. Raises NotImplementedError for formats without a known DDS equivalent."""
+		fmt = self.texture_format
 		flags = DDS.DDSD.CAPS | DDS.DDSD.HEIGHT | DDS.DDSD.WIDTH | DDS.DDSD.PIXELFORMAT
 		caps1 = DDS.DDSCAPS.TEXTURE
 		caps2 = DDS.DDSCAPS2(value=0)
 		
-		if self.header.textype == 2:
+		if self.textype == 2:
 			caps2 |= DDS.DDSCAPS2.CUBEMAP_ALL()
+		elif self.textype == 1:
+			flags |= DDS.DDSD.DEPTH
+			caps2 |= DDS.DDSCAPS2.VOLUME
 		
 		if self.mipmap > 1:
 			flags |= DDS.DDSD.MIPMAPCOUNT
@@ -172,13 +176,23 @@ class NorthlightTexHeader(ctypes.LittleEndianStructure):
 		elif self.depth > 1 or self.textype != 0:
 			caps1 |= DDS.DDSCAPS.COMPLEX
 		
-		if "DXT" in self.texture_format:
-			flags |= DDS.DDSD.LINEARSIZE
-			pxfmt = DDS_PIXELFORMAT.from_fields(fourcc=self.texture_format)
-		else:
-			pxfmt = DDS_PIXELFORMAT.from_fields(DDPF.RGB.value)  # type: ignore
+		match fmt:
+			case 'DXT1' | 'DXT5':
+				flags |= DDS.DDSD.LINEARSIZE
+				pitch = getimgsize(fmt, self.width, self.height, 1)
+				pxfmt = DDS_PIXELFORMAT.from_fields(fourcc=fmt)
+			case 'RGBA8':
+				flags |= DDS.DDSD.PITCH
+				pitch = self.width * 4
+				pxfmt = DDS_PIXELFORMAT.from_fields(DDS.DDPF.RGB | DDS.DDPF.ALPHAPIXELS, 32, r_mask=b'\x00\x00\xff\x00', g_mask=b'\x00\xff\x00\x00', b_mask=b'\xff\x00\x00\x00', a_mask=b'\x00\x00\x00\xff')
+			case 'RGBA16F':
+				flags |= DDS.DDSD.PITCH
+				pitch = self.width * 8
+				pxfmt = DDS_PIXELFORMAT.from_fields(fourcc=(113).to_bytes(4, 'little'))  # D3DFMT_A16B16G16R16F
+			case _:
+				raise NotImplementedError(f"No DDS equivalent for nletex format {fmt} ({self.texfmt})")
 		
-		return DDS_HEADER.from_fields(flags, pxfmt, self.mipmap, imgsize, self.height, self.width, self.depth, caps1, caps2)
+		return DDS_HEADER.from_fields(flags, pxfmt, self.mipmap, pitch, self.height, self.width, self.depth, caps1, caps2)
 	
 	def to_dds_dx10_custom(self, dx10_format: int) -> bytes:
 		caps1 = DDS.DDSCAPS.TEXTURE
@@ -294,8 +308,13 @@ class NorthlightTex:
 			"bytelen": self.bytelen,
 		}
 	
-	def to_dds(self):
-		return b"DDS " + bytes(self.header.to_dds_header()) + self.texData
+	def to_dds(self) -> bytearray:
+		header = self.header.to_dds_header()
+		cnst = bytearray(4 + ctypes.sizeof(header) + self.bytelen)
+		cnst[:4] = b"DDS "
+		cnst[4:4 + ctypes.sizeof(header)] = bytes(header)
+		memoryview(cnst)[4 + ctypes.sizeof(header):] = self.texData
+		return cnst
 	
 	def to_dds_dx10_custom(self, dx10_format: int):
 		cnst = bytearray()
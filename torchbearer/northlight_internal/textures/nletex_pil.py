@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import ctypes
+from io import BytesIO
+
+import numpy as np
 from PIL import Image, ImageFile
 
+from mulch import TimerLog
+
 """
 BCx	 FourCC     Channels	Description		    Alpha Type		    Bytes / Bits per 4x4 (16) pixels (Block Size)
 1	 DXT1	    RGBA		1b/Opaque		    Premultiplied	    8	   64		    two 16-bit RGB 5:6:5 color values and a 4×4 two-bit lookup table
@@ -149,20 +154,34 @@ class NorthlightTex_Decoder(ImageFile.PyDecoder):
 	_pulls_fd = True
 	
 	def decode(self, buffer: bytes | Image.SupportsArrayInterface) -> tuple[int, int]:
+		"""Reads mip level 0 in one go and swaps the channels around to RGBA."""
 		bitlength, mode = self.args
 		bytelength = bitlength // 8
 		assert self.fd is not None
-		data = bytearray()
-		while len(data) < self.state.xsize * self.state.ysize * bytelength:
-			tuplet = self.fd.read(bytelength//4), self.fd.read(bytelength//4), self.fd.read(bytelength//4), self.fd.read(bytelength//4)
-			data += tuplet[mode.index('R')]
-			data += tuplet[mode.index('G')]
-			data += tuplet[mode.index('B')]
-			data += tuplet[mode.index('A')]
-		self.set_as_raw(data)
+		pixelcount = self.state.xsize * self.state.ysize
+		data = self.fd.read(pixelcount * bytelength)
+		if len(data) != pixelcount * bytelength:
+			raise OSError(f"Truncated nletex data, expected {pixelcount * bytelength} bytes, got {len(data)}")
+		pixels = np.frombuffer(data, dtype=np.dtype((np.void, bytelength // 4))).reshape(pixelcount, 4)
+		self.set_as_raw(pixels[:, [mode.index(x) for x in 'RGBA']].tobytes())
 		return -1, 0
 
 def register():
 	Image.register_open(NorthlightTex_ImageFile.format, NorthlightTex_ImageFile, lambda prefix: not (prefix.startswith(b"DDS") or prefix.startswith(b"KB2") or prefix.startswith(b"BNK")))
 	Image.register_decoder("nletex", NorthlightTex_Decoder)
-	Image.register_extension(NorthlightTex_ImageFile.format, ".tex")
\ No newline at end of file
+	Image.register_extension(NorthlightTex_ImageFile.format, ".tex")
+
+
+def benchmark(sizes: tuple[int, ...] = (512, 1024, 2048, 4096), form: int = 0):
+	"""Times decoding synthetic uncompressed textures of each size through the PIL plugin."""
+	register()
+	for size in sizes:
+		header = NorthlightTex_Header(type=0, form=form, dimw=size, dimh=size, dimd=1, mmap=1, fltr=0, unkw=0)
+		data = bytes(header) + np.random.default_rng(size).integers(0, 256, size * size * 4, dtype=np.uint8).tobytes()
+		with TimerLog(f"nletex decode of a {size}x{size} form {form} texture"):
+			with Image.open(BytesIO(data), formats=[NorthlightTex_ImageFile.format]) as img:
+				img.load()
+
+
+if __name__ == '__main__':
+	benchmark()
\ No newline at end of file
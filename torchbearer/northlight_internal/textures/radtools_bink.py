@@ -1,6 +1,11 @@
+from __future__ import annotations
+
 import enum
+from typing import Callable
+
+import numpy as np
 
-from mulch import StreamObject, StreamFields
+from mulch import Stream, StreamObject, StreamFields
 
 """
 Sources:
@@ -98,7 +103,7 @@ class BinkMagic(enum.Enum):
 
 
 class BINK_Header(StreamObject):
-	signature:              BinkMagic   = StreamFields.call(lambda x: BinkMagic(x.string(4)))   # file signature ('BIK', or 'KB2' for Bink Video 2) + codec revision (letter)
+	signature:              BinkMagic   = StreamFields.call(lambda x: BinkMagic(x.read(4)))   # file signature ('BIK', or 'KB2' for Bink Video 2) + codec revision (letter)
 	file_size_following:    int         = StreamFields.int()    # file size not including the first 8 bytes
 	frames:                 int         = StreamFields.int()    # number of frames
 	largest_frame_size:     int         = StreamFields.int()    # largest frame size in bytes
@@ -108,4 +113,105 @@ class BINK_Header(StreamObject):
 	fps_dividend:           int         = StreamFields.int()    # video frames per second dividend
 	fps_divider:            int         = StreamFields.int()    # video frames per second divider
 	flags:                  bytes       = StreamFields.bytes(4) # video flags
-	audio_tracks:           int         = StreamFields.int()    # number of audio tracks (less than or equal to 256)
\ No newline at end of file
+	audio_tracks:           int         = StreamFields.int()    # number of audio tracks (less than or equal to 256)
+	
+	# Audio track headers and the frame index follow the fixed fields, they're read with numpy rather than as StreamFields.
+	audio: np.ndarray | None
+	offsets: np.ndarray | None
+	
+	AUDIO_DTYPE = np.dtype([('unknown', '<u2'), ('channels', '<u2'), ('sample_rate', '<u2'), ('flags', '<u2'), ('track_id', '<u4')])
+	
+	def __init__(self, stream: Stream, /, *, extra=None):
+		super().__init__(stream, extra=extra)
+		self.audio = None
+		self.offsets = None
+		if stream.remaining() >= self.index_size - 44:
+			self.read_index(stream)
+	
+	@classmethod
+	def from_range_reader(cls, read_range: Callable[[int, int], bytes]) -> BINK_Header:
+		"""Parses the header and full index through something like `File.read_range`, reading exactly the index bytes and no frame data."""
+		header = cls(Stream(read_range(0, 44)))
+		header.read_index(Stream(read_range(44, header.index_size - 44)))
+		return header
+	
+	@property
+	def index_size(self) -> int:
+		"""Bytes from the start of the file to the end of the frame offset table."""
+		return 44 + self.audio_tracks * 12 + (self.frames + 1) * 4
+	
+	@property
+	def is_indexed(self) -> bool:
+		return self.offsets is not None
+	
+	@property
+	def file_size(self) -> int:
+		return self.file_size_following + 8
+	
+	@property
+	def fps(self) -> float:
+		return self.fps_dividend / self.fps_divider if self.fps_divider else 0.0
+	
+	def read_index(self, stream: Stream):
+		"""Reads the per-track audio headers and the `frames + 1` offset table, `stream` has to sit right after the fixed 44 byte header."""
+		tracks = self.audio_tracks
+		data = stream.read(self.index_size - 44)
+		if len(data) != self.index_size - 44:
+			raise ValueError(f"Bink index truncated, expected {self.index_size - 44} bytes, got {len(data)}")
+		self.audio = np.zeros(tracks, dtype=self.AUDIO_DTYPE)
+		if tracks:
+			first = np.frombuffer(data, dtype='<u2', count=tracks * 2).reshape(tracks, 2)
+			second = np.frombuffer(data, dtype='<u2', count=tracks * 2, offset=tracks * 4).reshape(tracks, 2)
+			self.audio['unknown'], self.audio['channels'] = first[:, 0], first[:, 1]
+			self.audio['sample_rate'], self.audio['flags'] = second[:, 0], second[:, 1]
+			self.audio['track_id'] = np.frombuffer(data, dtype='<u4', count=tracks, offset=tracks * 8)
+		self.offsets = np.frombuffer(data, dtype='<u4', count=self.frames + 1, offset=tracks * 12)
+	
+	@property
+	def frame_starts(self) -> np.ndarray:
+		"""Absolute frame offsets with the keyframe bit masked off, `frames + 1` long, the last one being the file size."""
+		return self.offsets & np.uint32(0xFFFFFFFE)
+	
+	@property
+	def frame_sizes(self) -> np.ndarray:
+		return np.diff(self.frame_starts)
+	
+	@property
+	def keyframes(self) -> np.ndarray:
+		return (self.offsets[:-1] & 1).astype(bool)
+	
+	def frame_range(self, start: int, stop: int) -> tuple[int, int]:
+		"""(offset, size) of the bytes that hold frames [start, stop)."""
+		if not 0 <= start <= stop <= self.frames:
+			raise IndexError(f"Frame range [{start}, {stop}) is outside of [0, {self.frames})")
+		starts = self.frame_starts
+		return int(starts[start]), int(starts[stop] - starts[start])
+	
+	def extract_frames(self, read_range: Callable[[int, int], bytes], start: int, stop: int) -> bytes:
+		return read_range(*self.frame_range(start, stop))
+	
+	def stats(self) -> dict:
+		"""Bitrate and keyframe numbers worked out from the index alone."""
+		sizes = self.frame_sizes
+		keys = np.flatnonzero(self.keyframes)
+		gaps = np.diff(keys)
+		duration = self.frames / self.fps if self.fps else 0.0
+		return {
+			'duration'          : round(duration, 3),
+			'bytes'             : int(sizes.sum()),
+			'bitrate'           : int(sizes.sum() * 8 / duration) if duration else 0,
+			'frame_size_mean'   : round(float(sizes.mean()), 1) if len(sizes) else 0,
+			'frame_size_max'    : int(sizes.max()) if len(sizes) else 0,
+			'keyframes'         : len(keys),
+			'keyframe_gap_mean' : round(float(gaps.mean()), 1) if len(gaps) else 0,
+			'keyframe_gap_max'  : int(gaps.max()) if len(gaps) else 0,
+			'index_matches_size': bool(int(self.frame_starts[-1]) == self.file_size),
+		}
+	
+	def dict(self):
+		rtrn = {k: v for k, v in super().dict().items() if k not in ['audio', 'offsets']}
+		rtrn['signature'] = self.signature.name
+		if self.is_indexed:
+			rtrn['audio'] = [{k: int(track[k]) for k in self.AUDIO_DTYPE.names} for track in self.audio]
+			rtrn['stats'] = self.stats()
+		return rtrn
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import ctypes
+import os
+import threading
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Literal
+
+from loguru import logger
+from PIL import Image
+
+from torchbearer.northlight_engine.engine import File
+from torchbearer.northlight_internal.textures.nletex import NorthlightTexHeader
+from torchbearer.northlight_internal.textures.nletex_pil import NorthlightTex_ImageFile, register
+from torchbearer.northlight_internal.textures.directx.structs import DDS_FILEHEAD
+
+__all__ = [
+	"MipLevel",
+	"TextureLayout",
+	"TextureService",
+]
+
+
+# bytes per 4x4 block
+FOURCC_BLOCK_BYTES = {'DXT1': 8, 'DXT2': 16, 'DXT3': 16, 'DXT4': 16, 'DXT5': 16, 'ATI1': 8, 'BC4U': 8, 'BC4S': 8, 'ATI2': 16, 'BC5U': 16, 'BC5S': 16}
+DXGI_BLOCK_BYTES = {'BC1': 8, 'BC2': 16, 'BC3': 16, 'BC4': 8, 'BC5': 16, 'BC6H': 16, 'BC7': 16}
+
+# bits per pixel, only the families that show up in Northlight textures
+DXGI_PIXEL_BITS = {
+	'R32G32B32A32': 128, 'R32G32B32': 96, 'R16G16B16A16': 64, 'R32G32': 64,
+	'R10G10B10A2': 32, 'R11G11B10': 32, 'R8G8B8A8': 32, 'B8G8R8A8': 32, 'B8G8R8X8': 32, 'R16G16': 32, 'R32': 32,
+	'R8G8': 16, 'R16': 16, 'B5G6R5': 16, 'B5G5R5A1': 16, 'R8': 8, 'A8': 8,
+}
+
+
+@dataclass
+class MipLevel:
+	level:  int
+	width:  int
+	height: int
+	offset: int     # from the start of the file, header included
+	size:   int
+
+
+@dataclass
+class TextureLayout:
+	"""Where every mip level of a texture file lives, worked out from the header alone."""
+	kind:       Literal['dds', 'nletex']
+	header:     bytes
+	levels:     list[MipLevel]  = field(kw_only=True)
+	block:      int             = field(kw_only=True, default=0)    # bytes per 4x4 block, 0 if not block compressed
+	bits:       int             = field(kw_only=True, default=0)    # bits per pixel if not block compressed
+
+	@classmethod
+	def from_file(cls, file: File) -> TextureLayout | None:
+		"""None if the file is not a texture (Bink videos hide behind .tex too), NotImplementedError if the pixel format can't be sized."""
+		head = file.read_range(0, 148)
+		if head[:4] == b'DDS ':
+			return cls.from_dds(head)
+		elif file.admin.reader().version in ['v1.7', 'v1.3', 'v1.2']:
+			return cls.from_nletex(head)
+		return None
+
+	@classmethod
+	def from_dds(cls, head: bytes) -> TextureLayout:
+		filehead = DDS_FILEHEAD.from_data(head.ljust(ctypes.sizeof(DDS_FILEHEAD), b'\0'))
+		if filehead.is_dx10:
+			try:
+				fmt = filehead.header10.dxgiFormat.name
+			except ValueError:
+				raise NotImplementedError(f"Unknown DXGI format {filehead.header10._dxgiFormat}")
+			family = fmt.split('_')[0]
+			block, bits = DXGI_BLOCK_BYTES.get(family, 0), DXGI_PIXEL_BITS.get(family, 0)
+			start = 148
+		else:
+			fmt = filehead.header.ddspf.dwFourCC
+			block, bits = FOURCC_BLOCK_BYTES.get(fmt, 0), filehead.header.ddspf.dwRGBBitCount
+			start = 128
+		if block == 0 and bits == 0:
+			raise NotImplementedError(f"Can't size mip levels of DDS format {fmt}")
+
+		layout = cls('dds', head[:start], levels=list(), block=block, bits=bits)
+		w, h, d = filehead.header.dwWidth, filehead.header.dwHeight, max(1, filehead.header.dwDepth)
+		for level in range(max(1, filehead.header.dwMipMapCount)):
+			size = layout.surface_size(w, h) * d
+			layout.levels.append(MipLevel(level=level, width=w, height=h, offset=start, size=size))
+			start += size
+			w, h, d = max(w // 2, 1), max(h // 2, 1), max(d // 2, 1)
+		return layout
+
+	@classmethod
+	def from_nletex(cls, head: bytes) -> TextureLayout:
+		header = NorthlightTexHeader.from_buffer_copy(head[:32])
+		layout = cls('nletex', head[:32], levels=list())
+		start = 32
+		for level, size, w, h, d in header.mipmap_specs_bytes():
+			if size == 0:
+				raise NotImplementedError(f"Can't size mip levels of nletex format {header.texture_format}")
+			layout.levels.append(MipLevel(level=level, width=w, height=h, offset=start, size=size))
+			start += size
+		return layout
+
+	def surface_size(self, w: int, h: int) -> int:
+		if self.block:
+			return max(1, (w + 3) // 4) * max(1, (h + 3) // 4) * self.block
+		return (w * self.bits + 7) // 8 * h
+
+	def pick(self, target: int) -> MipLevel:
+		"""The smallest mip whose longest side is still at least `target`, or the top mip if the whole texture is smaller than that."""
+		chosen = self.levels[0]
+		for mip in self.levels[1:]:
+			if max(mip.width, mip.height) < target:
+				break
+			chosen = mip
+		return chosen
+
+	def mip_header(self, mip: MipLevel) -> bytes:
+		"""The original header rewritten to describe a lone 2D texture with the dimensions of `mip`."""
+		match self.kind:
+			case 'dds':
+				filehead = DDS_FILEHEAD.from_data(self.header.ljust(ctypes.sizeof(DDS_FILEHEAD), b'\0'))
+				filehead._header._dwWidth = mip.width
+				filehead._header._dwHeight = mip.height
+				filehead._header._dwDepth = 1
+				filehead._header._dwMipMapCount = 1
+				filehead._header._dwCaps2 = 0
+				filehead._header._dwPitchOrLinearSize = self.surface_size(mip.width, mip.height) if self.block else self.surface_size(mip.width, 1)
+				if filehead.is_dx10:
+					filehead._header10u.header10._arraySize = 1
+					filehead._header10u.header10._miscFlag = 0
+				return bytes(filehead)[:len(self.header)]
+			case 'nletex':
+				header = NorthlightTexHeader.from_buffer_copy(self.header)
+				header.textype = 0
+				header.width = mip.width
+				header.height = mip.height
+				header.depth = 1
+				header.mipmap = 1
+				return bytes(header)
+
+	def decode(self, mip: MipLevel, data: bytes) -> Image.Image:
+		img = Image.open(BytesIO(self.mip_header(mip) + data), formats=['DDS' if self.kind == 'dds' else NorthlightTex_ImageFile.format])
+		img.load()
+		return img
+
+
+class TextureService:
+	"""Decodes single mip levels straight out of a file's chunks, and keeps a PNG thumbnail cache next to each archive's other caches."""
+	thumbnail_size: int
+	_layouts: dict[tuple[Path, int], TextureLayout | None]
+
+	def __init__(self, thumbnail_size: int = 256):
+		register()
+		self.thumbnail_size = thumbnail_size
+		self._layouts = dict()
+
+	def layout(self, file: File) -> TextureLayout | None:
+		key = (file.admin.path, file.index)
+		if key not in self._layouts:
+			self._layouts[key] = TextureLayout.from_file(file)
+		return self._layouts[key]
+
+	def decode(self, file: File, target: int | None = None, *, level: int | None = None) -> Image.Image | None:
+		"""Decodes mip `level`, or the one `TextureLayout.pick` chooses for `target`, or the top mip if neither is given."""
+		layout = self.layout(file)
+		if layout is None:
+			return None
+		if level is not None:
+			mip = layout.levels[min(level, len(layout.levels) - 1)]
+		elif target is not None:
+			mip = layout.pick(target)
+		else:
+			mip = layout.levels[0]
+		data = file.read_range(mip.offset, mip.size)
+		if len(data) != mip.size:
+			raise OSError(f"Truncated mip {mip.level} of {file.name}, expected {mip.size} bytes, got {len(data)}")
+		return layout.decode(mip, data)
+
+	def thumbnail_path(self, file: File, size: int) -> Path:
+		return file.admin.reader().cache_dir / 'thumbs' / f"{file.index}_{size}.png"
+
+	def thumbnail(self, file: File, size: int | None = None) -> Path | None:
+		"""Path to a cached thumbnail of `file`, made from the smallest fitting mip on a miss. Thumbnails older than the archive are remade."""
+		size = size or self.thumbnail_size
+		path = self.thumbnail_path(file, size)
+		if path.is_file() and path.stat().st_mtime_ns >= file.admin.path.stat().st_mtime_ns:
+			return path
+		try:
+			img = self.decode(file, size)
+		except (NotImplementedError, OSError, SyntaxError, ValueError) as err:
+			logger.warning(f"Can't make a thumbnail of {file.name}: {err}")
+			return None
+		if img is None:
+			return None
+		img.thumbnail((size, size))
+		path.parent.mkdir(parents=True, exist_ok=True)
+		temp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+		img.save(temp, format='PNG')
+		os.replace(temp, path)
+		return path